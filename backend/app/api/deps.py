@@ -0,0 +1,87 @@
+"""FastAPI dependencies for application-scoped services."""
+from fastapi import Depends, Request
+
+from app.services.alert_store import AlertStore
+from app.services.analysis_engine import AnalysisEngine
+from app.services.analysis_store import AnalysisStore
+from app.services.body_store import BodyStore
+from app.services.container import ServiceContainer
+from app.services.document_store import DocumentStore
+from app.services.event_bus import EventBus
+from app.services.job_manager import JobManager
+from app.services.log_ingestor import LogIngestor
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.nlp_service import NLPService
+from app.services.analytics_service import AnalyticsService
+from app.services.processing_pipeline import ProcessingPipeline
+from app.services.search_index import SearchIndex
+
+
+def get_services(request: Request) -> ServiceContainer:
+    """Return the container created in the application lifespan."""
+    return request.app.state.services
+
+
+def get_document_store(services: ServiceContainer = Depends(get_services)) -> DocumentStore:
+    """Shared document store."""
+    return services.document_store
+
+
+def get_body_store(services: ServiceContainer = Depends(get_services)) -> BodyStore:
+    """Shared store for document bodies kept out of line."""
+    return services.body_store
+
+
+def get_nlp_service(services: ServiceContainer = Depends(get_services)) -> NLPService:
+    """Shared NLP service."""
+    return services.nlp_service
+
+
+def get_analysis_engine(services: ServiceContainer = Depends(get_services)) -> AnalysisEngine:
+    """Shared analysis engine (notifies rollups and other listeners)."""
+    return services.analysis_engine
+
+
+def get_analysis_store(services: ServiceContainer = Depends(get_services)) -> AnalysisStore:
+    """Shared store of persisted document analyses."""
+    return services.analysis_store
+
+
+def get_near_duplicate_index(services: ServiceContainer = Depends(get_services)) -> NearDuplicateIndex:
+    """Shared MinHash/LSH index of near-duplicate documents."""
+    return services.near_duplicates
+
+
+def get_search_index(services: ServiceContainer = Depends(get_services)) -> SearchIndex:
+    """Shared full-text search index."""
+    return services.search_index
+
+
+def get_analytics_service(services: ServiceContainer = Depends(get_services)) -> AnalyticsService:
+    """Shared analytics service."""
+    return services.analytics_service
+
+
+def get_pipeline(services: ServiceContainer = Depends(get_services)) -> ProcessingPipeline:
+    """Shared processing pipeline."""
+    return services.pipeline
+
+
+def get_log_ingestor(services: ServiceContainer = Depends(get_services)) -> LogIngestor:
+    """Shared streaming log ingestor."""
+    return services.log_ingestor
+
+
+def get_alert_store(services: ServiceContainer = Depends(get_services)) -> AlertStore:
+    """Shared alert store."""
+    return services.alert_store
+
+
+def get_event_bus(services: ServiceContainer = Depends(get_services)) -> EventBus:
+    """Shared event bus for server-sent events."""
+    return services.event_bus
+
+
+def get_job_manager(services: ServiceContainer = Depends(get_services)) -> JobManager:
+    """Shared background job manager."""
+    return services.job_manager
@@ -1,92 +1,71 @@
 """Alerts API router."""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
 from datetime import datetime, timedelta
-import json
-from pathlib import Path
 
-from app.models.alert import Alert, AlertGenerationRequest
+from app.models.alert import AlertGenerationRequest
+from app.api.deps import get_alert_store, get_analytics_service
+from app.core.concurrency import run_blocking
+from app.services.alert_store import AlertStore
 from app.services.analytics_service import AnalyticsService
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
-analytics_service = AnalyticsService()
-
-# In-memory alerts storage
-_alerts_storage: List[dict] = []
-
-def _initialize_alerts():
-    """Initialize with some sample alerts."""
-    if not _alerts_storage:
-        _alerts_storage.extend([
-            {
-                "alert_id": "ALERT-52",
-                "type": "ThresholdExceeded",
-                "message": "Air emissions exceeded safe limits. Current: 27 ppm, Threshold: 20 ppm",
-                "severity": "HIGH",
-                "timestamp": "2024-04-12T13:22:00Z",
-                "resolved": False
-            },
-            {
-                "alert_id": "ALERT-53",
-                "type": "ThresholdExceeded",
-                "message": "Water quality pH level exceeded threshold. Current: 11.5, Threshold: 10",
-                "severity": "MEDIUM",
-                "timestamp": "2024-04-13T11:40:00Z",
-                "resolved": False
-            },
-            {
-                "alert_id": "ALERT-54",
-                "type": "ThresholdExceeded",
-                "message": "Temperature exceeded safe operating range. Current: 95°F, Threshold: 90°F",
-                "severity": "HIGH",
-                "timestamp": "2024-04-12T16:45:00Z",
-                "resolved": False
-            },
-            {
-                "alert_id": "ALERT-55",
-                "type": "ThresholdExceeded",
-                "message": "Pressure reading above normal. Current: 120 psi, Threshold: 100 psi",
-                "severity": "MEDIUM",
-                "timestamp": "2024-04-13T10:25:00Z",
-                "resolved": False
-            },
-            {
-                "alert_id": "ALERT-56",
-                "type": "ComplianceViolation",
-                "message": "Missing weekly inspection report for Plant A",
-                "severity": "LOW",
-                "timestamp": "2024-04-14T09:15:00Z",
-                "resolved": False
-            }
-        ])
-
-# Initialize alerts on module load
-_initialize_alerts()
-
 
 @router.get("/")
-async def get_alerts():
-    """Get all alerts."""
-    result = []
-    for alert in _alerts_storage:
-        alert_obj = Alert(
-            alert_id=alert["alert_id"],
-            type=alert["type"],
-            message=alert["message"],
-            severity=alert["severity"],
-            timestamp=datetime.fromisoformat(alert["timestamp"].replace("Z", "+00:00")),
-            resolved=alert.get("resolved", False),
-            resolved_at=datetime.fromisoformat(alert["resolved_at"].replace("Z", "+00:00")) if alert.get("resolved_at") else None
+async def get_alerts(
+    severity: Optional[str] = None,
+    resolved: Optional[bool] = None,
+    facility: Optional[str] = None,
+    type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    alert_store: AlertStore = Depends(get_alert_store)
+):
+    """Get alerts in creation order, filtered and optionally paginated.
+    
+    The response body is a JSON list. Without ``limit`` or ``cursor`` every
+    matching alert is returned, as before pagination existed; otherwise
+    pages hold ``limit`` alerts (default 100) and, when more alerts match,
+    the ``X-Next-Cursor`` header holds the cursor for the next page.
+    """
+    if limit is None and cursor is not None:
+        limit = 100
+    try:
+        payloads, next_cursor = await run_blocking(
+            alert_store.list_json,
+            severity=severity,
+            resolved=resolved,
+            facility=facility,
+            alert_type=type,
+            since=since,
+            until=until,
+            cursor=cursor,
+            limit=limit
         )
-        result.append(alert_obj.to_dict())
-    return result
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content="[" + ",".join(payloads) + "]", media_type="application/json", headers=headers)
+
+
+@router.post("/{alert_id}/resolve")
+async def resolve_alert(alert_id: str, alert_store: AlertStore = Depends(get_alert_store)):
+    """Mark an alert as resolved."""
+    alert = await run_blocking(alert_store.resolve, alert_id)
+    if alert is None:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return alert
 
 
 @router.post("/generate")
 async def generate_alerts(
     analyze_operational_logs: bool = True,
     check_thresholds: bool = True,
-    include_historical: bool = True
+    include_historical: bool = True,
+    analytics_service: AnalyticsService = Depends(get_analytics_service),
+    alert_store: AlertStore = Depends(get_alert_store)
 ):
     """Generate alerts based on operational logs and analytics."""
     request = AlertGenerationRequest(
@@ -95,61 +74,40 @@ async def generate_alerts(
         include_historical=include_historical
     )
     
-    new_alerts = []
-    
-    if request.analyze_operational_logs:
-        # Get threshold deviations
-        deviations = analytics_service.detect_threshold_deviations()
+    def _generate() -> List[dict]:
+        new_alerts = []
         
-        for deviation in deviations:
-            # Check if alert already exists
-            existing = any(
-                a.get("message", "").startswith(f"{deviation['metric']} exceeded")
-                for a in _alerts_storage
-            )
+        if request.analyze_operational_logs:
+            # Get threshold deviations
+            deviations = analytics_service.detect_threshold_deviations()
             
-            if not existing:
+            for deviation in deviations:
                 severity = "HIGH" if deviation["percentage"] > 20 else "MEDIUM"
-                alert_id = f"ALERT-{len(_alerts_storage) + len(new_alerts) + 1}"
-                
-                alert_data = {
-                    "alert_id": alert_id,
+                new_alerts.append({
                     "type": "ThresholdExceeded",
-                    "message": f"{deviation['metric']} exceeded threshold. Current: {deviation['value']} {deviation.get('unit', '')}, Threshold: {deviation['threshold']} {deviation.get('unit', '')}",
+                    "message": f"{deviation['metric']} exceeded threshold at {deviation['facility']}. Current: {deviation['value']} {deviation.get('unit', '')}, Threshold: {deviation['threshold']} {deviation.get('unit', '')}",
                     "severity": severity,
                     "timestamp": datetime.now().isoformat() + "Z",
-                    "resolved": False
-                }
-                
-                _alerts_storage.append(alert_data)
-                new_alerts.append(alert_data)
-    
-    if request.include_historical:
-        # Generate mock historical alerts
-        historical_avg = analytics_service.calculate_historical_average("Air Emissions")
-        if historical_avg > 18:
-            alert_id = f"ALERT-{len(_alerts_storage) + len(new_alerts) + 1}"
-            alert_data = {
-                "alert_id": alert_id,
-                "type": "TrendAnalysis",
-                "message": f"Historical average for Air Emissions ({historical_avg:.1f} ppm) is approaching threshold",
-                "severity": "LOW",
-                "timestamp": datetime.now().isoformat() + "Z",
-                "resolved": False
-            }
-            _alerts_storage.append(alert_data)
-            new_alerts.append(alert_data)
+                    "resolved": False,
+                    "facility": deviation["facility"],
+                    "metric": deviation["metric"],
+                    # One alert per facility and metric per suppression window of readings
+                    "dedup_at": deviation["timestamp"]
+                })
+        
+        if request.include_historical:
+            # Generate mock historical alerts
+            historical_avg = analytics_service.calculate_historical_average("Air Emissions")
+            if historical_avg is not None and historical_avg > 18:
+                new_alerts.append({
+                    "type": "TrendAnalysis",
+                    "message": f"Historical average for Air Emissions ({historical_avg:.1f} ppm) is approaching threshold",
+                    "severity": "LOW",
+                    "timestamp": datetime.now().isoformat() + "Z",
+                    "resolved": False,
+                    "metric": "Air Emissions"
+                })
+        
+        return alert_store.add_many(new_alerts, deduplicate=True)
     
-    result = []
-    for alert in new_alerts:
-        alert_obj = Alert(
-            alert_id=alert["alert_id"],
-            type=alert["type"],
-            message=alert["message"],
-            severity=alert["severity"],
-            timestamp=datetime.fromisoformat(alert["timestamp"].replace("Z", "+00:00")),
-            resolved=alert.get("resolved", False)
-        )
-        result.append(alert_obj.to_dict())
-    return result
-
+    return await run_blocking(_generate)
@@ -1,18 +1,22 @@
 """Analytics API router."""
-from fastapi import APIRouter
-from typing import Dict, Any
+from fastapi import APIRouter, Depends
+from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 
+from app.api.deps import get_analytics_service
+from app.core.concurrency import run_blocking
 from app.services.analytics_service import AnalyticsService
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
-analytics_service = AnalyticsService()
 
 
 @router.get("/trends")
-async def get_compliance_trends(days: int = 30) -> Dict[str, Any]:
+async def get_compliance_trends(
+    days: int = 30,
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
+) -> Dict[str, Any]:
     """Get compliance trends over time from actual document analyses."""
-    trends_data = analytics_service.generate_compliance_trends(days=days)
+    trends_data = await run_blocking(analytics_service.generate_compliance_trends, days=days)
     
     # Trends are already formatted as a list from the service
     # Just ensure they're sorted by date
@@ -23,24 +27,51 @@ async def get_compliance_trends(days: int = 30) -> Dict[str, Any]:
         "violations_by_category": trends_data["violations_by_category"],
         "total_violations": trends_data["total_violations"],
         "average_compliance": round(trends_data["average_compliance"], 2),
-        "safety_metrics": analytics_service.calculate_safety_metrics()
+        "safety_metrics": await run_blocking(analytics_service.calculate_safety_metrics)
     }
 
 
 @router.get("/facility-risks")
-async def get_facility_risks() -> Dict[str, Any]:
+async def get_facility_risks(
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
+) -> Dict[str, Any]:
     """Get facility risk data from actual documents and logs."""
-    risk_data = analytics_service.get_facility_risk_data()
+    risk_data = await run_blocking(analytics_service.get_facility_risk_data)
     return {
         "facilities": risk_data
     }
 
 
 @router.get("/recent-activity")
-async def get_recent_activity(limit: int = 5) -> Dict[str, Any]:
+async def get_recent_activity(
+    limit: int = 5,
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
+) -> Dict[str, Any]:
     """Get recent activity from documents and alerts."""
-    activities = analytics_service.get_recent_activity(limit=limit)
+    activities = await run_blocking(analytics_service.get_recent_activity, limit=limit)
     return {
         "activities": activities
     }
 
+
+@router.get("/metrics/rolling")
+async def get_rolling_metrics(
+    facility: Optional[str] = None,
+    metric: Optional[str] = None,
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
+) -> Dict[str, Any]:
+    """Get rolling count, mean, min and max per facility and metric."""
+    return {
+        "windows": list(analytics_service.window_aggregator.windows),
+        "metrics": await run_blocking(analytics_service.get_rolling_metrics, facility=facility, metric=metric)
+    }
+
+
+@router.get("/dashboard")
+async def get_dashboard(
+    days: int = 30,
+    activity_limit: int = 5,
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
+) -> Dict[str, Any]:
+    """Get trends, safety metrics, facility risks and recent activity in one payload."""
+    return await run_blocking(analytics_service.get_dashboard_snapshot, days=days, activity_limit=activity_limit)
@@ -1,127 +1,494 @@
 """Documents API router."""
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from typing import List
-import json
-from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
+from fastapi.routing import APIRoute
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from pathlib import PurePosixPath
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
+import asyncio
+import functools
+import json
 import uuid
+import zipfile
 
 from app.models.document import Document, DocumentAnalysis
-from app.services.nlp_service import NLPService
+from app.api.deps import (
+    get_analysis_engine,
+    get_analysis_store,
+    get_body_store,
+    get_document_store,
+    get_near_duplicate_index,
+    get_nlp_service,
+    get_search_index
+)
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.services.analysis_engine import AnalysisEngine
+from app.services.analysis_store import AnalysisStore
+from app.services.body_store import BodyStore, BodyTooLargeError, StoredBody
+from app.services.document_store import DocumentStore
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.nlp_service import PROMPT_VERSION, NLPService
+from app.services.search_index import SearchIndex, build_match_query
+
+# Allowance for multipart boundaries and headers around an uploaded file
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+def _check_declared_length(request: Request, max_bytes: int):
+    """Reject a request whose Content-Length already exceeds ``max_bytes``."""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + _MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {max_bytes} byte limit")
+
+
+def _body_limit(max_bytes: Callable[[], int]):
+    """Cap an endpoint's request body at ``max_bytes()`` plus multipart overhead."""
+    def decorate(endpoint):
+        endpoint.max_body_bytes = max_bytes
+        return endpoint
+    return decorate
+
+
+class _LimitedBodyRoute(APIRoute):
+    """Route that refuses request bodies over the endpoint's ``_body_limit`` with 413.
+
+    Starlette spools a multipart body in full before the endpoint runs, so
+    the limit is enforced on ``receive`` while the body is still arriving:
+    a declared Content-Length over the limit is refused before anything is
+    read, and chunked or undeclared bodies are cut off as soon as they grow
+    past it.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Any]]:
+        handler = super().get_route_handler()
+        max_bytes = getattr(self.endpoint, "max_body_bytes", None)
+        if max_bytes is None:
+            return handler
+        
+        async def limited_handler(request: Request):
+            limit = max_bytes()
+            _check_declared_length(request, limit)
+            receive = request.receive
+            received = 0
+            
+            async def limited_receive():
+                nonlocal received
+                message = await receive()
+                if message["type"] == "http.request":
+                    received += len(message.get("body", b""))
+                    if received > limit + _MULTIPART_OVERHEAD:
+                        raise HTTPException(status_code=413, detail=f"Upload exceeds the {limit} byte limit")
+                return message
+            
+            return await handler(Request(request.scope, limited_receive))
+        
+        return limited_handler
 
-router = APIRouter(prefix="/documents", tags=["documents"])
-nlp_service = NLPService()
 
-# Load documents from JSON file
-def _load_documents() -> List[dict]:
-    """Load documents from JSON file."""
-    data_path = Path(__file__).parent.parent.parent / "data" / "sample_documents.json"
-    if data_path.exists():
-        with open(data_path, "r") as f:
-            return json.load(f)
-    return []
+router = APIRouter(prefix="/documents", tags=["documents"], route_class=_LimitedBodyRoute)
 
-def _save_documents(documents: List[dict]):
-    """Save documents to JSON file."""
-    data_path = Path(__file__).parent.parent.parent / "data" / "sample_documents.json"
-    with open(data_path, "w") as f:
-        json.dump(documents, f, indent=2)
+_ZIP_TYPES = {"application/zip", "application/x-zip-compressed"}
 
 
 @router.get("/")
-async def get_documents():
-    """Get all documents."""
-    documents = _load_documents()
-    result = []
-    for doc in documents:
-        document = Document(**doc, created_at=datetime.now())
-        result.append(document.to_dict())
-    return result
+async def get_documents(
+    category: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    store: DocumentStore = Depends(get_document_store)
+):
+    """Get all documents, optionally filtered by category and paginated."""
+    documents = await run_blocking(store.list, category=category, limit=limit, offset=offset)
+    return [Document.from_dict(doc).to_dict() for doc in documents]
+
+
+@router.get("/search")
+async def search_documents(
+    q: str,
+    category: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    index: SearchIndex = Depends(get_search_index)
+):
+    """Full-text search over titles, bodies and extracted rules, best matches first.
+    
+    Every word of ``q`` must match (end it with ``*`` for a prefix match).
+    Each hit carries a snippet with the matches wrapped in ``<mark>`` tags.
+    """
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must not be negative")
+    if not build_match_query(q):
+        raise HTTPException(status_code=400, detail="q must contain at least one word")
+    
+    total, results = await run_blocking(index.search, q, category=category, limit=limit, offset=offset)
+    return {
+        "query": q,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "results": results
+    }
+
+
+def _describe_clusters(clusters: List[Dict[str, Any]], store: DocumentStore) -> List[Dict[str, Any]]:
+    """Attach titles to the members of near-duplicate clusters."""
+    described = []
+    for cluster in clusters:
+        documents = []
+        for document_id, similarity in cluster["documents"]:
+            document = store.get(document_id)
+            documents.append({
+                "id": document_id,
+                "title": document.get("title") if document else None,
+                "similarity": similarity
+            })
+        described.append({
+            "representative": cluster["representative"],
+            "category": cluster["category"],
+            "size": len(documents),
+            "documents": documents
+        })
+    return described
+
+
+@router.get("/clusters")
+async def get_document_clusters(
+    threshold: Optional[float] = None,
+    min_size: int = 2,
+    store: DocumentStore = Depends(get_document_store),
+    index: NearDuplicateIndex = Depends(get_near_duplicate_index)
+):
+    """Groups of near-duplicate documents in the same category.
+    
+    Members are linked when their estimated shingle similarity is at least
+    ``threshold``; ``similarity`` is each member's to the cluster's
+    representative. Clusters cover the documents indexed so far: analyses
+    index their document, and stored documents are backfilled in the
+    background at startup.
+    """
+    if threshold is None:
+        threshold = settings.near_duplicate_cluster_threshold
+    if not 0 < threshold <= 1:
+        raise HTTPException(status_code=400, detail="threshold must be between 0 and 1")
+    
+    clusters = await run_blocking(index.clusters, threshold, min_size)
+    return {
+        "threshold": threshold,
+        "indexed": index.count(),
+        "clusters": await run_blocking(_describe_clusters, clusters, store)
+    }
 
 
 @router.get("/{document_id}")
-async def get_document(document_id: str):
+async def get_document(
+    document_id: str,
+    store: DocumentStore = Depends(get_document_store)
+):
     """Get a specific document by ID."""
-    documents = _load_documents()
-    document = next((doc for doc in documents if doc["id"] == document_id), None)
+    document = await run_blocking(store.get, document_id)
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    doc_obj = Document(**document, created_at=datetime.now())
-    return doc_obj.to_dict()
+    return Document.from_dict(document).to_dict()
+
+
+async def _spool(read: Callable[[int], Awaitable[bytes]], body_store: BodyStore) -> StoredBody:
+    """Spool an upload into the body store, mapping rejections to HTTP errors."""
+    try:
+        return await body_store.spool(
+            read,
+            max_bytes=settings.max_upload_bytes,
+            preview_chars=settings.document_preview_chars
+        )
+    except BodyTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _new_document(stored: StoredBody, title: str, category: str, body_store: BodyStore) -> Dict[str, Any]:
+    """Document record for a spooled body; short bodies are kept inline in full."""
+    document_data = {
+        "id": f"DOC-{uuid.uuid4().hex[:8].upper()}",
+        "title": title,
+        "body": stored.preview,
+        "category": category,
+        "published_at": datetime.now().strftime("%Y-%m-%d"),
+        "created_at": datetime.now().isoformat()
+    }
+    if stored.length > len(stored.preview):
+        document_data["body_ref"] = stored.ref
+        document_data["body_length"] = stored.length
+    else:
+        await run_blocking(body_store.discard, stored.ref)
+    return document_data
+
+
+@router.get("/{document_id}/body")
+async def get_document_body(
+    document_id: str,
+    store: DocumentStore = Depends(get_document_store),
+    body_store: BodyStore = Depends(get_body_store)
+):
+    """Full document text, streamed from the body store for large uploads."""
+    document = await run_blocking(store.get, document_id)
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    if document.get("body_ref"):
+        return FileResponse(body_store.path(document["body_ref"]), media_type="text/plain; charset=utf-8")
+    return PlainTextResponse(document["body"])
+
+
+@router.get("/{document_id}/analysis")
+async def get_document_analysis(
+    document_id: str,
+    store: DocumentStore = Depends(get_document_store),
+    analysis_store: AnalysisStore = Depends(get_analysis_store),
+    nlp_service: NLPService = Depends(get_nlp_service)
+):
+    """Stored analysis of a document; never calls the LLM.
+    
+    ``stale`` is true when the body, model or prompt version changed since the
+    analysis was made; POST /documents/analyze refreshes it.
+    """
+    document = await run_blocking(store.get, document_id)
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    record = await run_blocking(analysis_store.get, document_id)
+    
+    if not record:
+        raise HTTPException(status_code=404, detail="Document has not been analyzed")
+    
+    return {
+        **record["analysis"].to_dict(),
+        "prompt_version": record["prompt_version"],
+        "stale": not AnalysisStore.is_current(record, document, nlp_service.analysis_model(), PROMPT_VERSION)
+    }
 
 
 @router.post("/upload")
+@_body_limit(lambda: settings.max_upload_bytes)
 async def upload_document(
     file: UploadFile = File(...),
     title: str = None,
-    category: str = "Regulatory"
+    category: str = "Regulatory",
+    engine: AnalysisEngine = Depends(get_analysis_engine),
+    store: DocumentStore = Depends(get_document_store),
+    body_store: BodyStore = Depends(get_body_store)
 ):
-    """Upload and process a document file."""
+    """Upload and process a document file.
+    
+    The file is streamed into the body store in blocks and validated as
+    UTF-8 on the way, so memory use does not grow with file size. Bodies
+    longer than the preview size stay out of line and are analyzed from
+    their file. Files over ``MAX_UPLOAD_BYTES`` are rejected with 413,
+    as soon as that many bytes have arrived.
+    """
+    stored = await _spool(file.read, body_store)
+    
     try:
-        # Read file content
-        content = await file.read()
-        text_content = content.decode('utf-8')
-        
-        # Generate document ID
-        doc_id = f"DOC-{uuid.uuid4().hex[:8].upper()}"
-        
         # Use filename as title if not provided
-        if not title:
-            title = file.filename or "Uploaded Document"
+        document_data = await _new_document(stored, title or file.filename or "Uploaded Document", category, body_store)
         
-        # Create document
-        document_data = {
-            "id": doc_id,
-            "title": title,
-            "body": text_content,
-            "category": category,
-            "published_at": datetime.now().strftime("%Y-%m-%d")
-        }
-        
-        # Load existing documents
-        documents = _load_documents()
-        
-        # Add new document
-        documents.append(document_data)
+        # Store document
+        await run_blocking(store.add, document_data)
         
-        # Save documents
-        _save_documents(documents)
-        
-        # Analyze the document
-        analysis = nlp_service.analyze_document(
-            document_id=doc_id,
-            text=text_content,
-            category=category
-        )
+        # Analyze the document (also updates the compliance rollups)
+        analysis = await engine.analyze(document_data)
         
         return {
             "success": True,
-            "document": Document(**document_data, created_at=datetime.now()).to_dict(),
+            "document": Document.from_dict(document_data).to_dict(),
             "analysis": analysis.to_dict()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error uploading document: {str(e)}")
 
 
+def _check_batch_size(count: int):
+    """Refuse batches with more than ``UPLOAD_BATCH_MAX_FILES`` documents."""
+    if count > settings.upload_batch_max_files:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the {settings.upload_batch_max_files} document limit"
+        )
+
+
+def _zip_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    """Regular files in an archive, skipping folders and macOS/hidden metadata."""
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and not PurePosixPath(info.filename).name.startswith(".")
+    ]
+
+
+def _is_zip(file: UploadFile) -> bool:
+    """Whether an uploaded file is a zip archive, by name or content type."""
+    return (file.filename or "").lower().endswith(".zip") or file.content_type in _ZIP_TYPES
+
+
+async def _open_batch(
+    files: List[UploadFile],
+    rejected: List[Dict[str, str]]
+) -> List[Tuple[UploadFile, Optional[zipfile.ZipFile], List[zipfile.ZipInfo]]]:
+    """Open the zip archives of a batch and list their members.
+    
+    Returns ``(file, archive, members)`` per usable file, with no archive
+    for plain files; invalid archives are added to ``rejected``.
+    """
+    batch = []
+    for file in files:
+        if not _is_zip(file):
+            batch.append((file, None, []))
+            continue
+        try:
+            archive = await run_blocking(zipfile.ZipFile, file.file)
+        except zipfile.BadZipFile as e:
+            rejected.append({"filename": file.filename, "error": f"Invalid zip archive: {e}"})
+            continue
+        batch.append((file, archive, _zip_members(archive)))
+    return batch
+
+
+async def _spool_batch_file(
+    file: UploadFile,
+    archive: Optional[zipfile.ZipFile],
+    members: List[zipfile.ZipInfo],
+    category: str,
+    body_store: BodyStore,
+    documents: List[Dict[str, Any]],
+    rejected: List[Dict[str, str]]
+):
+    """Spool one uploaded file, or the given members of its archive, into ``documents``."""
+    if archive is None:
+        try:
+            stored = await _spool(file.read, body_store)
+        except HTTPException as e:
+            rejected.append({"filename": file.filename, "error": e.detail})
+            return
+        documents.append(await _new_document(stored, file.filename or "Uploaded Document", category, body_store))
+        return
+    
+    for info in members:
+        name = f"{file.filename}/{info.filename}"
+        if info.file_size > settings.max_upload_bytes:
+            rejected.append({"filename": name, "error": f"Upload exceeds the {settings.max_upload_bytes} byte limit"})
+            continue
+        member = await run_blocking(archive.open, info)
+        try:
+            stored = await _spool(functools.partial(run_blocking, member.read), body_store)
+        except HTTPException as e:
+            rejected.append({"filename": name, "error": e.detail})
+            continue
+        finally:
+            member.close()
+        documents.append(await _new_document(stored, PurePosixPath(info.filename).name, category, body_store))
+
+
+@router.post("/upload-batch")
+@_body_limit(lambda: settings.upload_batch_max_bytes)
+async def upload_documents_batch(
+    files: List[UploadFile] = File(...),
+    category: str = "Regulatory",
+    engine: AnalysisEngine = Depends(get_analysis_engine),
+    store: DocumentStore = Depends(get_document_store),
+    body_store: BodyStore = Depends(get_body_store)
+):
+    """Upload many files (or zip archives of files) and stream their analyses as NDJSON.
+    
+    Every accepted file is stored in one write before analysis starts.
+    Analyses then run concurrently on the analysis engine, sharing the Groq
+    rate limits, and each is streamed as a ``{"event": "document", ...}``
+    line as soon as it finishes (completion order, not upload order).
+    Rejected files produce ``{"event": "rejected", ...}`` lines and the
+    stream ends with a ``{"event": "summary", ...}`` line. More than
+    ``UPLOAD_BATCH_MAX_FILES`` documents (zip members included) are refused
+    with 413 before any of them is stored, as are request bodies over
+    ``UPLOAD_BATCH_MAX_BYTES``.
+    """
+    documents: List[Dict[str, Any]] = []
+    rejected: List[Dict[str, str]] = []
+    _check_batch_size(len(files))
+    batch = await _open_batch(files, rejected)
+    try:
+        _check_batch_size(sum(len(members) if archive else 1 for _, archive, members in batch))
+        for file, archive, members in batch:
+            await _spool_batch_file(file, archive, members, category, body_store, documents, rejected)
+    finally:
+        for _, archive, _ in batch:
+            if archive is not None:
+                archive.close()
+    
+    await run_blocking(store.add_many, documents)
+    
+    async def _results():
+        for item in rejected:
+            yield json.dumps({"event": "rejected", **item}) + "\n"
+        
+        async def _analyze(document: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[DocumentAnalysis], Optional[str]]:
+            try:
+                return document, await engine.analyze(document), None
+            except Exception as e:
+                return document, None, str(e)
+        
+        tasks = [asyncio.ensure_future(_analyze(document)) for document in documents]
+        analyzed = failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                document, analysis, error = await next_done
+                summary = Document.from_dict(document).to_dict()
+                summary.pop("body")
+                if analysis is None:
+                    failed += 1
+                    yield json.dumps({"event": "failed", "document": summary, "error": error}) + "\n"
+                else:
+                    analyzed += 1
+                    yield json.dumps({"event": "document", "document": summary, "analysis": analysis.to_dict()}) + "\n"
+        finally:
+            # Client went away: stop analyses that have not started yet
+            for task in tasks:
+                task.cancel()
+        yield json.dumps({
+            "event": "summary",
+            "stored": len(documents),
+            "analyzed": analyzed,
+            "failed": failed,
+            "rejected": len(rejected)
+        }) + "\n"
+    
+    return StreamingResponse(_results(), media_type="application/x-ndjson")
+
+
 @router.post("/analyze")
-async def analyze_document(document_id: str = None):
-    """Analyze a document using NLP."""
+async def analyze_document(
+    document_id: str = None,
+    force: bool = False,
+    engine: AnalysisEngine = Depends(get_analysis_engine),
+    store: DocumentStore = Depends(get_document_store)
+):
+    """Analyze a document using NLP.
+    
+    The stored analysis is returned while it is current; ``force`` re-analyzes.
+    """
     if not document_id:
         raise HTTPException(status_code=400, detail="document_id parameter is required")
     
-    documents = _load_documents()
-    document = next((doc for doc in documents if doc["id"] == document_id), None)
+    document = await run_blocking(store.get, document_id)
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    analysis = nlp_service.analyze_document(
-        document_id=document_id,
-        text=document["body"],
-        category=document["category"]
-    )
+    analysis = await engine.analyze(document, force)
     
     return analysis.to_dict()
 
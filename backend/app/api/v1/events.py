@@ -0,0 +1,68 @@
+"""Server-sent events API router."""
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_event_bus
+from app.core.config import settings
+from app.services.event_bus import CLOSED, DROPPED, Event, EventBus
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+EVENT_TYPES = {"alert.created", "alert.resolved", "document.analyzed"}
+
+
+def _format(event: Event) -> str:
+    return f"id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n"
+
+
+@router.get("/stream")
+async def stream_events(
+    types: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    bus: EventBus = Depends(get_event_bus)
+):
+    """Push alert and analysis events as server-sent events.
+
+    ``types`` is a comma separated subset of alert.created, alert.resolved
+    and document.analyzed; unknown types are rejected with 400. Reconnecting
+    clients send ``Last-Event-ID`` to receive recent events they missed. A
+    client that falls behind its queue is sent a ``dropped`` event and
+    disconnected.
+    """
+    wanted = {t.strip() for t in types.split(",") if t.strip()} if types else None
+    unknown = sorted(wanted - EVENT_TYPES) if wanted else []
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown event types: {', '.join(unknown)} (expected any of {', '.join(sorted(EVENT_TYPES))})"
+        )
+    last_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    subscription = bus.subscribe(types=wanted, last_event_id=last_id)
+
+    async def _events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    item = await asyncio.wait_for(subscription.queue.get(), settings.event_keepalive_interval)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if item == DROPPED:
+                    yield "event: dropped\ndata: {}\n\n"
+                    return
+                if item == CLOSED:
+                    return
+                yield _format(item)
+        finally:
+            bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
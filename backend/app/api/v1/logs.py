@@ -0,0 +1,104 @@
+"""Operational logs API router."""
+import json
+from typing import AsyncIterator, List, Tuple
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_alert_store, get_log_ingestor
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.services.alert_store import AlertStore
+from app.services.log_ingestor import LogIngestor
+
+router = APIRouter(prefix="/logs", tags=["logs"])
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """Streaming response that is sent while the request body is still arriving.
+
+    StreamingResponse watches for disconnects by reading ``receive``, which
+    would swallow request body chunks; here the body iterator itself drains
+    the request stream and sees disconnects as ``ClientDisconnect``.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _read_batches(request: Request) -> AsyncIterator[Tuple[List[bytes], int]]:
+    """Split the request body into batches of NDJSON lines as chunks arrive.
+
+    Yields ``(lines, oversized)`` after every received chunk, splitting
+    chunks larger than the batch size. Lines longer than the configured limit
+    are dropped and counted in ``oversized``.
+    """
+    batch_size = settings.log_stream_batch_size
+    max_line_bytes = settings.log_stream_max_line_bytes
+    pending = b""
+    discarding = False
+    batch: List[bytes] = []
+    oversized = 0
+
+    async for chunk in request.stream():
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if discarding:
+                # Tail of a line that was already counted as oversized
+                discarding = False
+                continue
+            if len(line) > max_line_bytes:
+                oversized += 1
+                continue
+            batch.append(line)
+            if len(batch) >= batch_size:
+                yield batch, oversized
+                batch, oversized = [], 0
+        if len(pending) > max_line_bytes:
+            if not discarding:
+                oversized += 1
+            discarding = True
+            pending = b""
+        if batch or oversized:
+            yield batch, oversized
+            batch, oversized = [], 0
+
+    if pending and not discarding:
+        yield [pending], 0
+
+
+@router.post("/stream")
+async def stream_logs(
+    request: Request,
+    ingestor: LogIngestor = Depends(get_log_ingestor),
+    alert_store: AlertStore = Depends(get_alert_store)
+):
+    """Ingest chunked NDJSON readings and stream back alerts as NDJSON.
+
+    Each reading is checked against its threshold as soon as its batch
+    arrives. Exceedances within the suppression window of the last alert for
+    the same facility and metric are not stored; stored alerts are emitted
+    as ``{"event": "alert", ...}`` lines and the stream ends with a
+    ``{"event": "summary", ...}`` line.
+    """
+    async def _events():
+        accepted = rejected = alert_count = 0
+        async for lines, oversized in _read_batches(request):
+            count, invalid, alerts = await run_blocking(ingestor.ingest_lines, lines)
+            accepted += count
+            rejected += invalid + oversized
+            if alerts:
+                stored = await run_blocking(alert_store.add_many, alerts, deduplicate=True)
+                alert_count += len(stored)
+                yield "".join(json.dumps({"event": "alert", "alert": alert}) + "\n" for alert in stored)
+        yield json.dumps({
+            "event": "summary",
+            "accepted": accepted,
+            "rejected": rejected,
+            "alerts": alert_count
+        }) + "\n"
+
+    return _DuplexStreamingResponse(_events(), media_type="application/x-ndjson")
@@ -1,41 +1,39 @@
 """Processing API router for synthetic data generation and AI analysis."""
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from typing import Optional
 from datetime import datetime
+from app.api.deps import get_job_manager, get_pipeline, get_services
+from app.core.concurrency import run_blocking
+from app.services.container import ServiceContainer
+from app.services.job_manager import JobManager
 from app.services.processing_pipeline import ProcessingPipeline
 
 router = APIRouter(prefix="/processing", tags=["processing"])
-pipeline = ProcessingPipeline()
 
 
 @router.post("/generate-data")
 async def generate_synthetic_data(
     document_count: int = 10,
     log_count: int = 50,
-    replace_existing: bool = False
+    replace_existing: bool = False,
+    pipeline: ProcessingPipeline = Depends(get_pipeline)
 ):
     """Generate synthetic compliance documents and operational logs."""
     try:
-        from pathlib import Path
-        import json
-        
-        # If replace_existing is False, load existing documents and append
+        # If replace_existing is False, keep the existing corpus when it is large enough
         if not replace_existing:
-            data_path = Path(__file__).parent.parent.parent / "data" / "sample_documents.json"
-            if data_path.exists():
-                with open(data_path, "r") as f:
-                    existing_docs = json.load(f)
-                # Only generate new documents if we need more
-                if len(existing_docs) >= document_count:
-                    return {
-                        "success": True,
-                        "message": f"Using existing {len(existing_docs)} documents. Set replace_existing=true to regenerate.",
-                        "documents_generated": len(existing_docs),
-                        "logs_generated": 0,
-                        "timestamp": datetime.now().isoformat()
-                    }
+            existing_count = await run_blocking(pipeline.document_store.count)
+            # Only generate new documents if we need more
+            if existing_count and existing_count >= document_count:
+                return {
+                    "success": True,
+                    "message": f"Using existing {existing_count} documents. Set replace_existing=true to regenerate.",
+                    "documents_generated": existing_count,
+                    "logs_generated": 0,
+                    "timestamp": datetime.now().isoformat()
+                }
         
-        result = pipeline.generate_synthetic_data(document_count, log_count)
+        result = await run_blocking(pipeline.generate_synthetic_data, document_count, log_count)
         return {
             "success": True,
             "message": f"Generated {result['documents_generated']} documents and {result['logs_generated']} operational logs",
@@ -45,26 +43,32 @@ async def generate_synthetic_data(
         raise HTTPException(status_code=500, detail=f"Error generating data: {str(e)}")
 
 
-@router.post("/analyze-documents")
-async def analyze_all_documents():
-    """Process all documents through AI analysis."""
-    try:
-        analyses = pipeline.process_all_documents()
+@router.post("/analyze-documents", status_code=202)
+async def analyze_all_documents(
+    force: bool = False,
+    pipeline: ProcessingPipeline = Depends(get_pipeline),
+    jobs: JobManager = Depends(get_job_manager)
+):
+    """Start a background job that analyzes every document; poll /processing/jobs/{job_id}.
+    
+    Documents whose stored analysis is current are skipped unless ``force`` is set.
+    """
+    async def _job(progress):
+        analyses = await pipeline.process_all_documents(progress, force)
         return {
-            "success": True,
             "message": f"Analyzed {len(analyses)} documents",
-            "count": len(analyses),
-            "analyses": [a.to_dict() for a in analyses]
+            "count": len(analyses)
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error analyzing documents: {str(e)}")
+    
+    job = await jobs.submit("analyze-documents", _job)
+    return {"success": True, "message": "Document analysis started", **job}
 
 
 @router.post("/generate-alerts")
-async def generate_alerts_from_logs():
+async def generate_alerts_from_logs(pipeline: ProcessingPipeline = Depends(get_pipeline)):
     """Generate alerts from operational logs."""
     try:
-        alerts = pipeline.generate_alerts_from_logs()
+        alerts = await run_blocking(pipeline.generate_alerts_from_logs)
         return {
             "success": True,
             "message": f"Generated {len(alerts)} alerts",
@@ -77,7 +81,8 @@ async def generate_alerts_from_logs():
 
 @router.post("/initialize-samples")
 async def initialize_sample_documents(
-    document_count: int = 20
+    document_count: int = 20,
+    pipeline: ProcessingPipeline = Depends(get_pipeline)
 ):
     """Initialize the application with sample documents (uses synthetic data generator, not hardcoded)."""
     try:
@@ -91,13 +96,10 @@ async def initialize_sample_documents(
         )
         
         # Save documents
-        from pathlib import Path
-        data_dir = Path(__file__).parent.parent.parent / "data"
-        data_dir.mkdir(exist_ok=True)
-        generator.save_documents(documents, data_dir / "sample_documents.json")
+        await run_blocking(pipeline.document_store.replace_all, documents)
         
         # Analyze all documents
-        analyses = pipeline.process_all_documents()
+        analyses = await pipeline.process_all_documents()
         
         return {
             "success": True,
@@ -111,24 +113,76 @@ async def initialize_sample_documents(
         raise HTTPException(status_code=500, detail=f"Error initializing samples: {str(e)}")
 
 
-@router.post("/run-pipeline")
+@router.post("/run-pipeline", status_code=202)
 async def run_full_pipeline(
     generate_new_data: bool = False,
     document_count: int = 10,
-    log_count: int = 50
+    log_count: int = 50,
+    pipeline: ProcessingPipeline = Depends(get_pipeline),
+    jobs: JobManager = Depends(get_job_manager)
 ):
-    """Run the complete processing pipeline."""
-    try:
-        result = pipeline.run_full_pipeline(
+    """Start the complete processing pipeline as a background job; poll /processing/jobs/{job_id}."""
+    async def _job(progress):
+        result = await pipeline.run_full_pipeline(
             generate_new_data=generate_new_data,
             document_count=document_count,
-            log_count=log_count
+            log_count=log_count,
+            progress=progress
         )
+        generation = result["data_generation"] or {}
         return {
-            "success": True,
-            "message": "Pipeline completed successfully",
-            **result
+            "documents_generated": generation.get("documents_generated", 0),
+            "logs_generated": generation.get("logs_generated", 0),
+            "documents_analyzed": result["documents_analyzed"],
+            "alerts_generated": result["alerts_generated"],
+            "alerts": result["alerts"]
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error running pipeline: {str(e)}")
+    
+    job = await jobs.submit(
+        "run-pipeline",
+        _job,
+        params={"generate_new_data": generate_new_data, "document_count": document_count, "log_count": log_count}
+    )
+    return {"success": True, "message": "Pipeline started", **job}
+
+
+@router.get("/jobs")
+async def list_jobs(
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    jobs: JobManager = Depends(get_job_manager)
+):
+    """List background jobs, most recent first."""
+    return {"jobs": await run_blocking(jobs.list, status=status, limit=limit)}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """Get a background job's status, progress and result."""
+    job = await run_blocking(jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """Cancel a queued or running job."""
+    job = await jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 
+@router.get("/stats")
+async def get_processing_stats(services: ServiceContainer = Depends(get_services)):
+    """Get runtime statistics for the analysis pipeline."""
+    cache = services.nlp_service.cache
+    return {
+        "analysis_cache": cache.stats() if cache is not None else None,
+        "rate_limiter": services.nlp_service.rate_limiter.stats(),
+        "file_cache": services.file_cache.stats(),
+        "event_bus": services.event_bus.stats(),
+        "event_loop": services.loop_monitor.stats(),
+        "near_duplicates": {**services.near_duplicates.stats(), **services.analysis_engine.stats()}
+    }
@@ -0,0 +1,106 @@
+"""Off-loop execution of blocking work and event-loop lag monitoring."""
+import asyncio
+import contextvars
+import functools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """Process-wide pool for blocking service calls made from async handlers."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.blocking_pool_workers,
+                thread_name_prefix="blocking"
+            )
+        return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a synchronous call on the blocking pool and await its result.
+
+    Handlers use this for SQLite, file I/O, CPU-heavy analytics and anything
+    that may reach the Groq client, so the event loop keeps serving other
+    requests meanwhile.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_blocking_executor(), call)
+
+
+def shutdown_blocking_executor():
+    """Stop the blocking pool after in-flight calls finish (it is recreated on next use)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a periodic sleep.
+
+    Any lag beyond scheduling noise means a handler ran blocking code on the
+    loop; lags above ``warn_threshold`` seconds are logged.
+    """
+
+    def __init__(self, interval: float = 0.1, warn_threshold: float = 0.25, window: int = 600):
+        """Sample every ``interval`` seconds, keeping the last ``window`` samples."""
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._max_lag = 0.0
+        self._stalls = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start sampling on the running loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - started - self.interval))
+
+    def record(self, lag: float):
+        """Record one lag sample in seconds."""
+        self._samples.append(lag)
+        self._max_lag = max(self._max_lag, lag)
+        if lag >= self.warn_threshold:
+            self._stalls += 1
+            print(f"Warning: Event loop was blocked for {lag * 1000:.0f} ms")
+
+    def stats(self) -> Dict[str, Any]:
+        """Lag statistics in milliseconds over the recent window."""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0, "current_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0, "stalls": 0}
+        return {
+            "samples": len(samples),
+            "current_ms": round(self._samples[-1] * 1000, 2),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2),
+            "max_ms": round(self._max_lag * 1000, 2),
+            "stalls": self._stalls
+        }
@@ -1,5 +1,6 @@
 """Application configuration."""
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,10 +14,90 @@ class Settings:
     debug: bool = True
     api_v1_prefix: str = "/api/v1"
     
+    # Data storage
+    data_dir: Path = Path(os.getenv("DATA_DIR", str(Path(__file__).parent.parent / "data")))
+    database_path: Path = Path(os.getenv("DATABASE_PATH", str(data_dir / "compliance.sqlite3")))
+    
+    # Append-only ingestion log for uploaded documents
+    ingestion_log_dir: Path = Path(os.getenv("INGESTION_LOG_DIR", str(data_dir / "ingest")))
+    ingestion_compaction_interval: float = float(os.getenv("INGESTION_COMPACTION_INTERVAL", "5"))
+    ingestion_fsync: bool = os.getenv("INGESTION_FSYNC", "true").lower() == "true"
+    
+    # Uploaded bodies are spooled to files under body_store_dir; the document row keeps a preview
+    body_store_dir: Path = Path(os.getenv("BODY_STORE_DIR", str(data_dir / "bodies")))
+    max_upload_bytes: int = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+    document_preview_chars: int = int(os.getenv("DOCUMENT_PREVIEW_CHARS", "2000"))
+    upload_batch_max_files: int = int(os.getenv("UPLOAD_BATCH_MAX_FILES", "500"))
+    upload_batch_max_bytes: int = int(os.getenv("UPLOAD_BATCH_MAX_BYTES", str(256 * 1024 * 1024)))
+    # Full-text search (GET /documents/search) indexes at most this many characters of each body
+    search_max_body_chars: int = int(os.getenv("SEARCH_MAX_BODY_CHARS", "1000000"))
+    
+    # Streaming log ingestion (POST /logs/stream)
+    log_stream_batch_size: int = int(os.getenv("LOG_STREAM_BATCH_SIZE", "1000"))
+    log_stream_max_line_bytes: int = int(os.getenv("LOG_STREAM_MAX_LINE_BYTES", "65536"))
+    # Streamed readings are kept in segments of this size under data_dir/streamed_logs;
+    # only the newest sealed segments are kept and replayed when the log store is rebuilt
+    log_stream_segment_bytes: int = int(os.getenv("LOG_STREAM_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+    log_stream_max_segments: int = int(os.getenv("LOG_STREAM_MAX_SEGMENTS", "8"))
+    
+    # Rolling metric windows (GET /analytics/metrics/rolling)
+    rolling_windows: str = os.getenv("ROLLING_WINDOWS", "1h,24h,30d")
+    rolling_window_buckets: int = int(os.getenv("ROLLING_WINDOW_BUCKETS", "60"))
+    
+    # An alert is suppressed within this many seconds of the last one of the same type, facility and metric
+    alert_suppression_window: float = float(os.getenv("ALERT_SUPPRESSION_WINDOW", "3600"))
+    
+    # Server-sent events (GET /events/stream)
+    event_queue_size: int = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+    event_replay_size: int = int(os.getenv("EVENT_REPLAY_SIZE", "256"))
+    event_keepalive_interval: float = float(os.getenv("EVENT_KEEPALIVE_INTERVAL", "15"))
+    
     # Groq API Configuration
     groq_api_key: str = os.getenv("GROQ_API_KEY", "")
     groq_model: str = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+    groq_requests_per_minute: int = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+    groq_tokens_per_minute: int = int(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000"))
+    groq_max_retries: int = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+    
+    # Shared Groq HTTP connection pool
+    groq_max_connections: int = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+    groq_max_keepalive_connections: int = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    groq_keepalive_expiry: float = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "60"))
+    groq_timeout: float = float(os.getenv("GROQ_TIMEOUT", "60"))
+    
+    # JSON file of per-category rule trigger patterns for the pattern fallback
+    rule_patterns_path: str = os.getenv("RULE_PATTERNS_PATH", "")
+    
+    # Analysis cache
+    analysis_cache_enabled: bool = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+    analysis_cache_max_entries: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "5000"))
+    
+    # Thread pool for blocking calls made from async handlers
+    blocking_pool_workers: int = int(os.getenv("BLOCKING_POOL_WORKERS", "16"))
+    # Event-loop lag sampling; lags above the threshold are logged
+    loop_lag_interval: float = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+    loop_lag_warn_ms: float = float(os.getenv("LOOP_LAG_WARN_MS", "250"))
+    
+    # Maximum number of background jobs running at once
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))
+    
+    # Maximum number of documents analyzed in parallel
+    analysis_concurrency: int = int(os.getenv("ANALYSIS_CONCURRENCY", "8"))
+    
+    # Longer documents are split at section boundaries and the chunks analyzed in parallel
+    analysis_chunk_chars: int = int(os.getenv("ANALYSIS_CHUNK_CHARS", "12000"))
+    analysis_chunk_concurrency: int = int(os.getenv("ANALYSIS_CHUNK_CONCURRENCY", "4"))
+    
+    # MinHash/LSH near-duplicate index; a near-duplicate with the same rule clauses
+    # reuses its neighbor's analysis instead of calling the LLM
+    near_duplicate_reuse: bool = os.getenv("NEAR_DUPLICATE_REUSE", "true").lower() == "true"
+    near_duplicate_reuse_threshold: float = float(os.getenv("NEAR_DUPLICATE_REUSE_THRESHOLD", "0.8"))
+    near_duplicate_cluster_threshold: float = float(os.getenv("NEAR_DUPLICATE_CLUSTER_THRESHOLD", "0.5"))
+    minhash_permutations: int = int(os.getenv("MINHASH_PERMUTATIONS", "128"))
+    lsh_bands: int = int(os.getenv("LSH_BANDS", "32"))
+    shingle_size: int = int(os.getenv("SHINGLE_SIZE", "3"))
+    # Only this many leading characters of a body are shingled (rule clauses cover it all)
+    near_duplicate_max_chars: int = int(os.getenv("NEAR_DUPLICATE_MAX_CHARS", "1000000"))
 
 
 settings = Settings()
-
@@ -1,14 +1,37 @@
 """FastAPI application main file."""
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.api.v1 import documents, alerts, analytics, processing
+from app.api.v1 import documents, alerts, analytics, processing, logs, events
+from app.services.container import ServiceContainer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create application-scoped services on startup and release them on shutdown."""
+    services = ServiceContainer()
+    app.state.services = services
+    services.loop_monitor.start()
+    # Open the Groq connection pool off the event loop
+    asyncio.get_running_loop().run_in_executor(None, services.warm_up)
+    services.start_backfill()
+    try:
+        yield
+    finally:
+        await services.loop_monitor.stop()
+        await services.job_manager.shutdown()
+        services.close()
+
 
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
-    description="AI-powered Regulatory Compliance Monitoring API"
+    description="AI-powered Regulatory Compliance Monitoring API",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -18,6 +41,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -25,6 +49,8 @@ app.include_router(documents.router, prefix=settings.api_v1_prefix)
 app.include_router(alerts.router, prefix=settings.api_v1_prefix)
 app.include_router(analytics.router, prefix=settings.api_v1_prefix)
 app.include_router(processing.router, prefix=settings.api_v1_prefix)
+app.include_router(logs.router, prefix=settings.api_v1_prefix)
+app.include_router(events.router, prefix=settings.api_v1_prefix)
 
 
 @app.get("/")
@@ -13,6 +13,8 @@ class Document:
     category: str
     published_at: str
     created_at: Optional[datetime] = None
+    # Set for bodies stored out of line, where ``body`` is only a preview
+    body_length: Optional[int] = None
     
     def to_dict(self):
         """Convert to dictionary."""
@@ -22,8 +24,24 @@ class Document:
             "body": self.body,
             "category": self.category,
             "published_at": self.published_at,
-            "created_at": self.created_at.isoformat() if self.created_at else None
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "body_length": self.body_length if self.body_length is not None else len(self.body),
+            "body_truncated": self.body_length is not None and self.body_length > len(self.body)
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Document":
+        """Build a document from a stored record."""
+        created_at = data.get("created_at")
+        return cls(
+            id=data["id"],
+            title=data["title"],
+            body=data["body"],
+            category=data["category"],
+            published_at=data["published_at"],
+            created_at=datetime.fromisoformat(created_at) if created_at else None,
+            body_length=data.get("body_length") if data.get("body_ref") else None
+        )
 
 
 @dataclass
@@ -35,6 +53,10 @@ class DocumentAnalysis:
     compliance_score: float = 0.0
     risk_level: str = "LOW"
     analyzed_at: datetime = field(default_factory=datetime.now)
+    # Model that produced the analysis (the pattern fallback has its own name)
+    model: Optional[str] = None
+    # Near-duplicate document whose analysis was reused instead of calling the model
+    reused_from: Optional[str] = None
     
     def to_dict(self):
         """Convert to dictionary."""
@@ -44,6 +66,22 @@ class DocumentAnalysis:
             "inconsistencies": self.inconsistencies,
             "compliance_score": self.compliance_score,
             "risk_level": self.risk_level,
-            "analyzed_at": self.analyzed_at.isoformat()
+            "analyzed_at": self.analyzed_at.isoformat(),
+            "model": self.model,
+            "reused_from": self.reused_from
         }
 
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "DocumentAnalysis":
+        """Build an analysis from its dictionary form."""
+        return cls(
+            document_id=data["document_id"],
+            extracted_rules=list(data.get("extracted_rules", [])),
+            inconsistencies=list(data.get("inconsistencies", [])),
+            compliance_score=data.get("compliance_score", 0.0),
+            risk_level=data.get("risk_level", "LOW"),
+            analyzed_at=datetime.fromisoformat(data["analyzed_at"]) if data.get("analyzed_at") else datetime.now(),
+            model=data.get("model"),
+            reused_from=data.get("reused_from")
+        )
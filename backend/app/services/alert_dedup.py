@@ -0,0 +1,94 @@
+"""Structured de-duplication of generated alerts."""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.services.log_store import parse_timestamp_us
+
+AlertKey = Tuple[str, Optional[str], Optional[str]]
+
+# The index is swept for expired entries once it holds at least this many
+_MIN_SWEEP_SIZE = 1024
+
+
+class AlertDeduplicator:
+    """Last alert time per (type, facility, metric), for suppression windows.
+
+    An alert is suppressed while less than ``window_seconds`` have passed
+    since the last alert for the same type, facility and metric, so the
+    window slides with the alerts instead of following clock buckets.
+    Lookups are O(1). Entries older than the window relative to the newest
+    alert are evicted as the index grows; keys that are not in memory are
+    resolved through ``lookup`` (e.g. a query against stored alerts), so the
+    index does not have to be loaded in full on startup.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 3600,
+        lookup: Optional[Callable[[AlertKey], Optional[int]]] = None
+    ):
+        """Create an empty index with the given suppression window."""
+        self.window_us = max(1, int(window_seconds * 1_000_000))
+        self.lookup = lookup
+        self._last: Dict[AlertKey, int] = {}
+        self._newest_us: Optional[int] = None
+        self._sweep_at = _MIN_SWEEP_SIZE
+
+    @staticmethod
+    def key(alert_type: str, facility: Optional[str], metric: Optional[str]) -> AlertKey:
+        """Index key of an alert."""
+        return (alert_type, facility, metric)
+
+    @staticmethod
+    def to_us(timestamp: Any) -> int:
+        """Epoch microseconds of an ISO timestamp (integers are passed through)."""
+        return timestamp if isinstance(timestamp, int) else parse_timestamp_us(timestamp)
+
+    def last_alerted(self, key: AlertKey) -> Optional[int]:
+        """Time of the last alert raised for ``key``, or None."""
+        last = self._last.get(key)
+        if last is None and self.lookup is not None:
+            last = self.lookup(key)
+            if last is not None:
+                self._last[key] = last
+        return last
+
+    def suppresses(self, last_us: Optional[int], timestamp_us: int) -> bool:
+        """Whether an alert at ``timestamp_us`` falls in the window of one raised at ``last_us``."""
+        return last_us is not None and timestamp_us - last_us < self.window_us
+
+    def record(self, key: AlertKey, timestamp_us: int):
+        """Record an alert raised for ``key`` at ``timestamp_us``."""
+        last = self._last.get(key)
+        self._last[key] = timestamp_us if last is None else max(last, timestamp_us)
+        if self._newest_us is None or timestamp_us > self._newest_us:
+            self._newest_us = timestamp_us
+        if len(self._last) >= self._sweep_at:
+            self.evict_expired()
+            self._sweep_at = max(_MIN_SWEEP_SIZE, 2 * len(self._last))
+
+    def evict_expired(self) -> int:
+        """Drop entries whose window ended before the newest recorded alert."""
+        if self._newest_us is None:
+            return 0
+        horizon = self._newest_us - self.window_us
+        expired = [key for key, last in self._last.items() if last <= horizon]
+        for key in expired:
+            del self._last[key]
+        return len(expired)
+
+    def claim(self, alert_type: str, facility: Optional[str], metric: Optional[str], timestamp: Any) -> bool:
+        """Record an alert; returns False if it falls in the window of an earlier one."""
+        key = self.key(alert_type, facility, metric)
+        timestamp_us = self.to_us(timestamp)
+        if self.suppresses(self.last_alerted(key), timestamp_us):
+            return False
+        self.record(key, timestamp_us)
+        return True
+
+    def add(self, alert: Dict[str, Any]):
+        """Record a stored alert dictionary."""
+        key = self.key(alert["type"], alert.get("facility"), alert.get("metric"))
+        self.record(key, self.to_us(alert["timestamp"]))
+
+    def __len__(self) -> int:
+        return len(self._last)
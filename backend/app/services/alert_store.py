@@ -0,0 +1,311 @@
+"""SQLite-backed alert storage."""
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.models.alert import Alert
+from app.services.alert_dedup import AlertDeduplicator, AlertKey
+from app.services.log_store import parse_timestamp_us
+
+SAMPLE_ALERTS = [
+    {
+        "alert_id": "ALERT-52",
+        "type": "ThresholdExceeded",
+        "message": "Air emissions exceeded safe limits. Current: 27 ppm, Threshold: 20 ppm",
+        "severity": "HIGH",
+        "timestamp": "2024-04-12T13:22:00Z",
+        "resolved": False
+    },
+    {
+        "alert_id": "ALERT-53",
+        "type": "ThresholdExceeded",
+        "message": "Water quality pH level exceeded threshold. Current: 11.5, Threshold: 10",
+        "severity": "MEDIUM",
+        "timestamp": "2024-04-13T11:40:00Z",
+        "resolved": False
+    },
+    {
+        "alert_id": "ALERT-54",
+        "type": "ThresholdExceeded",
+        "message": "Temperature exceeded safe operating range. Current: 95°F, Threshold: 90°F",
+        "severity": "HIGH",
+        "timestamp": "2024-04-12T16:45:00Z",
+        "resolved": False
+    },
+    {
+        "alert_id": "ALERT-55",
+        "type": "ThresholdExceeded",
+        "message": "Pressure reading above normal. Current: 120 psi, Threshold: 100 psi",
+        "severity": "MEDIUM",
+        "timestamp": "2024-04-13T10:25:00Z",
+        "resolved": False
+    },
+    {
+        "alert_id": "ALERT-56",
+        "type": "ComplianceViolation",
+        "message": "Missing weekly inspection report for Plant A",
+        "severity": "LOW",
+        "timestamp": "2024-04-14T09:15:00Z",
+        "resolved": False
+    }
+]
+
+AlertListener = Callable[[str, Dict[str, Any]], Any]
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _to_us(value: datetime) -> int:
+    """Epoch microseconds of ``value`` (naive datetimes are taken as UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return parse_timestamp_us(value.isoformat())
+
+
+class AlertStore:
+    """Persistent alert repository backed by SQLite.
+
+    Each row keeps the alert's API representation pre-serialized as JSON, so
+    listings concatenate stored payloads instead of building an ``Alert`` per
+    row. Severity, resolved, facility and timestamp filters are served from
+    indexes, and listings page with an opaque cursor (the last row's ``seq``).
+    Alert ids are ``ALERT-<seq>``.
+
+    The :class:`AlertDeduplicator` index falls back to the stored rows for
+    keys it does not hold, so suppression windows survive restarts without
+    loading every alert on startup. Alerts are recorded in the index only
+    once their insert has committed.
+
+    Listeners registered with :meth:`add_listener` are called with
+    ``("alert.created", alert)`` and ``("alert.resolved", alert)`` after the
+    change is committed.
+    """
+
+    def __init__(self, path: Path, suppression_window: float = 3600):
+        """Open (or create) the alert table in the database at ``path``."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS alerts (
+                seq INTEGER PRIMARY KEY,
+                alert_id TEXT NOT NULL UNIQUE,
+                type TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                resolved INTEGER NOT NULL DEFAULT 0,
+                facility TEXT,
+                metric TEXT,
+                timestamp_us INTEGER NOT NULL,
+                dedup_us INTEGER NOT NULL,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts(severity, seq);
+            CREATE INDEX IF NOT EXISTS idx_alerts_resolved ON alerts(resolved, seq);
+            CREATE INDEX IF NOT EXISTS idx_alerts_facility ON alerts(facility, seq);
+            CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts(timestamp_us);
+            CREATE INDEX IF NOT EXISTS idx_alerts_dedup ON alerts(type, facility, metric, dedup_us);
+            """
+        )
+        self._conn.commit()
+        self._listeners: List[AlertListener] = []
+        self.dedup = AlertDeduplicator(suppression_window, lookup=self._last_alerted_locked)
+
+    def _last_alerted_locked(self, key: AlertKey) -> Optional[int]:
+        """Latest suppression timestamp stored for a de-duplication key (lock held)."""
+        return self._conn.execute(
+            "SELECT MAX(dedup_us) FROM alerts WHERE type = ? AND facility IS ? AND metric IS ?",
+            key
+        ).fetchone()[0]
+
+    def add_listener(self, listener: AlertListener):
+        """Register a callback for alert creation and resolution."""
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, alerts: List[Dict[str, Any]]):
+        for alert in alerts:
+            for listener in self._listeners:
+                try:
+                    listener(event, alert)
+                except Exception as e:
+                    print(f"Warning: Alert listener failed for {alert['alert_id']}: {e}")
+
+    @staticmethod
+    def _serialize(seq: int, alert: Dict[str, Any]) -> Dict[str, Any]:
+        """API representation of an alert stored at ``seq``."""
+        return Alert(
+            alert_id=alert.get("alert_id") or f"ALERT-{seq}",
+            type=alert["type"],
+            message=alert["message"],
+            severity=alert["severity"],
+            timestamp=_parse_datetime(alert["timestamp"]),
+            resolved=alert.get("resolved", False),
+            resolved_at=_parse_datetime(alert.get("resolved_at")),
+            facility=alert.get("facility"),
+            metric=alert.get("metric")
+        ).to_dict()
+
+    def add_many(self, alerts: Iterable[Dict[str, Any]], deduplicate: bool = False) -> List[Dict[str, Any]]:
+        """Store alerts and return their API representation.
+
+        ``dedup_at`` (defaulting to ``timestamp``) is the time an alert is
+        raised at for suppression. With ``deduplicate`` set, alerts raised
+        within the suppression window of the last alert of the same type,
+        facility and metric are dropped; otherwise they are stored and only
+        recorded in the index.
+        """
+        stored = []
+        rows = []
+        raised: Dict[AlertKey, int] = {}
+        with self._lock:
+            next_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM alerts").fetchone()[0]
+            for alert in alerts:
+                dedup_us = parse_timestamp_us(alert.get("dedup_at") or alert["timestamp"])
+                key = self.dedup.key(alert["type"], alert.get("facility"), alert.get("metric"))
+                last = raised[key] if key in raised else self.dedup.last_alerted(key)
+                if deduplicate and self.dedup.suppresses(last, dedup_us):
+                    continue
+                raised[key] = dedup_us if last is None else max(last, dedup_us)
+                payload = self._serialize(next_seq, alert)
+                rows.append((
+                    next_seq,
+                    payload["alert_id"],
+                    payload["type"],
+                    payload["severity"],
+                    int(payload["resolved"]),
+                    payload["facility"],
+                    payload["metric"],
+                    parse_timestamp_us(alert["timestamp"]),
+                    dedup_us,
+                    json.dumps(payload)
+                ))
+                stored.append(payload)
+                next_seq += 1
+            with self._conn:
+                self._conn.executemany(
+                    """INSERT INTO alerts
+                       (seq, alert_id, type, severity, resolved, facility, metric, timestamp_us, dedup_us, payload)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    rows
+                )
+            for key, dedup_us in raised.items():
+                self.dedup.record(key, dedup_us)
+        self._notify("alert.created", stored)
+        return stored
+
+    def seed(self, alerts: Iterable[Dict[str, Any]]) -> int:
+        """Insert alerts that carry their own ``ALERT-<n>`` ids into an empty store."""
+        if self.count():
+            return 0
+        alerts = sorted(alerts, key=lambda alert: int(alert["alert_id"].split("-")[-1]))
+        with self._lock, self._conn:
+            for alert in alerts:
+                seq = int(alert["alert_id"].split("-")[-1])
+                payload = self._serialize(seq, alert)
+                dedup_us = parse_timestamp_us(alert["timestamp"])
+                self._conn.execute(
+                    """INSERT INTO alerts
+                       (seq, alert_id, type, severity, resolved, facility, metric, timestamp_us, dedup_us, payload)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (seq, payload["alert_id"], payload["type"], payload["severity"], int(payload["resolved"]),
+                     payload["facility"], payload["metric"], dedup_us, dedup_us, json.dumps(payload))
+                )
+        return len(alerts)
+
+    def list_json(
+        self,
+        severity: Optional[str] = None,
+        resolved: Optional[bool] = None,
+        facility: Optional[str] = None,
+        alert_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = 100
+    ) -> Tuple[List[str], Optional[str]]:
+        """Serialized alerts in insertion order, plus the cursor of the next page.
+
+        ``limit=None`` returns every matching alert. Raises ValueError for a
+        malformed cursor.
+        """
+        conditions = []
+        params: List[Any] = []
+        if cursor:
+            conditions.append("seq > ?")
+            params.append(int(cursor))
+        if severity:
+            conditions.append("severity = ?")
+            params.append(severity)
+        if resolved is not None:
+            conditions.append("resolved = ?")
+            params.append(int(resolved))
+        if facility:
+            conditions.append("facility = ?")
+            params.append(facility)
+        if alert_type:
+            conditions.append("type = ?")
+            params.append(alert_type)
+        if since is not None:
+            conditions.append("timestamp_us >= ?")
+            params.append(_to_us(since))
+        if until is not None:
+            conditions.append("timestamp_us < ?")
+            params.append(_to_us(until))
+
+        query = "SELECT seq, payload FROM alerts"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY seq LIMIT ?"
+        params.append(limit + 1 if limit is not None else -1)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        if limit is None:
+            return [row["payload"] for row in rows], None
+        next_cursor = str(rows[limit - 1]["seq"]) if len(rows) > limit else None
+        return [row["payload"] for row in rows[:limit]], next_cursor
+
+    def get(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        """Return an alert by id, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM alerts WHERE alert_id = ?", (alert_id,)).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def resolve(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        """Mark an alert resolved; returns the updated alert, or None if unknown."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT payload FROM alerts WHERE alert_id = ?", (alert_id,)).fetchone()
+            if row is None:
+                return None
+            payload = json.loads(row["payload"])
+            changed = not payload["resolved"]
+            if changed:
+                payload["resolved"] = True
+                payload["resolved_at"] = datetime.now().isoformat()
+                self._conn.execute(
+                    "UPDATE alerts SET resolved = 1, payload = ? WHERE alert_id = ?",
+                    (json.dumps(payload), alert_id)
+                )
+        if changed:
+            self._notify("alert.resolved", [payload])
+        return payload
+
+    def count(self) -> int:
+        """Number of stored alerts."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
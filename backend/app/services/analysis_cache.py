@@ -0,0 +1,142 @@
+"""Persistent, content-addressed cache for document analysis results."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.config import settings
+
+
+class AnalysisCache:
+    """SQLite-backed LRU cache of NLP analysis results.
+
+    Entries are keyed by a hash of the document body, category, model name and
+    prompt version, so changing the model or prompt invalidates old entries
+    without any explicit purge.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 5000):
+        """Open (or create) the cache database at ``path``."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS analysis_cache (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_access ON analysis_cache(last_access)"
+        )
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(text: str, category: str, model: str, prompt_version: str) -> str:
+        """Build the content address for an analysis request."""
+        return AnalysisCache.make_stream_key([text], category, model, prompt_version)
+
+    @staticmethod
+    def make_stream_key(blocks: Iterable[str], category: str, model: str, prompt_version: str) -> str:
+        """Like :meth:`make_key` for a text read in blocks; equal texts get equal keys."""
+        digest = hashlib.sha256()
+        for part in (model, prompt_version, category):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        for block in blocks:
+            digest.update(block.encode("utf-8"))
+        digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload for ``key`` and mark it as recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE analysis_cache SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, payload: Dict[str, Any]):
+        """Store ``payload`` under ``key``, evicting least recently used entries."""
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, payload, last_access) VALUES (?, ?, ?)",
+                (key, json.dumps(payload), time.time())
+            )
+            if not exists:
+                self._entries += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries above ``max_entries`` (lock held)."""
+        overflow = self._entries - self.max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            """DELETE FROM analysis_cache WHERE key IN (
+                SELECT key FROM analysis_cache ORDER BY last_access ASC LIMIT ?
+            )""",
+            (overflow,)
+        )
+        self._entries -= overflow
+        self.evictions += overflow
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM analysis_cache")
+            self._conn.commit()
+            self._entries = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+_default_cache: Optional[AnalysisCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> Optional[AnalysisCache]:
+    """Return the process-wide analysis cache, or None when caching is disabled."""
+    global _default_cache
+    if not settings.analysis_cache_enabled:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = AnalysisCache(
+                settings.data_dir / "analysis_cache.sqlite3",
+                max_entries=settings.analysis_cache_max_entries
+            )
+        return _default_cache
@@ -0,0 +1,143 @@
+"""Asynchronous, bounded-concurrency document analysis."""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.models.document import DocumentAnalysis
+from app.services.analysis_store import AnalysisStore
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.nlp_service import PROMPT_VERSION, NLPService
+
+AnalysisListener = Callable[[Dict[str, Any], DocumentAnalysis], None]
+
+
+class AnalysisEngine:
+    """Run NLP analyses concurrently while preserving input order.
+    
+    The Groq client is synchronous, so each analysis runs on a dedicated
+    worker thread; a semaphore caps the number of in-flight analyses so wall
+    clock time scales with ``concurrency`` rather than corpus size.
+    
+    Listeners registered with :meth:`add_listener` are called on the worker
+    thread with every ``(document, analysis)`` pair, which keeps derived data
+    such as compliance rollups in step with fresh analyses.
+    
+    With an :class:`AnalysisStore` attached, each analysis is persisted and a
+    stored one is returned instead of re-analyzing while the body, model and
+    prompt version are unchanged (unless ``force`` is set). Reused analyses
+    do not notify listeners.
+    
+    With a :class:`NearDuplicateIndex` as well, every document is indexed as
+    it is analyzed, and one whose nearest analyzed neighbor is at least
+    ``near_duplicate_reuse_threshold`` alike and has the same rule clauses
+    gets a copy of that neighbor's analysis instead of a model call.
+    """
+    
+    def __init__(
+        self,
+        nlp_service: NLPService,
+        concurrency: Optional[int] = None,
+        analysis_store: Optional[AnalysisStore] = None,
+        near_duplicates: Optional[NearDuplicateIndex] = None
+    ):
+        """Initialize the engine with a worker pool sized to ``concurrency``."""
+        self.nlp_service = nlp_service
+        self.analysis_store = analysis_store
+        self.near_duplicates = near_duplicates
+        self._reused = 0
+        self._llm_calls_saved = 0
+        self._stats_lock = threading.Lock()
+        self.concurrency = max(1, concurrency or settings.analysis_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix="analysis"
+        )
+        self._listeners: List[AnalysisListener] = []
+    
+    def add_listener(self, listener: AnalysisListener):
+        """Register a callback invoked after each completed analysis."""
+        self._listeners.append(listener)
+    
+    def _analyze_and_notify(self, document: Dict[str, Any], force: bool = False) -> DocumentAnalysis:
+        """Analyze a document and notify listeners (runs on a worker thread)."""
+        if self.analysis_store is not None and not force:
+            stored = self.analysis_store.get_current(document, self.nlp_service.analysis_model(), PROMPT_VERSION)
+            if stored is not None:
+                return stored
+        analysis = None
+        if self.near_duplicates is not None:
+            self.near_duplicates.add(document, self.nlp_service.record_blocks(document))
+            if self.analysis_store is not None and settings.near_duplicate_reuse and not force:
+                analysis = self._reuse_near_duplicate(document)
+        if analysis is None:
+            analysis = self.nlp_service.analyze_record(document, refresh=force)
+        if self.analysis_store is not None:
+            self.analysis_store.save(document, analysis, analysis.model, PROMPT_VERSION)
+        for listener in self._listeners:
+            try:
+                listener(document, analysis)
+            except Exception as e:
+                print(f"Warning: Analysis listener failed for {document['id']}: {e}")
+        return analysis
+    
+    def _reuse_near_duplicate(self, document: Dict[str, Any]) -> Optional[DocumentAnalysis]:
+        """Copy the current analysis of the most similar near-duplicate with the same rules, if any."""
+        model = self.nlp_service.analysis_model()
+        neighbors = self.near_duplicates.nearest(
+            document["id"], settings.near_duplicate_reuse_threshold, same_rules=True
+        )
+        for neighbor, _ in neighbors:
+            record = self.analysis_store.get(neighbor.document_id)
+            # Only reuse analyses the model actually produced, so copies never chain
+            if (
+                record is None
+                or record["analysis"].reused_from is not None
+                or record["body_hash"] != neighbor.body_hash
+                or record["model"] != model
+                or record["prompt_version"] != PROMPT_VERSION
+            ):
+                continue
+            with self._stats_lock:
+                self._reused += 1
+                self._llm_calls_saved += self.nlp_service.llm_calls(
+                    document.get("body_length") or len(document["body"])
+                )
+            return self.nlp_service.reuse_analysis(record["analysis"], document)
+        return None
+    
+    def stats(self) -> Dict[str, int]:
+        """Analyses reused from near-duplicates and the model calls that saved."""
+        with self._stats_lock:
+            return {"reused_analyses": self._reused, "llm_calls_saved": self._llm_calls_saved}
+    
+    async def analyze(self, document: Dict[str, Any], force: bool = False) -> DocumentAnalysis:
+        """Analyze a single document without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._analyze_and_notify, document, force)
+    
+    async def analyze_many(
+        self,
+        documents: Sequence[Dict[str, Any]],
+        on_complete: Optional[Callable[[Dict[str, Any], DocumentAnalysis], None]] = None,
+        force: bool = False
+    ) -> List[DocumentAnalysis]:
+        """Analyze documents in parallel; results are returned in input order.
+        
+        ``on_complete`` is called on the event loop as each document finishes.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def _bounded(document: Dict[str, Any]) -> DocumentAnalysis:
+            async with semaphore:
+                analysis = await self.analyze(document, force)
+            if on_complete is not None:
+                on_complete(document, analysis)
+            return analysis
+        
+        return list(await asyncio.gather(*(_bounded(doc) for doc in documents)))
+    
+    def shutdown(self):
+        """Stop the worker pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,120 @@
+"""Persisted document analyses."""
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.models.document import DocumentAnalysis
+
+
+def body_hash(document: Dict[str, Any]) -> str:
+    """SHA-256 of a document's full body (the body reference for out-of-line bodies)."""
+    if document.get("body_ref"):
+        return document["body_ref"]
+    return hashlib.sha256(document["body"].encode("utf-8")).hexdigest()
+
+
+class AnalysisStore:
+    """The latest analysis of every document and what produced it.
+
+    Each row records the body hash, model and prompt version the analysis was
+    computed from, so callers can tell whether it still matches the document
+    and reuse it instead of calling the LLM again. The table lives next to
+    ``documents`` so analyses of deleted documents can be pruned with a join.
+    """
+
+    def __init__(self, path: Path):
+        """Open (or create) the analysis table in the database at ``path``."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS document_analyses (
+                document_id TEXT PRIMARY KEY,
+                body_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                analyzed_at TEXT NOT NULL,
+                payload TEXT NOT NULL
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "analysis": DocumentAnalysis.from_dict(json.loads(row["payload"])),
+            "body_hash": row["body_hash"],
+            "model": row["model"],
+            "prompt_version": row["prompt_version"],
+            "analyzed_at": row["analyzed_at"]
+        }
+
+    def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Stored analysis of a document with its body hash, model and prompt version, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM document_analyses WHERE document_id = ?", (document_id,)
+            ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def get_current(self, document: Dict[str, Any], model: str, prompt_version: str) -> Optional[DocumentAnalysis]:
+        """Stored analysis if it was produced from this body by ``model`` and ``prompt_version``."""
+        record = self.get(document["id"])
+        if record is None or not self.is_current(record, document, model, prompt_version):
+            return None
+        return record["analysis"]
+
+    @staticmethod
+    def is_current(record: Dict[str, Any], document: Dict[str, Any], model: str, prompt_version: str) -> bool:
+        """Whether a stored record still matches the document body, model and prompt version."""
+        return (
+            record["body_hash"] == body_hash(document)
+            and record["model"] == model
+            and record["prompt_version"] == prompt_version
+        )
+
+    def save(self, document: Dict[str, Any], analysis: DocumentAnalysis, model: str, prompt_version: str):
+        """Store ``analysis`` as the latest analysis of ``document``."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO document_analyses
+                   (document_id, body_hash, model, prompt_version, analyzed_at, payload)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (
+                    document["id"],
+                    body_hash(document),
+                    model,
+                    prompt_version,
+                    analysis.analyzed_at.isoformat(),
+                    json.dumps(analysis.to_dict())
+                )
+            )
+
+    def prune_orphans(self) -> int:
+        """Delete analyses of documents that no longer exist."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                """DELETE FROM document_analyses
+                   WHERE document_id NOT IN (SELECT id FROM documents)"""
+            ).rowcount
+
+    def on_documents(self, event: str, documents: List[Dict[str, Any]]):
+        """Document store listener: drop analyses of documents a corpus replacement removed."""
+        if event == "documents.replaced":
+            self.prune_orphans()
+
+    def count(self) -> int:
+        """Number of stored analyses."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM document_analyses").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,165 +1,180 @@
 """Analytics service for compliance monitoring."""
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import json
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
 import os
-from pathlib import Path
+import threading
 from collections import defaultdict
 
+import numpy as np
+
+from app.core.config import settings
+from app.services.analysis_store import AnalysisStore
+from app.services.compliance_rollups import ComplianceRollups
+from app.services.document_store import DocumentStore
+from app.services.file_cache import FileCache, get_file_cache
+from app.services.ingestion_log import IngestionLog
+from app.services.log_store import ColumnarLogStore
 from app.services.nlp_service import NLPService
+from app.services.window_aggregator import WindowAggregator, parse_window
 
 
 class AnalyticsService:
     """Analytics service for compliance monitoring."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        nlp_service: Optional[NLPService] = None,
+        document_store: Optional[DocumentStore] = None,
+        file_cache: Optional[FileCache] = None,
+        rollups: Optional[ComplianceRollups] = None,
+        window_aggregator: Optional[WindowAggregator] = None,
+        analysis_store: Optional[AnalysisStore] = None
+    ):
         """Initialize analytics service."""
-        self.logs_path = Path(__file__).parent.parent / "data" / "operational_logs.json"
-        self.documents_path = Path(__file__).parent.parent / "data" / "sample_documents.json"
-        self.nlp_service = NLPService()
+        self.logs_path = settings.data_dir / "operational_logs.json"
+        # Streamed readings rotate through size-bounded segments; only the newest
+        # ``log_stream_max_segments`` sealed segments are kept and replayed
+        self.streamed_logs = IngestionLog(
+            settings.data_dir / "streamed_logs",
+            max_segment_bytes=settings.log_stream_segment_bytes,
+            fsync=False,
+            max_segments=settings.log_stream_max_segments
+        )
+        legacy_streamed_logs = settings.data_dir / "streamed_logs.ndjson"
+        if legacy_streamed_logs.exists():
+            self.streamed_logs.adopt(legacy_streamed_logs)
+        self.file_cache = file_cache or get_file_cache()
+        self.nlp_service = nlp_service or NLPService()
+        self.document_store = document_store or DocumentStore(settings.database_path)
+        self.rollups = rollups or ComplianceRollups(settings.database_path)
+        self.analysis_store = analysis_store or AnalysisStore(settings.database_path)
+        self.window_aggregator = window_aggregator or WindowAggregator(
+            {spec.strip(): parse_window(spec) for spec in settings.rolling_windows.split(",") if spec.strip()},
+            buckets=settings.rolling_window_buckets
+        )
+        self._log_store: Optional[ColumnarLogStore] = None
+        self._log_store_source = None
+        self._log_store_lock = threading.Lock()
     
     def _load_logs(self) -> List[Dict[str, Any]]:
-        """Load operational logs from JSON file."""
-        if self.logs_path.exists():
-            with open(self.logs_path, "r") as f:
-                return json.load(f)
-        return []
-    
-    def _load_documents(self) -> List[Dict[str, Any]]:
-        """Load documents from JSON file."""
-        if self.documents_path.exists():
-            with open(self.documents_path, "r") as f:
-                return json.load(f)
-        return []
+        """Load operational logs (read-only) from the JSON file via the file cache."""
+        return self.file_cache.load_json(self.logs_path)
     
-    def _analyze_all_documents(self) -> List[Dict[str, Any]]:
-        """Analyze all documents and return analysis results."""
-        documents = self._load_documents()
-        analyses = []
+    def _load_log_store(self) -> ColumnarLogStore:
+        """Columnar view of the operational logs, rebuilt only when the file changes.
         
-        for doc in documents:
-            analysis = self.nlp_service.analyze_document(
-                document_id=doc["id"],
-                text=doc["body"],
-                category=doc["category"]
-            )
-            analyses.append({
-                "document_id": doc["id"],
-                "category": doc["category"],
-                "compliance_score": analysis.compliance_score,
-                "risk_level": analysis.risk_level,
-                "inconsistencies_count": len(analysis.inconsistencies),
-                "published_at": doc.get("published_at", datetime.now().strftime("%Y-%m-%d"))
-            })
-        
-        return analyses
+        Streamed readings are replayed after the file's readings on rebuild.
+        """
+        logs = self._load_logs()
+        with self._log_store_lock:
+            return self._load_log_store_locked(logs)
+    
+    def _load_log_store_locked(self, logs) -> ColumnarLogStore:
+        """Rebuild the log store if ``logs`` is a new file snapshot (lock held)."""
+        if self._log_store is None or self._log_store_source is not logs:
+            store = ColumnarLogStore.from_records(logs)
+            for segment in self.streamed_logs.segments():
+                if segment.exists():
+                    store.append_many(IngestionLog.read_segment(segment))
+            self.window_aggregator.reset()
+            self.window_aggregator.add_rows(store, 0, len(store))
+            self._log_store = store
+            self._log_store_source = logs
+        return self._log_store
     
-    def calculate_historical_average(self, metric: str, days: int = 30) -> float:
-        """Calculate historical average for a metric (mocked)."""
+    def append_logs(self, records: List[Dict[str, Any]]) -> Tuple[ColumnarLogStore, int, int]:
+        """Persist streamed readings and append them to the log store.
+        
+        Returns the store and the ``(start, end)`` row range of the new readings.
+        """
         logs = self._load_logs()
-        metric_logs = [log for log in logs if log.get("metric") == metric]
+        with self._log_store_lock:
+            store = self._load_log_store_locked(logs)
+            self.streamed_logs.append(records)
+            start, end = store.append_many(records)
+            self.window_aggregator.add_rows(store, start, end)
+        return store, start, end
+    
+    def _load_documents(self) -> List[Dict[str, Any]]:
+        """Load documents from the document store."""
+        return self.document_store.list()
+    
+    def calculate_historical_average(self, metric: str, days: int = 30) -> Optional[float]:
+        """Average of a metric over the last ``days`` days, or None without readings.
         
-        if not metric_logs:
-            # Return mock average
-            return 15.5
+        Served from the rolling window aggregates when ``days`` matches a
+        configured window, otherwise computed from the log store.
+        """
+        store = self._load_log_store()
+        window = self.window_aggregator.window_label(days * 86_400)
+        if window is not None:
+            return self.window_aggregator.combined(window, metric=metric)["mean"]
         
-        values = [log["value"] for log in metric_logs]
-        return sum(values) / len(values) if values else 0.0
+        code = store.metrics.lookup(metric)
+        if code < 0:
+            return None
+        columns = store.columns()
+        since_us = int((datetime.now().timestamp() - days * 86_400) * 1_000_000)
+        values = columns["value"].compress((columns["metric"] == code) & (columns["timestamp"] >= since_us))
+        return float(values.mean()) if values.size else None
+    
+    def get_rolling_metrics(self, facility: Optional[str] = None, metric: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rolling count, mean, min and max per facility and metric for every window."""
+        self._load_log_store()
+        return self.window_aggregator.rolling(facility=facility, metric=metric)
     
     def detect_threshold_deviations(self) -> List[Dict[str, Any]]:
         """Detect threshold deviations from operational logs."""
-        logs = self._load_logs()
-        deviations = []
+        store = self._load_log_store()
+        columns = store.columns()
         
-        for log in logs:
-            value = log.get("value", 0)
-            threshold = log.get("threshold", 0)
-            
-            if value > threshold:
-                deviations.append({
-                    "metric": log.get("metric"),
-                    "value": value,
-                    "threshold": threshold,
-                    "deviation": value - threshold,
-                    "percentage": ((value - threshold) / threshold) * 100,
-                    "timestamp": log.get("timestamp"),
-                    "facility": log.get("facility")
-                })
+        rows = np.flatnonzero(columns["excess"])
+        deviation = columns["excess"][rows]
+        exceeded_thresholds = columns["threshold"][rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = np.where(exceeded_thresholds != 0, deviation / exceeded_thresholds * 100, 0.0)
+        
+        deviations = []
+        for i, row in enumerate(rows):
+            log = store.record(row)
+            deviations.append({
+                "metric": log["metric"],
+                "value": log["value"],
+                "threshold": log["threshold"],
+                "unit": log["unit"],
+                "deviation": float(deviation[i]),
+                "percentage": float(percentage[i]),
+                "timestamp": log["timestamp"],
+                "facility": log["facility"]
+            })
         
         return deviations
     
-    def generate_compliance_trends(self, days: int = 30) -> Dict[str, Any]:
-        """Generate compliance trends over time from actual document analyses only.
+    def _refresh_rollups(self):
+        """Fold stored analyses of documents the rollups have not seen yet.
         
-        This method analyzes ALL uploaded documents and calculates real violations
-        from inconsistencies detected by AI. No mock or hardcoded data is used.
+        Uploads and re-analyses update the rollups as they happen, and
+        replacing the corpus retracts deleted documents; this only records
+        analyses of documents imported with one already stored, in a single
+        join. It never analyzes: documents without a stored analysis are left
+        out until the analysis engine has processed them.
         """
-        # Always reload documents fresh (no caching)
-        documents = self._load_documents()
-        
-        if not documents:
-            # Return empty trends if no documents
-            return {
-                "trends": [],
-                "violations_by_category": {},
-                "total_violations": 0,
-                "average_compliance": 0
-            }
-        
-        # Analyze all documents to get real data
-        analyses = self._analyze_all_documents()
-        
-        # Group analyses by date (published_at)
-        trends_by_date = defaultdict(lambda: {
-            "scores": [],
-            "violations": 0,
-            "inspections": 0
-        })
-        
-        # Calculate violations by category from inconsistencies
-        violations_by_category = defaultdict(int)
-        
-        # Get date range for filtering
-        base_date = datetime.now() - timedelta(days=days)
+        self.rollups.record_stored_analyses()
+    
+    def generate_compliance_trends(self, days: int = 30, refresh: bool = True) -> Dict[str, Any]:
+        """Generate compliance trends over time from actual document analyses only.
         
-        for analysis in analyses:
-            date_str = analysis["published_at"]
-            
-            try:
-                doc_date = datetime.strptime(date_str, "%Y-%m-%d")
-                # Only include documents within the date range
-                if doc_date < base_date:
-                    continue
-            except ValueError:
-                # If date parsing fails, use today's date
-                date_str = datetime.now().strftime("%Y-%m-%d")
-            
-            # Add compliance score
-            trends_by_date[date_str]["scores"].append(analysis["compliance_score"])
-            
-            # Count violations from actual document inconsistencies detected by AI
-            # Each inconsistency found in a document = 1 violation
-            violations_count = analysis["inconsistencies_count"]
-            trends_by_date[date_str]["violations"] += violations_count
-            
-            # Count violations by category
-            if violations_count > 0:
-                violations_by_category[analysis["category"]] += violations_count
-            
-            # Count inspections (documents analyzed)
-            trends_by_date[date_str]["inspections"] += 1
+        Trends are a range read over daily rollups that are maintained as
+        documents are uploaded and analyzed, so the cost grows with ``days``
+        rather than with corpus size. Violations are the inconsistencies
+        detected by AI. No mock or hardcoded data is used.
+        """
+        if refresh:
+            self._refresh_rollups()
+        rollup = self.rollups.trends(days)
         
-        # Only include dates that have actual document data - NO interpolation
-        trends = []
-        for date_str, data in sorted(trends_by_date.items()):
-            if data["scores"]:  # Only include dates with actual documents
-                avg_score = sum(data["scores"]) / len(data["scores"])
-                trends.append({
-                    "date": date_str,
-                    "compliance_percentage": round(avg_score, 2),
-                    "violations": data["violations"],
-                    "inspections": data["inspections"]
-                })
+        # Only dates that have actual document data are included - NO interpolation
+        trends = rollup["trends"]
         
         # Calculate total violations (only from actual data)
         total_violations = sum(t["violations"] for t in trends)
@@ -170,33 +185,37 @@ class AnalyticsService:
         
         return {
             "trends": trends,
-            "violations_by_category": dict(violations_by_category),
+            "violations_by_category": rollup["violations_by_category"],
             "total_violations": total_violations,
             "average_compliance": round(average_compliance, 2)
         }
     
-    def calculate_safety_metrics(self) -> Dict[str, Any]:
+    def calculate_safety_metrics(self, log_store: Optional[ColumnarLogStore] = None) -> Dict[str, Any]:
         """Calculate safety metrics (mocked)."""
-        logs = self._load_logs()
+        if log_store is None:
+            log_store = self._load_log_store()
+        excess = log_store.columns()["excess"]
         
-        total_metrics = len(logs)
-        threshold_exceeded = sum(1 for log in logs if log.get("value", 0) > log.get("threshold", 0))
+        total_metrics = len(excess)
+        threshold_exceeded = int(np.count_nonzero(excess))
         
         return {
             "total_metrics_tracked": total_metrics,
             "threshold_exceeded_count": threshold_exceeded,
             "compliance_rate": ((total_metrics - threshold_exceeded) / total_metrics * 100) if total_metrics > 0 else 100.0,
-            "average_deviation": sum(
-                max(0, log.get("value", 0) - log.get("threshold", 0))
-                for log in logs
-            ) / total_metrics if total_metrics > 0 else 0.0
+            "average_deviation": float(excess.sum()) / total_metrics if total_metrics > 0 else 0.0
         }
     
-    def get_facility_risk_data(self) -> List[Dict[str, Any]]:
+    def get_facility_risk_data(
+        self,
+        log_store: Optional[ColumnarLogStore] = None,
+        refresh: bool = True
+    ) -> List[Dict[str, Any]]:
         """Calculate facility risk scores from actual document analyses and operational logs."""
-        documents = self._load_documents()
-        logs = self._load_logs()
-        analyses = self._analyze_all_documents()
+        if refresh:
+            self._refresh_rollups()
+        if log_store is None:
+            log_store = self._load_log_store()
         
         # Group by facility (extract from logs or use document categories as proxy)
         facility_risks = defaultdict(lambda: {
@@ -206,26 +225,26 @@ class AnalyticsService:
             "total_logs": 0
         })
         
-        # Calculate violations per facility from documents
-        for analysis in analyses:
+        # Calculate violations per facility from the analyzed documents' rollups
+        for category, totals in self.rollups.category_totals().items():
             # Use category as facility proxy, or extract from document metadata
-            category = analysis.get("category", "Unknown")
-            facility_risks[category]["violations"] += analysis["inconsistencies_count"]
-            facility_risks[category]["documents"] += 1
+            facility_risks[category]["violations"] += totals["violations"]
+            facility_risks[category]["documents"] += totals["documents"]
         
-        # Calculate exceedances from operational logs
-        for log in logs:
-            facility = log.get("facility", "Unknown")
-            if facility not in facility_risks:
-                facility_risks[facility] = {
-                    "violations": 0,
-                    "documents": 0,
-                    "exceedances": 0,
-                    "total_logs": 0
-                }
-            facility_risks[facility]["total_logs"] += 1
-            if log.get("value", 0) > log.get("threshold", 0):
-                facility_risks[facility]["exceedances"] += 1
+        # Calculate exceedances from operational logs (facility codes are in first-seen order)
+        columns = log_store.columns()
+        facility_count = len(log_store.facilities)
+        total_logs = np.bincount(columns["facility"], minlength=facility_count)
+        exceedances = np.bincount(
+            columns["facility"],
+            weights=columns["excess"] > 0,
+            minlength=facility_count
+        )
+        for code, facility in enumerate(log_store.facilities.values):
+            if total_logs[code] == 0:
+                continue
+            facility_risks[facility]["total_logs"] += int(total_logs[code])
+            facility_risks[facility]["exceedances"] += int(exceedances[code])
         
         # Convert to risk scores (0-100)
         risk_data = []
@@ -256,14 +275,19 @@ class AnalyticsService:
         # If no data, return empty list (frontend will handle empty state)
         return risk_data[:6]  # Limit to 6 facilities
     
-    def get_recent_activity(self, limit: int = 5) -> List[Dict[str, Any]]:
+    def get_recent_activity(
+        self,
+        limit: int = 5,
+        log_store: Optional[ColumnarLogStore] = None
+    ) -> List[Dict[str, Any]]:
         """Get recent activity from documents and alerts."""
-        documents = self._load_documents()
-        logs = self._load_logs()
+        documents = self.document_store.recent(10)
+        if log_store is None:
+            log_store = self._load_log_store()
         activities = []
         
         # Add document uploads/analyses
-        for doc in documents[-10:]:  # Last 10 documents
+        for doc in documents:  # Last 10 documents
             activities.append({
                 "id": f"doc-{doc['id']}",
                 "action": f"Document Analyzed: {doc['title'][:30]}...",
@@ -273,7 +297,7 @@ class AnalyticsService:
             })
         
         # Add threshold exceedances from logs
-        for log in logs[-10:]:  # Last 10 logs
+        for log in log_store.tail(10):  # Last 10 logs
             if log.get("value", 0) > log.get("threshold", 0):
                 activities.append({
                     "id": f"log-{log['id']}",
@@ -287,6 +311,19 @@ class AnalyticsService:
         activities.sort(key=lambda x: x["time"], reverse=True)
         return activities[:limit]
     
+    def get_dashboard_snapshot(self, days: int = 30, activity_limit: int = 5) -> Dict[str, Any]:
+        """Compute every dashboard widget from one rollup refresh and one log load."""
+        self._refresh_rollups()
+        log_store = self._load_log_store()
+        
+        trends_data = self.generate_compliance_trends(days=days, refresh=False)
+        return {
+            **trends_data,
+            "safety_metrics": self.calculate_safety_metrics(log_store=log_store),
+            "facilities": self.get_facility_risk_data(log_store=log_store, refresh=False),
+            "activities": self.get_recent_activity(limit=activity_limit, log_store=log_store)
+        }
+    
     def _format_time_ago(self, timestamp_str: str) -> str:
         """Format timestamp as relative time (e.g., '2h ago')."""
         try:
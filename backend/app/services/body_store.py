@@ -0,0 +1,130 @@
+"""Content-addressed file storage for large document bodies."""
+import codecs
+import hashlib
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator, Optional
+
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+
+
+class BodyTooLargeError(ValueError):
+    """Raised when a spooled body exceeds the size limit."""
+
+
+@dataclass
+class StoredBody:
+    """A body written to the store."""
+    ref: str
+    size: int
+    length: int
+    preview: str
+
+
+class BodyStore:
+    """Document bodies kept as UTF-8 files named by their SHA-256.
+
+    Uploads are spooled to a temporary file in fixed-size blocks, validated
+    with an incremental UTF-8 decoder and renamed into place, so memory use
+    per upload is one block however large the file is. Identical bodies share
+    one file.
+    """
+
+    def __init__(self, directory: Path):
+        """Store bodies under ``directory``."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, ref: str) -> Path:
+        """Location of the body stored under ``ref``."""
+        if len(ref) != 64 or not all(c in "0123456789abcdef" for c in ref):
+            raise ValueError(f"Invalid body reference: {ref!r}")
+        return self.directory / ref[:2] / f"{ref}.txt"
+
+    async def spool(
+        self,
+        read: Callable[[int], Awaitable[bytes]],
+        max_bytes: int,
+        block_size: int = 1024 * 1024,
+        preview_chars: int = 2000
+    ) -> StoredBody:
+        """Stream ``read(block_size)`` results into the store until it returns b"".
+
+        Raises BodyTooLargeError once more than ``max_bytes`` arrive and
+        ValueError if the content is not valid UTF-8; nothing is stored then.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        digest = hashlib.sha256()
+        size = 0
+        length = 0
+        preview = []
+        preview_length = 0
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".spool")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    block = await read(block_size)
+                    if not block:
+                        break
+                    size += len(block)
+                    if size > max_bytes:
+                        raise BodyTooLargeError(f"Document exceeds the {max_bytes} byte upload limit")
+                    try:
+                        text = decoder.decode(block)
+                    except UnicodeDecodeError as e:
+                        raise ValueError(f"Document is not valid UTF-8 text: {e}") from e
+                    length += len(text)
+                    if preview_length < preview_chars:
+                        preview.append(text[:preview_chars - preview_length])
+                        preview_length += len(preview[-1])
+                    digest.update(block)
+                    await run_blocking(f.write, block)
+                try:
+                    decoder.decode(b"", final=True)
+                except UnicodeDecodeError as e:
+                    raise ValueError(f"Document is not valid UTF-8 text: {e}") from e
+            ref = digest.hexdigest()
+            await run_blocking(self._commit, temp_name, ref)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        return StoredBody(ref=ref, size=size, length=length, preview="".join(preview))
+
+    def _commit(self, temp_name: str, ref: str):
+        """Move a spooled file into place (a body already stored is kept)."""
+        target = self.path(ref)
+        if target.exists():
+            os.unlink(temp_name)
+            return
+        target.parent.mkdir(exist_ok=True)
+        os.replace(temp_name, target)
+
+    def discard(self, ref: str):
+        """Delete a body that no document refers to."""
+        self.path(ref).unlink(missing_ok=True)
+
+    def iter_text(self, ref: str, block_chars: int = 256 * 1024) -> Iterator[str]:
+        """The body in blocks of at most ``block_chars`` characters."""
+        with open(self.path(ref), "r", encoding="utf-8") as f:
+            while True:
+                block = f.read(block_chars)
+                if not block:
+                    return
+                yield block
+
+
+_default_store: Optional[BodyStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_body_store() -> BodyStore:
+    """Return the process-wide body store."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = BodyStore(settings.body_store_dir)
+        return _default_store
@@ -0,0 +1,263 @@
+"""Materialized daily compliance aggregates."""
+import json
+import sqlite3
+import threading
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.models.document import DocumentAnalysis
+from app.services.analysis_store import body_hash
+
+# Document ids looked up per query, below SQLite's bound parameter limit
+_ID_BATCH = 500
+
+
+def _document_date(document: Dict[str, Any]) -> str:
+    """Publication date used for trends (today if missing or unparsable)."""
+    date_str = document.get("published_at") or ""
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+        return date_str
+    except ValueError:
+        return datetime.now().strftime("%Y-%m-%d")
+
+
+class ComplianceRollups:
+    """Per-day, per-category score sums, document counts and violations.
+
+    Each analyzed document contributes one row to ``compliance_daily``; its
+    last contribution is remembered with the hash of the body it was
+    computed from, so a re-analysis replaces it instead of double counting
+    and a new body under the same id retracts it (``superseded``) until the
+    document is analyzed again. Trend queries become range reads over the
+    rollups. The tables live next to ``documents`` so unrecorded and deleted
+    documents can be found with a join.
+    """
+
+    def __init__(self, path: Path):
+        """Open (or create) the rollup tables in the database at ``path``."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS compliance_daily (
+                date TEXT NOT NULL,
+                category TEXT NOT NULL,
+                score_sum REAL NOT NULL DEFAULT 0,
+                documents INTEGER NOT NULL DEFAULT 0,
+                violations INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (date, category)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS compliance_contributions (
+                document_id TEXT PRIMARY KEY,
+                date TEXT NOT NULL,
+                category TEXT NOT NULL,
+                score REAL NOT NULL,
+                violations INTEGER NOT NULL,
+                body_hash TEXT NOT NULL DEFAULT '',
+                superseded INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+            """
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(compliance_contributions)")}
+        for column, definition in (
+            ("body_hash", "TEXT NOT NULL DEFAULT ''"),
+            ("superseded", "INTEGER NOT NULL DEFAULT 0")
+        ):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE compliance_contributions ADD COLUMN {column} {definition}")
+        self._conn.commit()
+
+    def _apply_locked(self, date: str, category: str, score: float, documents: int, violations: int):
+        """Add a (possibly negative) delta to one daily rollup row (lock held)."""
+        self._conn.execute(
+            """INSERT INTO compliance_daily (date, category, score_sum, documents, violations)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(date, category) DO UPDATE SET
+                   score_sum = score_sum + excluded.score_sum,
+                   documents = documents + excluded.documents,
+                   violations = violations + excluded.violations""",
+            (date, category, score, documents, violations)
+        )
+        self._conn.execute(
+            "DELETE FROM compliance_daily WHERE date = ? AND category = ? AND documents <= 0",
+            (date, category)
+        )
+
+    def _retract_locked(self, document_id: str):
+        """Remove a document's previous contribution, if any (lock held)."""
+        row = self._conn.execute(
+            "SELECT * FROM compliance_contributions WHERE document_id = ?", (document_id,)
+        ).fetchone()
+        if row is None:
+            return
+        if not row["superseded"]:
+            self._apply_locked(row["date"], row["category"], -row["score"], -1, -row["violations"])
+        self._conn.execute("DELETE FROM compliance_contributions WHERE document_id = ?", (document_id,))
+
+    def _record_locked(self, document: Dict[str, Any], analysis: DocumentAnalysis):
+        """Replace a document's contribution with one from ``analysis`` (lock held)."""
+        date = _document_date(document)
+        category = document["category"]
+        violations = len(analysis.inconsistencies)
+        self._retract_locked(document["id"])
+        self._apply_locked(date, category, analysis.compliance_score, 1, violations)
+        self._conn.execute(
+            """INSERT INTO compliance_contributions
+               (document_id, date, category, score, violations, body_hash)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (document["id"], date, category, analysis.compliance_score, violations, body_hash(document))
+        )
+
+    def record(self, document: Dict[str, Any], analysis: DocumentAnalysis):
+        """Fold a document's latest analysis into the rollups."""
+        with self._lock, self._conn:
+            self._record_locked(document, analysis)
+
+    def record_stored_analyses(self) -> int:
+        """Fold in stored analyses of documents the rollups have not seen.
+
+        Covers documents analyzed before the rollups existed and contributions
+        retracted for a new body that has an analysis of its own. One join
+        finds them, so this is cheap when there is nothing to do. Returns the
+        number of documents recorded.
+        """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                """SELECT d.id, d.category, d.published_at, d.body, d.body_ref, a.payload
+                   FROM documents d
+                   JOIN document_analyses a ON a.document_id = d.id
+                   LEFT JOIN compliance_contributions c ON c.document_id = d.id
+                   WHERE c.document_id IS NULL
+                      OR (c.superseded = 1 AND a.body_hash != c.body_hash)
+                   ORDER BY d.seq"""
+            ).fetchall()
+            for row in rows:
+                document = {key: row[key] for key in ("id", "category", "published_at", "body", "body_ref")}
+                self._record_locked(document, DocumentAnalysis.from_dict(json.loads(row["payload"])))
+        return len(rows)
+
+    def on_documents(self, event: str, documents: List[Dict[str, Any]]):
+        """Document store listener: retract contributions whose document body changed.
+
+        Replacing the corpus also retracts documents that no longer exist.
+        """
+        if event == "documents.replaced":
+            self.prune_orphans()
+        self.supersede(documents)
+
+    def supersede(self, documents: List[Dict[str, Any]]) -> int:
+        """Retract contributions computed from a different body than the one now stored.
+
+        Returns the number of contributions retracted.
+        """
+        by_id = {document["id"]: document for document in documents}
+        ids = list(by_id)
+        superseded = 0
+        with self._lock, self._conn:
+            for start in range(0, len(ids), _ID_BATCH):
+                batch = ids[start:start + _ID_BATCH]
+                rows = self._conn.execute(
+                    f"""SELECT * FROM compliance_contributions
+                        WHERE superseded = 0 AND document_id IN ({", ".join("?" for _ in batch)})""",
+                    batch
+                ).fetchall()
+                for row in rows:
+                    if row["body_hash"] == body_hash(by_id[row["document_id"]]):
+                        continue
+                    self._apply_locked(row["date"], row["category"], -row["score"], -1, -row["violations"])
+                    self._conn.execute(
+                        "UPDATE compliance_contributions SET superseded = 1 WHERE document_id = ?",
+                        (row["document_id"],)
+                    )
+                    superseded += 1
+        return superseded
+
+    def prune_orphans(self) -> int:
+        """Retract contributions of documents that no longer exist."""
+        with self._lock, self._conn:
+            orphans = [
+                row[0] for row in self._conn.execute(
+                    """SELECT c.document_id FROM compliance_contributions c
+                       LEFT JOIN documents d ON d.id = c.document_id
+                       WHERE d.id IS NULL"""
+                )
+            ]
+            for document_id in orphans:
+                self._retract_locked(document_id)
+        return len(orphans)
+
+    def unrecorded_document_ids(self) -> List[str]:
+        """Ids of stored documents whose current body has not been folded into the rollups."""
+        with self._lock:
+            return [
+                row[0] for row in self._conn.execute(
+                    """SELECT d.id FROM documents d
+                       LEFT JOIN compliance_contributions c ON c.document_id = d.id
+                       WHERE c.document_id IS NULL OR c.superseded = 1
+                       ORDER BY d.seq"""
+                )
+            ]
+
+    def category_totals(self) -> Dict[str, Dict[str, int]]:
+        """Violations and document counts per category over all dates.
+
+        Categories are ordered by their first document in the store.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT c.category, SUM(c.violations) AS violations, COUNT(*) AS documents
+                   FROM compliance_contributions c
+                   JOIN documents d ON d.id = c.document_id
+                   WHERE c.superseded = 0
+                   GROUP BY c.category ORDER BY MIN(d.seq)"""
+            ).fetchall()
+        return {
+            row["category"]: {"violations": row["violations"], "documents": row["documents"]}
+            for row in rows
+        }
+
+    def trends(self, days: int) -> Dict[str, Any]:
+        """Daily trends and category violations for documents published in the last ``days`` days."""
+        since = datetime.now() - timedelta(days=days)
+        # A date is in range when its midnight is not before ``since``
+        first_date = since.date() if since.time() == time.min else since.date() + timedelta(days=1)
+        first_date_str = first_date.strftime("%Y-%m-%d")
+        with self._lock:
+            daily = self._conn.execute(
+                """SELECT date, SUM(score_sum) AS score_sum, SUM(documents) AS documents,
+                          SUM(violations) AS violations
+                   FROM compliance_daily WHERE date >= ?
+                   GROUP BY date ORDER BY date""",
+                (first_date_str,)
+            ).fetchall()
+            by_category = self._conn.execute(
+                """SELECT category, SUM(violations) AS violations
+                   FROM compliance_daily WHERE date >= ?
+                   GROUP BY category HAVING SUM(violations) > 0""",
+                (first_date_str,)
+            ).fetchall()
+
+        trends = [
+            {
+                "date": row["date"],
+                "compliance_percentage": round(row["score_sum"] / row["documents"], 2),
+                "violations": row["violations"],
+                "inspections": row["documents"]
+            }
+            for row in daily if row["documents"] > 0
+        ]
+        return {
+            "trends": trends,
+            "violations_by_category": {row["category"]: row["violations"] for row in by_category}
+        }
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
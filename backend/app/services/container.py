@@ -0,0 +1,167 @@
+"""Application-scoped service container."""
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.concurrency import LoopLagMonitor, shutdown_blocking_executor
+from app.core.config import settings
+from app.services.alert_store import SAMPLE_ALERTS, AlertStore
+from app.services.analysis_store import AnalysisStore
+from app.services.body_store import get_body_store
+from app.services.compliance_rollups import ComplianceRollups
+from app.services.document_store import DocumentStore
+from app.services.event_bus import EventBus
+from app.services.file_cache import get_file_cache
+from app.services.ingestion_log import IngestionLog
+from app.services.job_manager import JobManager
+from app.services.nlp_service import NLPService
+from app.services.analysis_engine import AnalysisEngine
+from app.services.analytics_service import AnalyticsService
+from app.services.log_ingestor import LogIngestor
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.processing_pipeline import ProcessingPipeline
+from app.services.search_index import SearchIndex
+
+
+class ServiceContainer:
+    """Owns the services shared by every request.
+    
+    A single keep-alive HTTP pool backs the Groq client so TLS connections are
+    reused across all analyses instead of each service opening its own.
+    """
+    
+    def __init__(self):
+        """Build the shared HTTP pool and wire services onto it."""
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=settings.groq_max_connections,
+                max_keepalive_connections=settings.groq_max_keepalive_connections,
+                keepalive_expiry=settings.groq_keepalive_expiry
+            ),
+            timeout=httpx.Timeout(settings.groq_timeout, connect=10.0)
+        )
+        self.document_store = DocumentStore(
+            settings.database_path,
+            ingestion_log=IngestionLog(settings.ingestion_log_dir, fsync=settings.ingestion_fsync)
+        )
+        self._import_legacy_documents()
+        self.document_store.start_compaction(settings.ingestion_compaction_interval)
+        self.file_cache = get_file_cache()
+        self.body_store = get_body_store()
+        self.nlp_service = NLPService(http_client=self.http_client, body_store=self.body_store)
+        self.rollups = ComplianceRollups(settings.database_path)
+        self.analysis_store = AnalysisStore(settings.database_path)
+        self.near_duplicates = NearDuplicateIndex(
+            settings.database_path,
+            self.nlp_service.rule_extractors,
+            num_perm=settings.minhash_permutations,
+            bands=settings.lsh_bands,
+            shingle_size=settings.shingle_size,
+            max_chars=settings.near_duplicate_max_chars
+        )
+        self.analysis_engine = AnalysisEngine(
+            self.nlp_service,
+            analysis_store=self.analysis_store,
+            near_duplicates=self.near_duplicates
+        )
+        self.event_bus = EventBus(queue_size=settings.event_queue_size, replay_size=settings.event_replay_size)
+        self.document_store.add_listener(self.near_duplicates.on_documents)
+        self.analysis_engine.add_listener(self.rollups.record)
+        self.document_store.add_listener(self.rollups.on_documents)
+        self.document_store.add_listener(self.analysis_store.on_documents)
+        self.analysis_engine.add_listener(self._publish_analysis)
+        self.search_index = SearchIndex(
+            settings.database_path,
+            self.body_store,
+            analysis_store=self.analysis_store,
+            max_body_chars=settings.search_max_body_chars
+        )
+        self.document_store.add_listener(self.search_index.on_documents)
+        self.analysis_engine.add_listener(self.search_index.record_analysis)
+        self.search_index.start()
+        self.analytics_service = AnalyticsService(
+            nlp_service=self.nlp_service,
+            document_store=self.document_store,
+            file_cache=self.file_cache,
+            rollups=self.rollups,
+            analysis_store=self.analysis_store
+        )
+        self.log_ingestor = LogIngestor(self.analytics_service)
+        self.alert_store = AlertStore(settings.database_path, settings.alert_suppression_window)
+        self.alert_store.seed(SAMPLE_ALERTS)
+        self.alert_store.add_listener(self.event_bus.publish)
+        self.loop_monitor = LoopLagMonitor(
+            interval=settings.loop_lag_interval,
+            warn_threshold=settings.loop_lag_warn_ms / 1000
+        )
+        self.job_manager = JobManager(settings.database_path, workers=settings.job_workers)
+        self.pipeline = ProcessingPipeline(
+            nlp_service=self.nlp_service,
+            analysis_engine=self.analysis_engine,
+            document_store=self.document_store,
+            file_cache=self.file_cache
+        )
+        self._stop_backfill = threading.Event()
+        self._backfill: Optional[threading.Thread] = None
+    
+    def _import_legacy_documents(self):
+        """Seed an empty store from the legacy sample_documents.json file."""
+        if self.document_store.count() == 0:
+            imported = self.document_store.import_json(settings.data_dir / "sample_documents.json")
+            if imported:
+                print(f"Info: Imported {imported} documents from sample_documents.json")
+    
+    def _publish_analysis(self, document: Dict[str, Any], analysis):
+        """Push a ``document.analyzed`` event for a completed analysis."""
+        self.event_bus.publish("document.analyzed", {
+            **analysis.to_dict(),
+            "title": document.get("title"),
+            "category": document.get("category")
+        })
+    
+    def _backfill_indexes(self):
+        """Index stored documents missing from the search and near-duplicate indexes."""
+        try:
+            indexed = self.search_index.sync(self.document_store, stop=self._stop_backfill)
+            if indexed:
+                print(f"Info: Indexed {indexed} documents for search")
+        except Exception as e:
+            print(f"Warning: Search index backfill failed: {e}")
+        try:
+            indexed = self.near_duplicates.refresh(
+                self.document_store, self.nlp_service.record_blocks, stop=self._stop_backfill
+            )
+            if indexed:
+                print(f"Info: Indexed {indexed} documents for near-duplicate detection")
+        except Exception as e:
+            print(f"Warning: Near-duplicate backfill failed: {e}")
+    
+    def start_backfill(self):
+        """Backfill indexes in a background thread so startup and requests do not wait for it."""
+        if self._backfill is None:
+            self._backfill = threading.Thread(target=self._backfill_indexes, name="index-backfill", daemon=True)
+            self._backfill.start()
+    
+    def warm_up(self):
+        """Open pooled connections ahead of the first analysis."""
+        self.nlp_service.warm_up()
+    
+    def close(self):
+        """Release worker threads and pooled connections."""
+        self._stop_backfill.set()
+        if self._backfill is not None:
+            self._backfill.join()
+        self.event_bus.close()
+        self.analysis_engine.shutdown()
+        self.nlp_service.close()
+        shutdown_blocking_executor()
+        self.http_client.close()
+        # The search indexer reads stored analyses until its queue is drained
+        self.search_index.close()
+        self.rollups.close()
+        self.analysis_store.close()
+        self.near_duplicates.close()
+        self.alert_store.close()
+        self.job_manager.close()
+        self.document_store.close()
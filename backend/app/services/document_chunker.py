@@ -0,0 +1,93 @@
+"""Splitting long documents into section-aligned chunks for analysis."""
+import re
+from typing import Iterable, Iterator, List
+
+# Lines that open a new section: numbered clauses ("1.", "2.3", "(a)"),
+# "Section 4", "Article IV", "Part 2", "Chapter 3", "§ 12", markdown headings
+# and all-caps titles.
+_HEADING = re.compile(
+    r"""^[ \t]*(?:
+        \#{1,6}[ \t]
+      | (?:section|article|part|chapter|schedule|appendix|annex)[ \t]+[\dIVXLC]+\b
+      | §[ \t]*\d
+      | \d+(?:\.\d+)*\.?[ \t]+\S
+      | \([a-z\d]{1,4}\)[ \t]+\S
+      | (?-i:[A-Z][A-Z\d\ ,&/'()-]{3,}$)
+    )""",
+    re.IGNORECASE | re.MULTILINE | re.VERBOSE
+)
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_at(text: str, pattern: re.Pattern, before: bool = False) -> List[str]:
+    """Split ``text`` after each match of ``pattern``, or before it with ``before``."""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        cut = match.start() if before else match.end()
+        if cut > start:
+            pieces.append(text[start:cut])
+            start = cut
+    pieces.append(text[start:])
+    return [piece for piece in pieces if piece.strip()]
+
+
+def _pack(pieces: List[str], max_chars: int) -> List[str]:
+    """Greedily concatenate consecutive pieces into chunks of at most ``max_chars``."""
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_oversized(section: str, max_chars: int) -> List[str]:
+    """Break a section longer than ``max_chars`` at paragraphs, then sentences, then hard cuts."""
+    if len(section) <= max_chars:
+        return [section]
+    for pattern in (_PARAGRAPH_BREAK, _SENTENCE_END):
+        pieces = _split_at(section, pattern)
+        if len(pieces) > 1:
+            return [part for piece in pieces for part in _split_oversized(piece, max_chars)]
+    return [section[i:i + max_chars] for i in range(0, len(section), max_chars)]
+
+
+def chunk_document(text: str, max_chars: int) -> List[str]:
+    """Split ``text`` into chunks of at most ``max_chars`` characters.
+
+    Chunks start at section headings where possible, so each one holds whole
+    sections; consecutive short sections share a chunk, and sections longer
+    than ``max_chars`` are split at paragraph and then sentence boundaries.
+    A text that already fits is returned as a single chunk.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    sections = _split_at(text, _HEADING, before=True)
+    pieces = [piece for section in sections for piece in _split_oversized(section, max_chars)]
+    return [chunk.strip() for chunk in _pack(pieces, max_chars) if chunk.strip()]
+
+
+def iter_document_chunks(blocks: Iterable[str], max_chars: int) -> Iterator[str]:
+    """Chunk a text read in ``blocks`` as :func:`chunk_document` would, holding little of it in memory.
+
+    Text is buffered until it spans a few chunks; all but the last chunk of
+    the buffer are emitted and the last, which may end mid-section, is kept
+    to be joined with the next blocks.
+    """
+    buffer = ""
+    for block in blocks:
+        buffer += block
+        if len(buffer) < 3 * max_chars:
+            continue
+        chunks = chunk_document(buffer, max_chars)
+        yield from chunks[:-1]
+        # Chunks are stripped slices of the buffer; keep the original tail
+        buffer = buffer[buffer.rfind(chunks[-1]):]
+    if buffer.strip():
+        yield from chunk_document(buffer, max_chars)
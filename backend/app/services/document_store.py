@@ -0,0 +1,287 @@
+"""SQLite-backed document storage."""
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.services.ingestion_log import IngestionLog
+
+DOCUMENT_FIELDS = ("id", "title", "body", "category", "published_at", "created_at", "body_ref", "body_length")
+_COLUMNS = ", ".join(DOCUMENT_FIELDS)
+_PLACEHOLDERS = ", ".join("?" for _ in DOCUMENT_FIELDS)
+
+DocumentListener = Callable[[str, List[Dict[str, Any]]], None]
+
+
+class DocumentStore:
+    """Indexed document repository backed by SQLite in WAL mode.
+
+    Documents keep their insertion order (``seq``) so listings match the order
+    of the original JSON file. Lookups by id, category and publication date
+    are served from indexes instead of scanning the corpus.
+
+    Large uploads keep their body in the :class:`BodyStore`: ``body_ref`` is
+    set, ``body_length`` holds the full length in characters and ``body``
+    only a preview.
+
+    When an :class:`IngestionLog` is attached, :meth:`add` and
+    :meth:`add_many` only append to the log and keep the records in memory;
+    :meth:`compact` later moves them into SQLite in a single transaction.
+    Lookups by id see pending records immediately and list queries compact
+    first, so readers never observe a missing upload.
+
+    Listeners registered with :meth:`add_listener` are called with
+    ``("documents.added", documents)`` after new documents are accepted and
+    ``("documents.replaced", documents)`` when the corpus is replaced.
+    """
+
+    def __init__(self, path: Path, ingestion_log: Optional[IngestionLog] = None):
+        """Open (or create) the document database at ``path``."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ingestion_log = ingestion_log
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # Segments may be left over from a previous process until the first compaction
+        self._has_segments = ingestion_log is not None
+        self._compactor: Optional[threading.Thread] = None
+        self._stop_compactor = threading.Event()
+        self._lock = threading.RLock()
+        self._listeners: List[DocumentListener] = []
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                seq INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                body TEXT NOT NULL,
+                category TEXT NOT NULL,
+                published_at TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                body_ref TEXT,
+                body_length INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_category ON documents(category, seq);
+            CREATE INDEX IF NOT EXISTS idx_documents_published_at ON documents(published_at);
+            """
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(documents)")}
+        for column, kind in (("body_ref", "TEXT"), ("body_length", "INTEGER")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE documents ADD COLUMN {column} {kind}")
+        self._conn.commit()
+        if self.ingestion_log is not None:
+            self.compact()
+
+    def add_listener(self, listener: DocumentListener):
+        """Register a callback for added and replaced documents."""
+        self._listeners.append(listener)
+
+    def _notify(self, event: str, documents: List[Dict[str, Any]]):
+        for listener in self._listeners:
+            try:
+                listener(event, documents)
+            except Exception as e:
+                print(f"Warning: Document listener failed for {event}: {e}")
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {field: row[field] for field in DOCUMENT_FIELDS}
+
+    @staticmethod
+    def _to_params(document: Dict[str, Any]) -> tuple:
+        return (
+            document["id"],
+            document.get("title") or "Untitled Document",
+            document["body"],
+            document.get("category") or "Regulatory",
+            document.get("published_at") or datetime.now().strftime("%Y-%m-%d"),
+            document.get("created_at") or datetime.now().isoformat(),
+            document.get("body_ref"),
+            document.get("body_length")
+        )
+
+    def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Return a document by id, or None."""
+        with self._lock:
+            if document_id in self._pending:
+                return dict(self._pending[document_id])
+            row = self._conn.execute(
+                "SELECT * FROM documents WHERE id = ?", (document_id,)
+            ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list(
+        self,
+        category: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """List documents in insertion order, optionally filtered and paginated."""
+        query = "SELECT * FROM documents"
+        params: List[Any] = []
+        if category:
+            query += " WHERE category = ?"
+            params.append(category)
+        query += " ORDER BY seq LIMIT ? OFFSET ?"
+        params.extend([limit if limit is not None else -1, offset])
+        with self._lock:
+            self._compact_locked()
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """Return the ``limit`` most recently added documents, oldest first."""
+        with self._lock:
+            self._compact_locked()
+            rows = self._conn.execute(
+                "SELECT * FROM documents ORDER BY seq DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in reversed(rows)]
+
+    def count(self, category: Optional[str] = None) -> int:
+        """Number of stored documents."""
+        with self._lock:
+            self._compact_locked()
+            if category:
+                return self._conn.execute(
+                    "SELECT COUNT(*) FROM documents WHERE category = ?", (category,)
+                ).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def add(self, document: Dict[str, Any]):
+        """Insert a single document."""
+        self.add_many([document])
+
+    def add_many(self, documents: Iterable[Dict[str, Any]]):
+        """Insert documents, replacing any with the same id.
+
+        With an ingestion log attached this is an O(1) durable append; the
+        documents reach SQLite on the next compaction.
+        """
+        documents = [
+            dict(zip(DOCUMENT_FIELDS, self._to_params(doc)))
+            for doc in documents
+        ]
+        with self._lock:
+            if self.ingestion_log is None:
+                self._insert_locked(documents)
+            else:
+                self.ingestion_log.append(documents)
+                for doc in documents:
+                    self._pending.pop(doc["id"], None)
+                    self._pending[doc["id"]] = doc
+        self._notify("documents.added", documents)
+
+    def _insert_locked(self, documents: List[Dict[str, Any]]):
+        """Insert documents in one transaction (lock held)."""
+        with self._conn:
+            self._conn.executemany(
+                f"""INSERT OR REPLACE INTO documents
+                   ({_COLUMNS})
+                   VALUES ({_PLACEHOLDERS})""",
+                [self._to_params(doc) for doc in documents]
+            )
+
+    def compact(self) -> int:
+        """Move logged documents into SQLite and drop their segments.
+
+        Returns the number of documents compacted.
+        """
+        with self._lock:
+            return self._compact_locked()
+
+    def _compact_locked(self) -> int:
+        """Compact sealed segments into the database (lock held)."""
+        if self.ingestion_log is None:
+            return 0
+        if not self._pending and not self._has_segments:
+            return 0
+        segments = self.ingestion_log.seal()
+        documents: Dict[str, Dict[str, Any]] = {}
+        for segment in segments:
+            for doc in self.ingestion_log.read_segment(segment):
+                documents.pop(doc["id"], None)
+                documents[doc["id"]] = doc
+        if documents:
+            self._insert_locked(list(documents.values()))
+        self.ingestion_log.remove(segments)
+        self._pending.clear()
+        self._has_segments = False
+        return len(documents)
+
+    def start_compaction(self, interval: float):
+        """Compact the ingestion log every ``interval`` seconds in the background."""
+        if self.ingestion_log is None or self._compactor is not None:
+            return
+
+        def _run():
+            while not self._stop_compactor.wait(interval):
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"Warning: Document compaction failed: {e}")
+
+        self._compactor = threading.Thread(target=_run, name="document-compactor", daemon=True)
+        self._compactor.start()
+
+    def replace_all(self, documents: Iterable[Dict[str, Any]]):
+        """Atomically replace the whole corpus."""
+        documents = [
+            dict(zip(DOCUMENT_FIELDS, self._to_params(doc)))
+            for doc in documents
+        ]
+        with self._lock, self._conn:
+            if self.ingestion_log is not None:
+                self.ingestion_log.remove(self.ingestion_log.seal())
+                self._pending.clear()
+            self._conn.execute("DELETE FROM documents")
+            self._conn.executemany(
+                f"""INSERT OR REPLACE INTO documents
+                   ({_COLUMNS})
+                   VALUES ({_PLACEHOLDERS})""",
+                [self._to_params(doc) for doc in documents]
+            )
+        self._notify("documents.replaced", documents)
+
+    def import_json(self, path: Path) -> int:
+        """Import documents from a legacy JSON array file, skipping known ids.
+
+        Returns the number of documents imported.
+        """
+        path = Path(path)
+        if not path.exists():
+            return 0
+        with open(path, "r") as f:
+            documents = json.load(f)
+        documents = [dict(zip(DOCUMENT_FIELDS, self._to_params(doc))) for doc in documents]
+        imported = []
+        with self._lock, self._conn:
+            for doc in documents:
+                cursor = self._conn.execute(
+                    f"""INSERT OR IGNORE INTO documents
+                       ({_COLUMNS})
+                       VALUES ({_PLACEHOLDERS})""",
+                    self._to_params(doc)
+                )
+                if cursor.rowcount:
+                    imported.append(doc)
+        if imported:
+            self._notify("documents.added", imported)
+        return len(imported)
+
+    def close(self):
+        """Stop background compaction, flush pending documents and close."""
+        self._stop_compactor.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            self._compact_locked()
+            if self.ingestion_log is not None:
+                self.ingestion_log.close()
+            self._conn.close()
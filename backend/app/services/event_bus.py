@@ -0,0 +1,125 @@
+"""In-process publish/subscribe bus for push notifications."""
+import asyncio
+import itertools
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Set
+
+# Queue markers telling a subscriber why its stream ended
+DROPPED = "dropped"
+CLOSED = "closed"
+
+
+@dataclass
+class Event:
+    """A published event; ``id`` increases monotonically per bus."""
+    id: int
+    type: str
+    data: Dict[str, Any]
+
+
+@dataclass(eq=False)
+class Subscription:
+    """A subscriber's bounded queue on the event loop that created it."""
+    queue: asyncio.Queue
+    loop: asyncio.AbstractEventLoop
+    types: Optional[Set[str]] = None
+    active: bool = field(default=True)
+
+    def wants(self, event: Event) -> bool:
+        return self.types is None or event.type in self.types
+
+
+class EventBus:
+    """Fan-out of events to subscribers with bounded, per-subscriber queues.
+
+    :meth:`publish` is safe to call from any thread and never blocks: events
+    are handed to each subscriber's loop with ``call_soon_threadsafe``. A
+    subscriber whose queue is full is dropped (its queue is cleared and ends
+    with a ``DROPPED`` marker) so one slow consumer cannot hold back the
+    others or grow memory. Recent events are kept for ``Last-Event-ID``
+    replay on reconnect.
+    """
+
+    def __init__(self, queue_size: int = 256, replay_size: int = 256):
+        """Create a bus with ``queue_size`` slots per subscriber."""
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._recent: Deque[Event] = deque(maxlen=replay_size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.dropped_subscribers = 0
+
+    def subscribe(self, types: Optional[Set[str]] = None, last_event_id: Optional[int] = None) -> Subscription:
+        """Register a subscriber on the running loop, replaying events after ``last_event_id``."""
+        subscription = Subscription(
+            queue=asyncio.Queue(maxsize=self.queue_size),
+            loop=asyncio.get_running_loop(),
+            types=types
+        )
+        with self._lock:
+            missed = [
+                event for event in self._recent
+                if last_event_id is not None and event.id > last_event_id and subscription.wants(event)
+            ]
+            self._subscribers.add(subscription)
+        # Live events are delivered by loop callbacks, so they queue after these
+        for event in missed:
+            self._deliver(subscription, event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering events to ``subscription``."""
+        subscription.active = False
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Event:
+        """Publish an event to every interested subscriber."""
+        with self._lock:
+            event = Event(id=next(self._ids), type=event_type, data=data)
+            self._recent.append(event)
+            subscribers = [s for s in self._subscribers if s.wants(event)]
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(self._deliver, subscription, event)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self.unsubscribe(subscription)
+        return event
+
+    def _deliver(self, subscription: Subscription, item: Any):
+        """Enqueue an item, dropping the subscriber if it has fallen behind (on its loop)."""
+        if not subscription.active:
+            return
+        try:
+            subscription.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.unsubscribe(subscription)
+            self.dropped_subscribers += 1
+            self._end(subscription, DROPPED)
+
+    @staticmethod
+    def _end(subscription: Subscription, marker: str):
+        """Replace whatever is queued with a terminal marker."""
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(marker)
+
+    def close(self):
+        """End every subscriber's stream."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription.active = False
+            try:
+                subscription.loop.call_soon_threadsafe(self._end, subscription, CLOSED)
+            except RuntimeError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """Subscriber counts for monitoring."""
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "dropped_subscribers": self.dropped_subscribers}
@@ -0,0 +1,87 @@
+"""In-process cache for parsed data files, revalidated on file metadata."""
+import json
+import os
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+
+def freeze(value: Any) -> Any:
+    """Return a read-only view of parsed JSON (dicts become mappingproxies, lists tuples)."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class FileCache:
+    """Cache of parsed JSON files keyed by path.
+    
+    Each read costs a ``stat()``; the file is only re-parsed when its
+    modification time, size or inode changes. Cached values are frozen so
+    callers sharing them cannot mutate each other's data.
+    """
+    
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._entries: Dict[Path, Tuple[Tuple[int, int, int], Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def load_json(self, path: Path, default: Any = ()) -> Any:
+        """Return the parsed, frozen contents of ``path`` (``default`` if missing)."""
+        path = Path(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(path, None)
+            return default
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+        
+        with open(path, "r") as f:
+            value = freeze(json.load(f))
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = (signature, value)
+        return value
+    
+    def invalidate(self, path: Optional[Path] = None):
+        """Forget one cached file, or all of them."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(Path(path), None)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+_default_cache: Optional[FileCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_file_cache() -> FileCache:
+    """Return the process-wide file cache."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = FileCache()
+        return _default_cache
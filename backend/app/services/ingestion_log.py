@@ -0,0 +1,103 @@
+"""Append-only NDJSON ingestion log for newly uploaded documents."""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+ACTIVE_SEGMENT = "active.ndjson"
+SEALED_PREFIX = "segment-"
+
+
+class IngestionLog:
+    """Durable, append-only record of ingested documents.
+
+    Records are appended as one JSON line each to an active segment, so an
+    upload costs O(record size) regardless of corpus size. Segments are
+    sealed with an atomic rename and removed once their records have been
+    compacted into the document store. With ``max_segments`` set, sealing
+    also drops the oldest sealed segments beyond that many, which bounds the
+    log for consumers that replay it instead of compacting it.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_segment_bytes: int = 8 * 1024 * 1024,
+        fsync: bool = True,
+        max_segments: Optional[int] = None
+    ):
+        """Open the log in ``directory``, creating it if needed."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync = fsync
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        self._active = open(self.directory / ACTIVE_SEGMENT, "a", encoding="utf-8")
+
+    def append(self, records: Iterable[Dict[str, Any]]):
+        """Durably append records to the active segment."""
+        payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with self._lock:
+            self._active.write(payload)
+            self._active.flush()
+            if self.fsync:
+                os.fsync(self._active.fileno())
+            if self._active.tell() >= self.max_segment_bytes:
+                self._seal_locked()
+
+    def _seal_locked(self):
+        """Atomically rename the active segment to a sealed one (lock held)."""
+        if self._active.tell() == 0:
+            return
+        self._active.close()
+        sealed = self.directory / f"{SEALED_PREFIX}{time.time_ns():020d}.ndjson"
+        os.replace(self.directory / ACTIVE_SEGMENT, sealed)
+        self._active = open(self.directory / ACTIVE_SEGMENT, "a", encoding="utf-8")
+        if self.max_segments is not None:
+            sealed_segments = self._sealed_locked()
+            self.remove(sealed_segments[:max(0, len(sealed_segments) - self.max_segments)])
+
+    def _sealed_locked(self) -> List[Path]:
+        return sorted(self.directory.glob(f"{SEALED_PREFIX}*.ndjson"))
+
+    def seal(self) -> List[Path]:
+        """Seal the active segment and return all sealed segments, oldest first."""
+        with self._lock:
+            self._seal_locked()
+            return self._sealed_locked()
+
+    def segments(self) -> List[Path]:
+        """Sealed segments, oldest first, followed by the active segment."""
+        with self._lock:
+            return self._sealed_locked() + [self.directory / ACTIVE_SEGMENT]
+
+    def adopt(self, path: Path):
+        """Move an existing NDJSON file into the log as a sealed segment older than any other."""
+        with self._lock:
+            os.replace(path, self.directory / f"{SEALED_PREFIX}{0:020d}.ndjson")
+
+    @staticmethod
+    def read_segment(path: Path) -> Iterator[Dict[str, Any]]:
+        """Yield records from a segment, skipping a torn trailing line."""
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    @staticmethod
+    def remove(segments: Iterable[Path]):
+        """Delete segments that have been compacted."""
+        for segment in segments:
+            Path(segment).unlink(missing_ok=True)
+
+    def close(self):
+        """Close the active segment."""
+        with self._lock:
+            self._active.close()
@@ -0,0 +1,224 @@
+"""Background jobs with persisted status and progress."""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.concurrency import get_blocking_executor, run_blocking
+
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobProgress:
+    """Progress counters handed to a running job.
+
+    Counters are written to the database on the blocking pool, at most once
+    per ``flush_interval`` seconds, so per-item ticks never commit on the
+    event loop. The final counts are written with the job's outcome.
+    """
+
+    def __init__(self, manager: "JobManager", job_id: str, flush_interval: float = 0.25):
+        self._manager = manager
+        self.job_id = job_id
+        self.flush_interval = flush_interval
+        self.total = 0
+        self.completed = 0
+        self._flushed_at = float("-inf")
+
+    def set_total(self, total: int):
+        """Set the number of items the job will process."""
+        self.total = total
+        self._flush(force=True)
+
+    def advance(self, count: int = 1):
+        """Record ``count`` more processed items."""
+        self.completed += count
+        self._flush()
+
+    def _flush(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._flushed_at < self.flush_interval:
+            return
+        self._flushed_at = now
+        get_blocking_executor().submit(self._manager._write_progress, self.job_id, self.total, self.completed)
+
+
+JobFunction = Callable[[JobProgress], Awaitable[Dict[str, Any]]]
+
+
+class JobManager:
+    """Runs long operations as background asyncio tasks.
+
+    Jobs are stored in the ``jobs`` table with their status, progress
+    counters and result, so clients poll a job instead of holding an HTTP
+    request open. At most ``workers`` jobs run at once; the rest stay
+    ``queued``. Jobs left queued or running by a previous process are marked
+    failed on startup.
+    """
+
+    def __init__(self, path: Path, workers: int = 2):
+        """Open (or create) the jobs table in the database at ``path``."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, workers)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._closing = False
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                seq INTEGER PRIMARY KEY,
+                job_id TEXT NOT NULL UNIQUE,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                completed INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT,
+                error TEXT,
+                result TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, seq);
+            """
+        )
+        with self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Interrupted by restart', finished_at = ? "
+                "WHERE status IN ('queued', 'running')",
+                (datetime.now().isoformat(),)
+            )
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "params": json.loads(row["params"]),
+            "total": row["total"],
+            "completed": row["completed"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "error": row["error"],
+            "result": json.loads(row["result"]) if row["result"] else None
+        }
+
+    def _update(self, job_id: str, **fields: Any):
+        """Persist changed job fields."""
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def _write_progress(self, job_id: str, total: int, completed: int):
+        """Persist progress counters; ``completed`` never moves backwards if writes land out of order."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET total = ?, completed = MAX(completed, ?) WHERE job_id = ?",
+                (total, completed, job_id)
+            )
+
+    def _insert(self, job_id: str, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a new queued job and return its record."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, kind, status, params, created_at) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(params), datetime.now().isoformat())
+            )
+        return self.get(job_id)
+
+    async def submit(self, kind: str, fn: JobFunction, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Queue ``fn`` as a background job and return its record."""
+        job_id = f"JOB-{uuid.uuid4().hex[:12].upper()}"
+        job = await run_blocking(self._insert, job_id, kind, params or {})
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+        task = asyncio.get_running_loop().create_task(self._run(job_id, fn))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return job
+
+    async def _run(self, job_id: str, fn: JobFunction):
+        """Wait for a worker slot, run the job and record its outcome."""
+        progress = JobProgress(self, job_id)
+        try:
+            async with self._semaphore:
+                await run_blocking(self._update, job_id, status="running", started_at=datetime.now().isoformat())
+                result = await fn(progress)
+            outcome = {"status": "done", "result": result}
+        except asyncio.CancelledError:
+            if self._closing:
+                outcome = {"status": "failed", "error": "Interrupted by shutdown"}
+            else:
+                outcome = {"status": "cancelled"}
+        except Exception as e:
+            print(f"Warning: Job {job_id} failed: {e}")
+            outcome = {"status": "failed", "error": str(e)}
+        # Shielded so a cancellation arriving now cannot lose the outcome
+        await asyncio.shield(run_blocking(
+            self._update,
+            job_id,
+            **outcome,
+            total=progress.total,
+            completed=progress.completed,
+            finished_at=datetime.now().isoformat()
+        ))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job by id, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs first, optionally filtered by status."""
+        query = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; returns its record, or None if unknown.
+
+        Analyses already handed to worker threads finish in the background,
+        but no further documents are started.
+        """
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.wait({task})
+        return await run_blocking(self.get, job_id)
+
+    async def shutdown(self):
+        """Cancel unfinished jobs and wait for them to record their state."""
+        self._closing = True
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,101 @@
+"""Streaming ingestion of operational log readings."""
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.analytics_service import AnalyticsService
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class LogIngestor:
+    """Parses NDJSON readings and raises threshold alerts as they arrive.
+
+    Readings are handled one batch at a time: the batch is appended to the
+    analytics log store (and its NDJSON file), then only the new rows are
+    checked against their thresholds in a single vectorized pass. Memory use
+    is bounded by the batch size, not by the length of the stream.
+    """
+
+    def __init__(self, analytics_service: AnalyticsService):
+        """Initialize the ingestor on top of the shared analytics service."""
+        self.analytics_service = analytics_service
+
+    @staticmethod
+    def parse_reading(line: bytes) -> Optional[Dict[str, Any]]:
+        """Parse one NDJSON line into a log record, or None if it is invalid."""
+        try:
+            reading = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        if not isinstance(reading, dict) or not reading.get("metric"):
+            return None
+        if not _is_number(reading.get("value")) or not _is_number(reading.get("threshold")):
+            return None
+        timestamp = reading.get("timestamp") or datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        try:
+            datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        value = reading["value"]
+        threshold = reading["threshold"]
+        return {
+            "id": reading.get("id"),
+            "facility": reading.get("facility") or "Unknown",
+            "metric": reading["metric"],
+            "value": value,
+            "unit": reading.get("unit") or "",
+            "threshold": threshold,
+            "timestamp": timestamp,
+            "status": "EXCEEDED" if value > threshold else "NORMAL"
+        }
+
+    def ingest_lines(self, lines: Iterable[bytes]) -> Tuple[int, int, List[Dict[str, Any]]]:
+        """Ingest one batch of NDJSON lines.
+
+        Returns ``(accepted, rejected, alerts)``; blank lines are ignored.
+        """
+        records = []
+        rejected = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            record = self.parse_reading(line)
+            if record is None:
+                rejected += 1
+            else:
+                records.append(record)
+        return len(records), rejected, self.ingest(records)
+
+    def ingest(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store readings and return alert data for those above threshold."""
+        if not records:
+            return []
+        store, start, end = self.analytics_service.append_logs(records)
+        columns = store.columns()
+        excess = columns["excess"][start:end]
+        rows = np.flatnonzero(excess)
+        thresholds = columns["threshold"][start:end][rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = np.where(thresholds != 0, excess[rows] / thresholds * 100, np.inf)
+        severity = np.where(percentage > 30, "HIGH", np.where(percentage > 15, "MEDIUM", "LOW"))
+
+        alerts = []
+        for i, row in enumerate(rows):
+            log = records[row]
+            alerts.append({
+                "type": "ThresholdExceeded",
+                "message": f"{log['metric']} exceeded threshold at {log['facility']}. Value: {log['value']} {log['unit']}, Threshold: {log['threshold']} {log['unit']}",
+                "severity": str(severity[i]),
+                "timestamp": log["timestamp"],
+                "facility": log["facility"],
+                "metric": log["metric"],
+                "resolved": False,
+                # One alert per facility and metric per suppression window of readings
+                "dedup_at": log["timestamp"]
+            })
+        return alerts
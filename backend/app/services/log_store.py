@@ -0,0 +1,193 @@
+"""Columnar, NumPy-backed storage for operational log readings."""
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_timestamp_us(value: Any) -> int:
+    """Convert an ISO-8601 timestamp (``Z`` suffix allowed) to epoch microseconds."""
+    try:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        ts = datetime.now(timezone.utc)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    delta = ts - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def format_timestamp_us(value: int) -> str:
+    """Inverse of :func:`parse_timestamp_us`, rendered with a ``Z`` suffix."""
+    ts = datetime.fromtimestamp(int(value) / 1_000_000, tz=timezone.utc)
+    return ts.isoformat().replace("+00:00", "Z")
+
+
+def as_number(value: float) -> float:
+    """Return integral floats as ints so thresholds render as they were logged."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class StringDictionary:
+    """Dictionary encoding of a low-cardinality string column."""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = []
+        self._codes: Dict[Optional[str], int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        """Return the code for ``value``, assigning a new one on first sight."""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Optional[str]) -> int:
+        """Return the code for ``value``, or -1 if it has never been seen."""
+        return self._codes.get(value, -1)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class ColumnarLogStore:
+    """Operational log readings stored column by column.
+
+    ``value`` and ``threshold`` are float64 arrays, ``timestamp`` holds int64
+    epoch microseconds, and facility, metric and unit are dictionary encoded
+    into int32 codes (assigned in order of first appearance). A derived
+    ``excess`` column holds ``max(value - threshold, 0)`` so threshold checks
+    are a single pass. Analytics run as vectorized masks and reductions over
+    these columns. Appends grow the buffers geometrically, so they are O(1)
+    amortized.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Create an empty store with room for ``capacity`` readings."""
+        capacity = max(1, capacity)
+        self._size = 0
+        self._value = np.empty(capacity, dtype=np.float64)
+        self._threshold = np.empty(capacity, dtype=np.float64)
+        self._excess = np.empty(capacity, dtype=np.float64)
+        self._timestamp = np.empty(capacity, dtype=np.int64)
+        self._facility = np.empty(capacity, dtype=np.int32)
+        self._metric = np.empty(capacity, dtype=np.int32)
+        self._unit = np.empty(capacity, dtype=np.int32)
+        self._ids: List[Optional[str]] = []
+        self.facilities = StringDictionary()
+        self.metrics = StringDictionary()
+        self.units = StringDictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "ColumnarLogStore":
+        """Build a store from log dictionaries as found in operational_logs.json."""
+        records = list(records)
+        store = cls(capacity=len(records))
+        store.append_many(records)
+        return store
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve_locked(self, extra: int):
+        """Grow the column buffers to fit ``extra`` more readings (lock held)."""
+        needed = self._size + extra
+        capacity = len(self._value)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_value", "_threshold", "_excess", "_timestamp", "_facility", "_metric", "_unit"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """Append log dictionaries; returns the ``(start, end)`` row range written."""
+        records = list(records)
+        with self._lock:
+            start = self._size
+            self._reserve_locked(len(records))
+            for offset, log in enumerate(records):
+                row = start + offset
+                value = log.get("value", 0)
+                threshold = log.get("threshold", 0)
+                self._value[row] = value
+                self._threshold[row] = threshold
+                self._excess[row] = max(value - threshold, 0)
+                self._timestamp[row] = parse_timestamp_us(log.get("timestamp", datetime.now(timezone.utc).isoformat()))
+                self._facility[row] = self.facilities.encode(log.get("facility", "Unknown"))
+                self._metric[row] = self.metrics.encode(log.get("metric"))
+                self._unit[row] = self.units.encode(log.get("unit", ""))
+                self._ids.append(log.get("id"))
+            self._size = start + len(records)
+            return start, self._size
+
+    def append_columns(
+        self,
+        values: np.ndarray,
+        thresholds: np.ndarray,
+        timestamps: np.ndarray,
+        facilities: np.ndarray,
+        metrics: np.ndarray,
+        units: np.ndarray,
+        ids: Optional[List[Optional[str]]] = None
+    ) -> Tuple[int, int]:
+        """Append already encoded columns (codes must come from this store's dictionaries)."""
+        count = len(values)
+        with self._lock:
+            start = self._size
+            self._reserve_locked(count)
+            end = start + count
+            self._value[start:end] = values
+            self._threshold[start:end] = thresholds
+            np.maximum(self._value[start:end] - self._threshold[start:end], 0, out=self._excess[start:end])
+            self._timestamp[start:end] = timestamps
+            self._facility[start:end] = facilities
+            self._metric[start:end] = metrics
+            self._unit[start:end] = units
+            self._ids.extend(ids if ids is not None else [None] * count)
+            self._size = end
+            return start, end
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Consistent views of every column over the rows written so far."""
+        with self._lock:
+            size = self._size
+            return {
+                "value": self._value[:size],
+                "threshold": self._threshold[:size],
+                "excess": self._excess[:size],
+                "timestamp": self._timestamp[:size],
+                "facility": self._facility[:size],
+                "metric": self._metric[:size],
+                "unit": self._unit[:size]
+            }
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Rebuild the log dictionary for one row."""
+        value = float(self._value[row])
+        threshold = as_number(self._threshold[row])
+        return {
+            "id": self._ids[row],
+            "facility": self.facilities.values[self._facility[row]],
+            "metric": self.metrics.values[self._metric[row]],
+            "value": value,
+            "unit": self.units.values[self._unit[row]],
+            "threshold": threshold,
+            "timestamp": format_timestamp_us(self._timestamp[row]),
+            "status": "EXCEEDED" if value > threshold else "NORMAL"
+        }
+
+    def tail(self, count: int) -> List[Dict[str, Any]]:
+        """The last ``count`` readings as dictionaries, oldest first."""
+        size = self._size
+        return [self.record(row) for row in range(max(0, size - count), size)]
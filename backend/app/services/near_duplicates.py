@@ -0,0 +1,394 @@
+"""MinHash/LSH index of near-duplicate documents."""
+import hashlib
+import re
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.services.analysis_store import body_hash
+from app.services.document_store import DocumentStore
+from app.services.rule_extractor import RuleExtractorRegistry
+
+_WORD = re.compile(r"\w+")
+
+# Shingle hashes are combined from word hashes in batches of this many shingles
+_BATCH = 4096
+_EMPTY = np.iinfo(np.uint32).max
+
+
+def _sentence_segments(blocks: Iterable[str]) -> Iterable[str]:
+    """Re-split text blocks at the last sentence or line end so no sentence spans two segments."""
+    buffer = ""
+    for block in blocks:
+        buffer += block
+        cut = max(buffer.rfind(". "), buffer.rfind("\n"))
+        if cut < 0 and len(buffer) < 4 * len(block):
+            continue
+        cut = cut + 1 if cut >= 0 else len(buffer)
+        yield buffer[:cut]
+        buffer = buffer[cut:]
+    if buffer:
+        yield buffer
+
+
+@dataclass
+class IndexedDocument:
+    """A document's MinHash signature and what it was computed from."""
+    document_id: str
+    category: str
+    body_hash: str
+    # Digest of the rule clauses the pattern extractor finds in the body
+    rule_digest: str
+    signature: np.ndarray
+
+
+class NearDuplicateIndex:
+    """Finds documents whose bodies share most of their word shingles.
+
+    Each body is reduced to a MinHash signature over its ``shingle_size``-word
+    shingles, whose agreement rate estimates the Jaccard similarity of two
+    bodies. Signatures are split into ``bands`` bands and documents sharing
+    any band land in the same LSH bucket, so candidates are found without
+    comparing every pair. Only the first ``max_chars`` characters of a body
+    are shingled, which bounds the cost for very large uploads; the rule
+    digest always covers the full body. Bodies without any words are indexed
+    but never match anything. Signatures persist in the
+    ``document_signatures`` table, with the order they were indexed in, and
+    are loaded into memory when the index opens.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        rule_extractors: RuleExtractorRegistry,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 3,
+        max_chars: int = 1_000_000,
+        seed: int = 1
+    ):
+        """Open (or create) the signature table in the database at ``path``."""
+        if num_perm <= 0 or bands <= 0 or num_perm % bands:
+            raise ValueError("MinHash permutations must be a positive multiple of the LSH bands")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.rule_extractors = rule_extractors
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = max(1, shingle_size)
+        self.max_chars = max_chars
+        # Multiply-shift hash family: h(x) = ((a * x + b) mod 2^64) >> 32 with odd a
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64, endpoint=False) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64, endpoint=False)
+        self._params = f"{num_perm}:{self.shingle_size}:{max_chars}:{seed}"
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, IndexedDocument] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS document_signatures (
+                document_id TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                rule_digest TEXT NOT NULL,
+                params TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                indexed_seq INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID"""
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(document_signatures)")}
+        if "indexed_seq" not in columns:
+            self._conn.execute(
+                "ALTER TABLE document_signatures ADD COLUMN indexed_seq INTEGER NOT NULL DEFAULT 0"
+            )
+        # Signatures computed with other parameters are not comparable
+        self._conn.execute("DELETE FROM document_signatures WHERE params != ?", (self._params,))
+        self._conn.commit()
+        self._next_seq = self._conn.execute(
+            "SELECT COALESCE(MAX(indexed_seq), 0) + 1 FROM document_signatures"
+        ).fetchone()[0]
+        for row in self._conn.execute("SELECT * FROM document_signatures ORDER BY indexed_seq, document_id"):
+            self._insert_locked(IndexedDocument(
+                document_id=row["document_id"],
+                category=row["category"],
+                body_hash=row["body_hash"],
+                rule_digest=row["rule_digest"],
+                signature=np.frombuffer(row["signature"], dtype=np.uint32)
+            ))
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        # A body without words has no shingles to compare, so it joins no bucket
+        if np.all(signature == _EMPTY):
+            return []
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _insert_locked(self, entry: IndexedDocument):
+        self._remove_locked(entry.document_id)
+        self._entries[entry.document_id] = entry
+        for key in self._band_keys(entry.signature):
+            self._buckets.setdefault(key, set()).add(entry.document_id)
+
+    def _remove_locked(self, document_id: str):
+        entry = self._entries.pop(document_id, None)
+        if entry is None:
+            return
+        for key in self._band_keys(entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(document_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _signature(self, shingle_batches: Iterable[np.ndarray]) -> np.ndarray:
+        """Minimum of every hash function over all shingle hashes."""
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for shingles in shingle_batches:
+            hashed = (shingles[:, None] * self._a + self._b) >> np.uint64(32)
+            np.minimum(signature, hashed.min(axis=0), out=signature)
+        return np.minimum(signature, np.iinfo(np.uint32).max).astype(np.uint32)
+
+    def _shingles(self, words: List[str]) -> Iterable[np.ndarray]:
+        """Hashes of consecutive ``shingle_size``-word windows, in batches."""
+        size = self.shingle_size
+        for start in range(0, max(1, len(words) - size + 1), _BATCH):
+            window = words[start:start + _BATCH + size - 1]
+            word_hashes = np.fromiter(
+                (zlib.crc32(word.encode("utf-8")) for word in window), dtype=np.uint64, count=len(window)
+            )
+            count = max(1, len(window) - size + 1)
+            shingles = np.zeros(count, dtype=np.uint64)
+            for offset in range(min(size, len(window))):
+                shingles = shingles * np.uint64(0x100000001B3) + word_hashes[offset:offset + count]
+            yield shingles
+
+    def compute(self, document: Dict[str, Any], blocks: Iterable[str]) -> IndexedDocument:
+        """Signature and rule digest of a document body read in ``blocks``."""
+        extractor = self.rule_extractors.get(document.get("category"))
+        size = self.shingle_size
+        rules = set()
+        signature = np.full(self.num_perm, _EMPTY, dtype=np.uint32)
+        carry: List[str] = []
+        hashed = False
+        shingled = 0
+        for segment in _sentence_segments(blocks):
+            rules.update(rule.casefold() for rule in extractor.extract(segment))
+            if shingled >= self.max_chars:
+                continue
+            segment = segment[:self.max_chars - shingled]
+            shingled += len(segment)
+            words = carry + _WORD.findall(segment.lower())
+            if len(words) >= size:
+                np.minimum(signature, self._signature(self._shingles(words)), out=signature)
+                hashed = True
+                # Keep the last words so shingles spanning two segments are counted
+                carry = words[len(words) - size + 1:]
+            else:
+                carry = words
+        if carry and not hashed:
+            signature = self._signature(self._shingles(carry))
+        return IndexedDocument(
+            document_id=document["id"],
+            category=document.get("category") or "",
+            body_hash=body_hash(document),
+            rule_digest=hashlib.sha256("\n".join(sorted(rules)).encode("utf-8")).hexdigest(),
+            signature=signature
+        )
+
+    def add(self, document: Dict[str, Any], blocks: Iterable[str]) -> IndexedDocument:
+        """Index a document, or return its entry when the body is already indexed."""
+        with self._lock:
+            entry = self._entries.get(document["id"])
+        if (
+            entry is not None
+            and entry.body_hash == body_hash(document)
+            and entry.category == (document.get("category") or "")
+        ):
+            return entry
+        entry = self.compute(document, blocks)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO document_signatures
+                   (document_id, category, body_hash, rule_digest, params, signature, indexed_seq)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (entry.document_id, entry.category, entry.body_hash, entry.rule_digest,
+                 self._params, entry.signature.tobytes(), self._next_seq)
+            )
+            self._next_seq += 1
+            self._insert_locked(entry)
+        return entry
+
+    def get(self, document_id: str) -> Optional[IndexedDocument]:
+        """Indexed entry of a document, or None."""
+        with self._lock:
+            return self._entries.get(document_id)
+
+    @staticmethod
+    def similarity(a: IndexedDocument, b: IndexedDocument) -> float:
+        """Estimated Jaccard similarity of two documents' shingle sets."""
+        return float(np.count_nonzero(a.signature == b.signature)) / len(a.signature)
+
+    def _candidates_locked(self, entry: IndexedDocument) -> Set[str]:
+        candidates = set()
+        for key in self._band_keys(entry.signature):
+            candidates.update(self._buckets.get(key, ()))
+        candidates.discard(entry.document_id)
+        return candidates
+
+    def nearest(
+        self,
+        document_id: str,
+        min_similarity: float,
+        same_rules: bool = False
+    ) -> List[Tuple[IndexedDocument, float]]:
+        """Documents of the same category at least ``min_similarity`` alike, most similar first.
+
+        With ``same_rules`` only documents whose extracted rule clauses are
+        identical qualify, so the bodies differ only in prose without rules.
+        """
+        with self._lock:
+            entry = self._entries.get(document_id)
+            if entry is None:
+                return []
+            neighbors = [self._entries[candidate] for candidate in self._candidates_locked(entry)]
+        matches = []
+        for neighbor in neighbors:
+            if neighbor.category != entry.category:
+                continue
+            if same_rules and neighbor.rule_digest != entry.rule_digest:
+                continue
+            similarity = self.similarity(entry, neighbor)
+            if similarity >= min_similarity:
+                matches.append((neighbor, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0].document_id))
+        return matches
+
+    def clusters(self, min_similarity: float, min_size: int = 2) -> List[Dict[str, Any]]:
+        """Groups of same-category documents linked by pairs at least ``min_similarity`` alike.
+
+        Each cluster names a representative (the member whose current body
+        was indexed first) and lists members with their estimated similarity
+        to it, largest first. Bodies without words never cluster.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            candidate_pairs = {
+                entry.document_id: self._candidates_locked(entry) for entry in entries
+            }
+            by_id = dict(self._entries)
+        parent = {entry.document_id: entry.document_id for entry in entries}
+
+        def _find(document_id: str) -> str:
+            while parent[document_id] != document_id:
+                parent[document_id] = parent[parent[document_id]]
+                document_id = parent[document_id]
+            return document_id
+
+        for entry in entries:
+            for candidate in candidate_pairs[entry.document_id]:
+                if candidate not in parent or candidate < entry.document_id:
+                    continue
+                neighbor = by_id[candidate]
+                if neighbor.category == entry.category and self.similarity(entry, neighbor) >= min_similarity:
+                    parent[_find(candidate)] = _find(entry.document_id)
+
+        groups: Dict[str, List[IndexedDocument]] = {}
+        for entry in entries:
+            groups.setdefault(_find(entry.document_id), []).append(entry)
+        clusters = []
+        for members in groups.values():
+            if len(members) < max(2, min_size):
+                continue
+            representative = members[0]
+            documents = [
+                (member.document_id, round(self.similarity(representative, member), 3))
+                for member in members
+            ]
+            documents.sort(key=lambda document: -document[1])
+            clusters.append({
+                "representative": representative.document_id,
+                "category": representative.category,
+                "documents": documents
+            })
+        clusters.sort(key=lambda cluster: (-len(cluster["documents"]), cluster["representative"]))
+        return clusters
+
+    def prune_orphans(self) -> int:
+        """Drop signatures of documents that no longer exist."""
+        with self._lock, self._conn:
+            orphans = [row[0] for row in self._conn.execute(
+                """SELECT document_id FROM document_signatures
+                   WHERE document_id NOT IN (SELECT id FROM documents)"""
+            )]
+            self._conn.executemany(
+                "DELETE FROM document_signatures WHERE document_id = ?", [(o,) for o in orphans]
+            )
+            for document_id in orphans:
+                self._remove_locked(document_id)
+        return len(orphans)
+
+    def on_documents(self, event: str, documents: List[Dict[str, Any]]):
+        """Document store listener: drop signatures of documents a corpus replacement removed."""
+        if event == "documents.replaced":
+            self.prune_orphans()
+
+    def refresh(
+        self,
+        document_store: DocumentStore,
+        read_blocks: Callable[[Dict[str, Any]], Iterable[str]],
+        stop: Optional[threading.Event] = None
+    ) -> int:
+        """Prune deleted documents and index stored documents not indexed yet; returns how many were added.
+
+        Meant for a background backfill: it reads every missing body, and
+        stops early once ``stop`` is set.
+        """
+        # Uploads still in the ingestion log are not in the documents table yet
+        document_store.compact()
+        self.prune_orphans()
+        with self._lock:
+            missing = [row[0] for row in self._conn.execute(
+                """SELECT id FROM documents
+                   WHERE id NOT IN (SELECT document_id FROM document_signatures)"""
+            )]
+        added = 0
+        for document_id in missing:
+            if stop is not None and stop.is_set():
+                break
+            document = document_store.get(document_id)
+            if document is not None:
+                self.add(document, read_blocks(document))
+                added += 1
+        return added
+
+    def count(self) -> int:
+        """Number of indexed documents."""
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and LSH layout."""
+        with self._lock:
+            return {
+                "indexed": len(self._entries),
+                "buckets": len(self._buckets),
+                "permutations": self.num_perm,
+                "bands": self.bands
+            }
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,9 +1,22 @@
 """Enhanced NLP service using Groq API for real AI-powered document analysis."""
+import itertools
+import json
+import math
 import os
-from typing import List, Optional
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
 from datetime import datetime
 from app.models.document import DocumentAnalysis
 from app.core.config import settings
+from app.services.analysis_cache import AnalysisCache, get_analysis_cache
+from app.services.body_store import BodyStore, get_body_store
+from app.services.document_chunker import iter_document_chunks
+from app.services.rate_limiter import RateLimiter, get_rate_limiter
+from app.services.rule_extractor import RuleExtractorRegistry, get_rule_extractors
 
 # Optional Groq import - fallback to pattern matching if not available
 try:
@@ -13,108 +26,212 @@ except ImportError:
     GROQ_AVAILABLE = False
     Groq = None
 
+# Bump whenever the prompts or result post-processing change so cached
+# analyses produced by the old prompts are no longer served.
+PROMPT_VERSION = "4"
+
+# Cache namespace used when analysis runs on pattern matching instead of Groq
+# (suffixed with the rule pattern version).
+FALLBACK_MODEL = "pattern-fallback"
+
+MAX_RULES = 8
+MAX_INCONSISTENCIES = 5
+MAX_COMPLETION_TOKENS = 900
+
 
 class NLPService:
     """NLP service for compliance document analysis using Groq AI."""
     
-    def __init__(self):
-        """Initialize Groq client."""
+    def __init__(
+        self,
+        cache: Optional[AnalysisCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        http_client: Optional[httpx.Client] = None,
+        rule_extractors: Optional[RuleExtractorRegistry] = None,
+        body_store: Optional[BodyStore] = None
+    ):
+        """Initialize Groq client, analysis cache, rate limiter and fallback rule extractors.
+        
+        Pass ``http_client`` to share one pooled connection set across services.
+        """
+        self.cache = cache if cache is not None else get_analysis_cache()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        self.rule_extractors = rule_extractors if rule_extractors is not None else get_rule_extractors()
+        self.body_store = body_store if body_store is not None else get_body_store()
+        self._chunk_pool: Optional[ThreadPoolExecutor] = None
+        self._chunk_executor_lock = threading.Lock()
         self.client = None
         if GROQ_AVAILABLE and settings.groq_api_key:
             try:
-                self.client = Groq(api_key=settings.groq_api_key)
+                # Retries are owned by the shared rate limiter, not the SDK
+                self.client = Groq(
+                    api_key=settings.groq_api_key,
+                    max_retries=0,
+                    http_client=http_client
+                )
             except Exception as e:
                 print(f"Warning: Could not initialize Groq client: {e}")
                 self.client = None
         elif not GROQ_AVAILABLE:
             print("Info: Groq library not installed. Using fallback pattern matching for document analysis.")
     
-    def _extract_rules_with_ai(self, text: str, category: str) -> List[str]:
-        """Extract compliance rules using Groq AI."""
+    def warm_up(self):
+        """Establish a pooled connection to Groq so the first analysis skips the TLS handshake."""
         if not self.client:
-            return self._fallback_extract_rules(text)
-        
+            return
         try:
-            prompt = f"""Analyze the following {category} compliance document and extract all compliance rules and requirements. 
-Return only a JSON array of strings, each string being a specific compliance rule or requirement.
-
-Document text:
-{text}
-
-Return format: ["rule 1", "rule 2", "rule 3", ...]
-Maximum 8 rules. Be specific and concise."""
-
-            response = self.client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": "You are a compliance analysis expert. Extract compliance rules from documents. Always return valid JSON arrays only."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500
-            )
-            
-            content = response.choices[0].message.content.strip()
-            # Try to parse JSON from response
-            import json
-            import re
-            
-            # Extract JSON array from response
-            json_match = re.search(r'\[.*?\]', content, re.DOTALL)
-            if json_match:
-                rules = json.loads(json_match.group())
-                return [str(rule) for rule in rules[:8]]
-            
-            # Fallback: split by lines if JSON parsing fails
-            lines = [line.strip() for line in content.split('\n') if line.strip()]
-            return lines[:8]
-            
+            self.client.models.list()
         except Exception as e:
-            print(f"Error in AI rule extraction: {e}")
-            return self._fallback_extract_rules(text)
+            print(f"Warning: Groq warm-up request failed: {e}")
     
-    def _detect_inconsistencies_with_ai(self, text: str, category: str) -> List[str]:
-        """Detect inconsistencies using Groq AI."""
+    def _analyze_with_ai(self, chunks: Iterator[str], category: str) -> Optional[Tuple[List[str], List[str]]]:
+        """Extract rules and detect inconsistencies with Groq.
+        
+        A document that fits in one chunk takes a single call. Longer
+        documents arrive as section-aligned chunks that are analyzed in
+        parallel (map) and merged (reduce); at most two waves of chunks are
+        in flight, so a streamed body is never held in memory whole. Returns
+        ``(rules, inconsistencies)``, or None when the AI result is
+        unavailable and the caller should fall back to pattern matching.
+        """
         if not self.client:
-            return self._fallback_detect_inconsistencies(text, category)
+            return None
+        
+        first = next(chunks, "")
+        second = next(chunks, None)
+        if second is None:
+            return self._analyze_chunk(first, category)
         
+        executor = self._chunk_executor()
+        window = 2 * max(1, settings.analysis_chunk_concurrency)
+        pending: Deque[Future] = deque()
+        results = []
+        
+        def _collect() -> bool:
+            result = pending.popleft().result()
+            if result is None:
+                # A partial analysis must not pass for a complete one
+                for future in pending:
+                    future.cancel()
+                return False
+            results.append(result)
+            return True
+        
+        for part, chunk in enumerate(itertools.chain((first, second), chunks), start=1):
+            pending.append(executor.submit(self._analyze_chunk, chunk, category, part))
+            if len(pending) >= window and not _collect():
+                return None
+        while pending:
+            if not _collect():
+                return None
+        return self._merge_results(results)
+    
+    def _chunk_executor(self) -> ThreadPoolExecutor:
+        """Pool for chunk analyses, created on first use."""
+        with self._chunk_executor_lock:
+            if self._chunk_pool is None:
+                self._chunk_pool = ThreadPoolExecutor(
+                    max_workers=max(1, settings.analysis_chunk_concurrency),
+                    thread_name_prefix="analysis-chunk"
+                )
+            return self._chunk_pool
+    
+    def _analyze_chunk(
+        self,
+        text: str,
+        category: str,
+        part: Optional[int] = None
+    ) -> Optional[Tuple[List[str], List[str]]]:
+        """Analyze a document, or part ``part`` of a longer one, with a single Groq call; None on failure."""
         try:
-            prompt = f"""Analyze this {category} compliance document for inconsistencies, ambiguities, or potential compliance issues.
+            scope = ""
+            if part is not None:
+                scope = f" This is part {part} of a longer document; report only what appears in this part."
+            prompt = f"""Analyze the following {category} compliance document.{scope}
+
+1. Extract all compliance rules and requirements (maximum {MAX_RULES}). Be specific and concise.
+2. Identify inconsistencies, ambiguities, or potential compliance issues (maximum {MAX_INCONSISTENCIES}). Use an empty list if none are found.
 
 Document text:
 {text}
 
-Return a JSON array of strings, each describing a specific inconsistency or issue found. If no issues are found, return an empty array.
-
-Return format: ["issue 1", "issue 2", ...]
-Maximum 5 issues."""
+Return a JSON object of the form:
+{{"rules": ["rule 1", "rule 2", ...], "inconsistencies": ["issue 1", ...]}}"""
 
-            response = self.client.chat.completions.create(
-                model=settings.groq_model,
-                messages=[
-                    {"role": "system", "content": "You are a compliance auditor. Identify inconsistencies and compliance issues. Always return valid JSON arrays only."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.4,
-                max_tokens=400
+            messages = [
+                {"role": "system", "content": "You are a compliance analysis expert and auditor. Always return a single valid JSON object only."},
+                {"role": "user", "content": prompt}
+            ]
+            response = self.rate_limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=settings.groq_model,
+                    messages=messages,
+                    response_format={"type": "json_object"},
+                    temperature=0.3,
+                    max_tokens=MAX_COMPLETION_TOKENS
+                ),
+                estimated_tokens=self._estimate_tokens(messages) + MAX_COMPLETION_TOKENS
             )
             
             content = response.choices[0].message.content.strip()
-            import json
-            import re
-            
-            json_match = re.search(r'\[.*?\]', content, re.DOTALL)
-            if json_match:
-                issues = json.loads(json_match.group())
-                return [str(issue) for issue in issues[:5]]
-            
-            return []
+            return self._parse_analysis_response(content)
             
         except Exception as e:
-            print(f"Error in AI inconsistency detection: {e}")
-            return self._fallback_detect_inconsistencies(text, category)
+            print(f"Error in AI document analysis: {e}")
+            return None
+    
+    @staticmethod
+    def _merge_results(results: List[Tuple[List[str], List[str]]]) -> Tuple[List[str], List[str]]:
+        """Merge per-chunk results, dropping duplicates and keeping every chunk represented.
+        
+        Items are taken round-robin across chunks (first item of each chunk,
+        then the second, ...) so the limits do not cut off later sections.
+        """
+        merged = []
+        for field, limit in ((0, MAX_RULES), (1, MAX_INCONSISTENCIES)):
+            items = []
+            seen = set()
+            for row in itertools.zip_longest(*(result[field] for result in results)):
+                for item in row:
+                    key = " ".join(item.split()).casefold() if item is not None else None
+                    if key and key not in seen:
+                        seen.add(key)
+                        items.append(item)
+            merged.append(items[:limit])
+        return merged[0], merged[1]
     
-    def _calculate_compliance_score(self, text: str, inconsistencies: List[str], rules: List[str]) -> float:
+    @staticmethod
+    def _estimate_tokens(messages: List[dict]) -> int:
+        """Rough prompt token count (~4 characters per token) for rate limiting."""
+        return sum(len(message["content"]) for message in messages) // 4 + 1
+    
+    @staticmethod
+    def _parse_analysis_response(content: str) -> Tuple[List[str], List[str]]:
+        """Validate a combined analysis response against the expected schema.
+        
+        Raises ValueError if the content is not a JSON object with ``rules`` and
+        ``inconsistencies`` lists of strings.
+        """
+        try:
+            payload = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Analysis response is not valid JSON: {e}") from e
+        
+        if not isinstance(payload, dict):
+            raise ValueError("Analysis response must be a JSON object")
+        
+        fields = {}
+        for key, limit in (("rules", MAX_RULES), ("inconsistencies", MAX_INCONSISTENCIES)):
+            items = payload.get(key)
+            if not isinstance(items, list):
+                raise ValueError(f"Analysis response field '{key}' must be a list")
+            if not all(isinstance(item, str) for item in items):
+                raise ValueError(f"Analysis response field '{key}' must contain only strings")
+            fields[key] = [item.strip() for item in items if item.strip()][:limit]
+        
+        return fields["rules"], fields["inconsistencies"]
+    
+    def _calculate_compliance_score(self, text_length: int, inconsistencies: List[str], rules: List[str]) -> float:
         """Calculate compliance score based on analysis."""
         base_score = 90.0
         
@@ -125,7 +242,7 @@ Maximum 5 issues."""
         rules_bonus = min(len(rules) * 2.0, 10.0)
         
         # Bonus for document detail (length)
-        length_bonus = min(len(text) / 150, 5.0)
+        length_bonus = min(text_length / 150, 5.0)
         
         # Penalty if no rules extracted
         if not rules:
@@ -134,22 +251,18 @@ Maximum 5 issues."""
         final_score = base_score - score_reduction + rules_bonus + length_bonus
         return max(0.0, min(100.0, round(final_score, 2)))
     
-    def _fallback_extract_rules(self, text: str) -> List[str]:
-        """Fallback rule extraction using regex patterns."""
-        import re
+    def _fallback_extract_rules(self, chunks: Iterable[str], category: Optional[str] = None) -> List[str]:
+        """Fallback rule extraction using the compiled trigger patterns."""
+        extractor = self.rule_extractors.get(category)
         rules = []
-        
-        patterns = [
-            r"must (?:maintain|keep|ensure|comply with|not exceed) ([^\.]+)",
-            r"required to ([^\.]+)",
-            r"must be ([^\.]+)",
-            r"shall ([^\.]+)",
-            r"mandatory ([^\.]+)",
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            rules.extend(matches)
+        seen = set()
+        for chunk in chunks:
+            for rule in extractor.extract(chunk, limit=MAX_RULES):
+                if rule.casefold() not in seen:
+                    seen.add(rule.casefold())
+                    rules.append(rule)
+            if len(rules) >= MAX_RULES:
+                break
         
         if not rules:
             rules = [
@@ -158,45 +271,159 @@ Maximum 5 issues."""
                 "Document all activities"
             ]
         
-        return list(set(rules))[:8]
+        return rules[:MAX_RULES]
     
-    def _fallback_detect_inconsistencies(self, text: str, category: str) -> List[str]:
+    def _fallback_detect_inconsistencies(self, blocks: Iterable[str], text_length: int, category: str) -> List[str]:
         """Fallback inconsistency detection."""
         inconsistencies = []
+        terms = {"must": False, "should": False, "emissions": False, "discharge": False}
+        tail = ""
+        for block in blocks:
+            # Carry a few characters over so terms split between blocks are found
+            lowered = tail + block.lower()
+            for term, found in terms.items():
+                terms[term] = found or term in lowered
+            tail = lowered[-8:]
         
-        if "must" in text.lower() and "should" in text.lower():
+        if terms["must"] and terms["should"]:
             inconsistencies.append("Mixed use of mandatory ('must') and advisory ('should') language")
         
-        if len(text) < 100:
+        if text_length < 100:
             inconsistencies.append("Document may lack sufficient detail for compliance requirements")
         
-        if category == "Environmental" and "emissions" not in text.lower() and "discharge" not in text.lower():
+        if category == "Environmental" and not terms["emissions"] and not terms["discharge"]:
             inconsistencies.append("Environmental document may be missing key environmental metrics")
         
         return inconsistencies
     
-    def analyze_document(self, document_id: str, text: str, category: str) -> DocumentAnalysis:
-        """Analyze a document using AI-powered NLP."""
-        # Extract rules using AI
-        extracted_rules = self._extract_rules_with_ai(text, category)
+    def close(self):
+        """Stop the chunk analysis pool."""
+        with self._chunk_executor_lock:
+            if self._chunk_pool is not None:
+                self._chunk_pool.shutdown(wait=False, cancel_futures=True)
+                self._chunk_pool = None
+    
+    def analysis_model(self) -> str:
+        """Name of the model that will produce analyses (part of the cache key)."""
+        if self.client:
+            return settings.groq_model
+        return self._fallback_model()
+    
+    def _fallback_model(self) -> str:
+        """Model name recorded for pattern-matching analyses."""
+        return f"{FALLBACK_MODEL}-{self.rule_extractors.version}"
+    
+    def analyze_document(self, document_id: str, text: str, category: str, refresh: bool = False) -> DocumentAnalysis:
+        """Analyze a document using AI-powered NLP.
+        
+        Results are served from the analysis cache when the same body and
+        category were already analyzed with the current model and prompts,
+        unless ``refresh`` is set.
+        """
+        return self._analyze(document_id, category, len(text), lambda: [text], refresh)
+    
+    def analyze_stored_body(
+        self,
+        document_id: str,
+        body_ref: str,
+        text_length: int,
+        category: str,
+        refresh: bool = False
+    ) -> DocumentAnalysis:
+        """Analyze a body kept in the body store, reading it in blocks."""
+        return self._analyze(document_id, category, text_length, lambda: self.body_store.iter_text(body_ref), refresh)
+    
+    def record_blocks(self, document: Dict[str, Any]) -> Iterable[str]:
+        """Body of a document record in blocks, read from the body store when kept out of line."""
+        if document.get("body_ref"):
+            return self.body_store.iter_text(document["body_ref"])
+        return [document["body"]]
+    
+    def llm_calls(self, text_length: int) -> int:
+        """Approximate number of model calls an analysis of ``text_length`` characters takes."""
+        if not self.client:
+            return 0
+        return max(1, math.ceil(text_length / settings.analysis_chunk_chars))
+    
+    def reuse_analysis(self, source: DocumentAnalysis, document: Dict[str, Any]) -> DocumentAnalysis:
+        """Analysis of ``document`` copied from a near-duplicate's, rescored for its own length."""
+        text_length = document.get("body_length") or len(document["body"])
+        compliance_score = self._calculate_compliance_score(text_length, source.inconsistencies, source.extracted_rules)
+        return DocumentAnalysis(
+            document_id=document["id"],
+            extracted_rules=list(source.extracted_rules),
+            inconsistencies=list(source.inconsistencies),
+            compliance_score=compliance_score,
+            risk_level=self._determine_risk_level(compliance_score, source.inconsistencies),
+            analyzed_at=datetime.now(),
+            model=source.model,
+            reused_from=source.document_id
+        )
+    
+    def analyze_record(self, document: Dict[str, Any], refresh: bool = False) -> DocumentAnalysis:
+        """Analyze a document record, whether its body is inline or in the body store."""
+        if document.get("body_ref"):
+            return self.analyze_stored_body(
+                document["id"], document["body_ref"], document["body_length"], document["category"], refresh
+            )
+        return self.analyze_document(document["id"], document["body"], document["category"], refresh)
+    
+    def _analyze(
+        self,
+        document_id: str,
+        category: str,
+        text_length: int,
+        read_blocks: Callable[[], Iterable[str]],
+        refresh: bool = False
+    ) -> DocumentAnalysis:
+        """Analyze the text produced by ``read_blocks``, which may be called more than once.
+        
+        ``refresh`` skips the cache lookup; the new result still replaces the cached one.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = AnalysisCache.make_stream_key(read_blocks(), category, self.analysis_model(), PROMPT_VERSION)
+            cached = None if refresh else self.cache.get(cache_key)
+            if cached is not None:
+                return DocumentAnalysis.from_dict({**cached, "document_id": document_id, "model": self.analysis_model()})
         
-        # Detect inconsistencies using AI
-        inconsistencies = self._detect_inconsistencies_with_ai(text, category)
+        def _chunks() -> Iterator[str]:
+            return iter_document_chunks(read_blocks(), settings.analysis_chunk_chars)
+        
+        # Extract rules and detect inconsistencies with AI
+        ai_result = self._analyze_with_ai(_chunks(), category)
+        if ai_result is not None:
+            extracted_rules, inconsistencies = ai_result
+            model = settings.groq_model
+            cacheable = True
+        else:
+            extracted_rules = self._fallback_extract_rules(_chunks(), category)
+            inconsistencies = self._fallback_detect_inconsistencies(read_blocks(), text_length, category)
+            # Pattern matching is deterministic, but a failed AI call must not
+            # pin a degraded result in the cache under the AI model's key.
+            cacheable = self.client is None
+            model = self._fallback_model()
         
         # Calculate compliance score
-        compliance_score = self._calculate_compliance_score(text, inconsistencies, extracted_rules)
+        compliance_score = self._calculate_compliance_score(text_length, inconsistencies, extracted_rules)
         
         # Determine risk level
         risk_level = self._determine_risk_level(compliance_score, inconsistencies)
         
-        return DocumentAnalysis(
+        analysis = DocumentAnalysis(
             document_id=document_id,
             extracted_rules=extracted_rules,
             inconsistencies=inconsistencies,
             compliance_score=compliance_score,
             risk_level=risk_level,
-            analyzed_at=datetime.now()
+            analyzed_at=datetime.now(),
+            model=model
         )
+        
+        if cache_key is not None and cacheable:
+            self.cache.set(cache_key, analysis.to_dict())
+        
+        return analysis
     
     def _determine_risk_level(self, score: float, inconsistencies: List[str]) -> str:
         """Determine risk level based on score and inconsistencies."""
@@ -1,10 +1,14 @@
 """Processing pipeline for automated compliance analysis."""
-import json
 from datetime import datetime, timedelta
-from typing import List, Dict
-from pathlib import Path
+from typing import List, Dict, Optional
 
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.services.document_store import DocumentStore
+from app.services.file_cache import FileCache, get_file_cache
+from app.services.job_manager import JobProgress
 from app.services.nlp_service import NLPService
+from app.services.analysis_engine import AnalysisEngine
 from app.services.synthetic_data_generator import SyntheticDataGenerator
 from app.models.alert import Alert
 from app.models.document import Document, DocumentAnalysis
@@ -13,8 +17,17 @@ from app.models.document import Document, DocumentAnalysis
 class ProcessingPipeline:
     """Automated processing pipeline for compliance monitoring."""
     
-    def __init__(self):
-        self.nlp_service = NLPService()
+    def __init__(
+        self,
+        nlp_service: Optional[NLPService] = None,
+        analysis_engine: Optional[AnalysisEngine] = None,
+        document_store: Optional[DocumentStore] = None,
+        file_cache: Optional[FileCache] = None
+    ):
+        self.nlp_service = nlp_service or NLPService()
+        self.analysis_engine = analysis_engine or AnalysisEngine(self.nlp_service)
+        self.document_store = document_store or DocumentStore(settings.database_path)
+        self.file_cache = file_cache or get_file_cache()
         self.data_generator = SyntheticDataGenerator()
     
     def generate_synthetic_data(self, document_count: int = 10, log_count: int = 50) -> Dict:
@@ -22,12 +35,11 @@ class ProcessingPipeline:
         documents = self.data_generator.generate_documents(document_count)
         logs = self.data_generator.generate_operational_logs(log_count)
         
-        # Save to files
-        data_dir = Path(__file__).parent.parent / "data"
-        data_dir.mkdir(exist_ok=True)
+        # Replace the corpus and save logs
+        settings.data_dir.mkdir(parents=True, exist_ok=True)
         
-        self.data_generator.save_documents(documents, data_dir / "sample_documents.json")
-        self.data_generator.save_operational_logs(logs, data_dir / "operational_logs.json")
+        self.document_store.replace_all(documents)
+        self.data_generator.save_operational_logs(logs, settings.data_dir / "operational_logs.json")
         
         return {
             "documents_generated": len(documents),
@@ -35,36 +47,30 @@ class ProcessingPipeline:
             "timestamp": datetime.now().isoformat()
         }
     
-    def process_all_documents(self) -> List[DocumentAnalysis]:
-        """Process all documents through NLP analysis."""
-        data_path = Path(__file__).parent.parent / "data" / "sample_documents.json"
+    async def process_all_documents(
+        self,
+        progress: Optional[JobProgress] = None,
+        force: bool = False
+    ) -> List[DocumentAnalysis]:
+        """Process all documents through NLP analysis concurrently.
         
-        if not data_path.exists():
-            return []
-        
-        with open(data_path, "r") as f:
-            documents_data = json.load(f)
-        
-        analyses = []
-        for doc_data in documents_data:
-            analysis = self.nlp_service.analyze_document(
-                document_id=doc_data["id"],
-                text=doc_data["body"],
-                category=doc_data["category"]
-            )
-            analyses.append(analysis)
-        
-        return analyses
+        ``progress`` is given the document count and advanced as each
+        analysis completes. Current stored analyses are reused unless
+        ``force`` is set.
+        """
+        documents_data = await run_blocking(self.document_store.list)
+        if progress is None:
+            return await self.analysis_engine.analyze_many(documents_data, force=force)
+        progress.set_total(len(documents_data))
+        return await self.analysis_engine.analyze_many(
+            documents_data,
+            on_complete=lambda document, analysis: progress.advance(),
+            force=force
+        )
     
     def generate_alerts_from_logs(self) -> List[Alert]:
         """Generate alerts from operational logs that exceed thresholds."""
-        logs_path = Path(__file__).parent.parent / "data" / "operational_logs.json"
-        
-        if not logs_path.exists():
-            return []
-        
-        with open(logs_path, "r") as f:
-            logs = json.load(f)
+        logs = self.file_cache.load_json(settings.data_dir / "operational_logs.json")
         
         alerts = []
         for log in logs:
@@ -100,7 +106,13 @@ class ProcessingPipeline:
         
         return alerts
     
-    def run_full_pipeline(self, generate_new_data: bool = False, document_count: int = 10, log_count: int = 50) -> Dict:
+    async def run_full_pipeline(
+        self,
+        generate_new_data: bool = False,
+        document_count: int = 10,
+        log_count: int = 50,
+        progress: Optional[JobProgress] = None
+    ) -> Dict:
         """Run the complete processing pipeline."""
         results = {
             "timestamp": datetime.now().isoformat(),
@@ -113,15 +125,15 @@ class ProcessingPipeline:
         
         # Step 1: Generate synthetic data if requested
         if generate_new_data:
-            results["data_generation"] = self.generate_synthetic_data(document_count, log_count)
+            results["data_generation"] = await run_blocking(self.generate_synthetic_data, document_count, log_count)
         
         # Step 2: Process all documents
-        analyses = self.process_all_documents()
+        analyses = await self.process_all_documents(progress)
         results["documents_analyzed"] = len(analyses)
         results["analyses"] = [a.to_dict() for a in analyses]
         
         # Step 3: Generate alerts from logs
-        alerts = self.generate_alerts_from_logs()
+        alerts = await run_blocking(self.generate_alerts_from_logs)
         results["alerts_generated"] = len(alerts)
         results["alerts"] = [a.to_dict() for a in alerts]
         
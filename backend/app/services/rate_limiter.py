@@ -0,0 +1,187 @@
+"""Process-wide rate limiting and retry policy for Groq API traffic."""
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``per_minute`` units."""
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        """Add the tokens accrued since the last refill."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if available now)."""
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        """Take ``amount`` tokens from the bucket."""
+        self.tokens -= min(amount, self.capacity)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Whether ``error`` is an HTTP 429 from the API."""
+    return getattr(error, "status_code", None) == 429
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Parse the Retry-After header from a rate limit error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """Thread-safe requests-per-minute and tokens-per-minute limiter.
+
+    Every LLM call goes through :meth:`call`, which waits for capacity in both
+    buckets and retries HTTP 429 responses with exponential backoff and full
+    jitter. A Retry-After header pauses all callers, not just the one that
+    received it, so the process backs off as a whole.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """Initialize the limiter with per-minute budgets and retry policy."""
+        self._clock = clock
+        self._sleep = sleep
+        now = clock()
+        self._requests = TokenBucket(requests_per_minute, now)
+        self._tokens = TokenBucket(tokens_per_minute, now)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.calls = 0
+        self.queued = 0
+        self.waiting = 0
+        self.throttled = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_wait_seconds = 0.0
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Block until one request and ``tokens`` tokens are available.
+
+        Returns the number of seconds spent waiting.
+        """
+        waited = 0.0
+        counted = False
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._requests.refill(now)
+                self._tokens.refill(now)
+                delay = max(
+                    self._blocked_until - now,
+                    self._requests.wait_time(1),
+                    self._tokens.wait_time(tokens)
+                )
+                if delay <= 0:
+                    self._requests.consume(1)
+                    self._tokens.consume(tokens)
+                    if counted:
+                        self.waiting -= 1
+                    self.total_wait_seconds += waited
+                    return waited
+                if not counted:
+                    counted = True
+                    self.queued += 1
+                    self.waiting += 1
+            self._sleep(delay)
+            waited += delay
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Exponential backoff with full jitter, never shorter than Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def call(self, fn: Callable[[], T], estimated_tokens: int = 1) -> T:
+        """Run ``fn`` under the rate limit, retrying rate limit errors."""
+        attempt = 0
+        while True:
+            self.acquire(estimated_tokens)
+            with self._lock:
+                self.calls += 1
+            try:
+                return fn()
+            except Exception as e:
+                if not _is_rate_limit_error(e):
+                    raise
+                with self._lock:
+                    self.throttled += 1
+                    if attempt >= self.max_retries:
+                        self.failures += 1
+                        raise
+                    self.retries += 1
+                    retry_after = _retry_after_seconds(e)
+                    if retry_after is not None:
+                        self._blocked_until = max(self._blocked_until, self._clock() + retry_after)
+                delay = self._backoff_delay(attempt, retry_after)
+                self._sleep(delay)
+                attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters for queued and throttled calls."""
+        return {
+            "requests_per_minute": int(self._requests.capacity),
+            "tokens_per_minute": int(self._tokens.capacity),
+            "calls": self.calls,
+            "queued": self.queued,
+            "waiting": self.waiting,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "failures": self.failures,
+            "total_wait_seconds": round(self.total_wait_seconds, 3)
+        }
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter shared by all Groq callers."""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter(
+                requests_per_minute=settings.groq_requests_per_minute,
+                tokens_per_minute=settings.groq_tokens_per_minute,
+                max_retries=settings.groq_max_retries
+            )
+        return _default_limiter
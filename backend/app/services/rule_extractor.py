@@ -0,0 +1,164 @@
+"""Single-pass regex extraction of compliance rules for the pattern fallback."""
+import hashlib
+import json
+import re
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from app.core.config import settings
+
+# Phrases that introduce a rule; the clause that follows them is extracted.
+DEFAULT_RULE_TRIGGERS = [
+    r"must (?:maintain|keep|ensure|comply with|not exceed)",
+    r"required to",
+    r"must be",
+    r"shall",
+    r"mandatory",
+]
+
+# Abbreviations whose periods do not end a clause (matched case-insensitively)
+ABBREVIATIONS = ["e.g.", "i.e.", "etc.", "sec.", "no.", "vs.", "approx.", "fig."]
+
+
+def _inner_period(abbreviation: str) -> str:
+    """Regex matching an abbreviation from its first period, preceded by the rest of it."""
+    head, _, tail = abbreviation.partition(".")
+    return rf"(?<=\b{re.escape(head)})\.{re.escape(tail)}"
+
+
+# A clause runs to the end of its sentence: a '.', '!' or '?' or a line break.
+# Decimal points ("6.5") and the periods of the abbreviations above do not end it.
+_CLAUSE = r"([^.!?\n]+(?:(?:(?<=\d)\.(?=\d)|{})[^.!?\n]*)*)".format(
+    "|".join(_inner_period(abbreviation) for abbreviation in ABBREVIATIONS)
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RuleExtractor:
+    """Extracts rule clauses with one compiled pattern over all triggers.
+
+    Triggers are combined into a single alternation and matched against the
+    lower-cased text, which lets the regex engine skip ahead to candidate
+    first letters instead of trying every trigger at every position, so
+    triggers must be written in lower case. Rules come back in document order
+    with case- and whitespace-insensitive duplicates removed, so the same
+    text always yields the same list.
+    """
+
+    def __init__(self, triggers: Sequence[str]):
+        """Compile ``triggers`` (regexes without a trailing space); raises ValueError if one is invalid."""
+        if not triggers:
+            raise ValueError("At least one rule trigger is required")
+        self.triggers = list(triggers)
+        alternation = "|".join(f"(?:{trigger})" for trigger in self.triggers)
+        try:
+            self.pattern = re.compile(rf"(?:{alternation})\s+{_CLAUSE}")
+            # For text whose length changes when lower-cased
+            self._pattern_ignorecase = re.compile(rf"(?:{alternation})\s+{_CLAUSE}", re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"Invalid rule trigger pattern: {e}") from e
+        # Triggers may contain their own groups; the clause is always the last one
+        self._clause_group = self.pattern.groups
+
+    def extract(self, text: str, limit: Optional[int] = None) -> List[str]:
+        """Rule clauses in order of appearance, stopping after ``limit`` unique rules."""
+        lowered = text.lower()
+        pattern = self.pattern
+        if len(lowered) != len(text):
+            lowered, pattern = text, self._pattern_ignorecase
+        
+        rules: List[str] = []
+        seen = set()
+        seen_raw = set()
+        pos = 0
+        while True:
+            match = pattern.search(lowered, pos)
+            if match is None:
+                break
+            start = match.start()
+            if start and (lowered[start - 1].isalnum() or lowered[start - 1] == "_"):
+                # Trigger inside a longer word ("marshall"); retry just after it
+                pos = start + 1
+                continue
+            pos = match.end()
+            clause_start, clause_end = match.span(self._clause_group)
+            raw = lowered[clause_start:clause_end]
+            if raw in seen_raw:
+                continue
+            seen_raw.add(raw)
+            rule = _WHITESPACE.sub(" ", text[clause_start:clause_end]).strip(" ,;:")
+            key = rule.casefold()
+            if not rule or key in seen:
+                continue
+            seen.add(key)
+            rules.append(rule)
+            if limit is not None and len(rules) >= limit:
+                break
+        return rules
+
+
+def load_rule_triggers(path: Optional[str]) -> Dict[str, List[str]]:
+    """Read per-category triggers from a JSON file.
+
+    The file maps ``"default"`` and category names to lists of trigger
+    regexes; a category uses the default triggers followed by its own.
+    Returns only the built-in defaults when ``path`` is unset.
+    """
+    if not path:
+        return {"default": list(DEFAULT_RULE_TRIGGERS)}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not all(
+        isinstance(triggers, list) and all(isinstance(t, str) for t in triggers)
+        for triggers in data.values()
+    ):
+        raise ValueError(f"{path} must map categories to lists of patterns")
+    data.setdefault("default", list(DEFAULT_RULE_TRIGGERS))
+    return data
+
+
+class RuleExtractorRegistry:
+    """Compiled extractors per document category."""
+
+    def __init__(self, triggers: Dict[str, List[str]]):
+        """Compile every category's triggers up front so invalid patterns fail at startup."""
+        self.triggers = triggers
+        self._extractors: Dict[str, RuleExtractor] = {}
+        self._lock = threading.Lock()
+        for category in triggers:
+            self.get(category)
+        # The clause pattern is part of the version: changing it changes what the triggers extract
+        fingerprint = json.dumps({"triggers": triggers, "clause": _CLAUSE}, sort_keys=True)
+        self.version = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:12]
+
+    def get(self, category: Optional[str]) -> RuleExtractor:
+        """Extractor for ``category`` (the default triggers for unknown categories)."""
+        if category not in self.triggers:
+            category = "default"
+        with self._lock:
+            extractor = self._extractors.get(category)
+            if extractor is None:
+                triggers = self.triggers["default"]
+                if category != "default":
+                    triggers = triggers + [t for t in self.triggers[category] if t not in triggers]
+                extractor = RuleExtractor(triggers)
+                self._extractors[category] = extractor
+            return extractor
+
+
+_default_registry: Optional[RuleExtractorRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_rule_extractors() -> RuleExtractorRegistry:
+    """Return the process-wide extractors, loaded from ``RULE_PATTERNS_PATH`` when set."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            try:
+                _default_registry = RuleExtractorRegistry(load_rule_triggers(settings.rule_patterns_path))
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not load rule patterns from {settings.rule_patterns_path}: {e}")
+                _default_registry = RuleExtractorRegistry(load_rule_triggers(None))
+        return _default_registry
@@ -0,0 +1,300 @@
+"""Full-text search over document titles, bodies and extracted rules."""
+import queue
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models.document import DocumentAnalysis
+from app.services.analysis_store import AnalysisStore
+from app.services.body_store import BodyStore
+from app.services.document_store import DocumentStore
+
+_TERM = re.compile(r"\w+")
+
+# bm25 column weights: a hit in the title counts most, then in a rule, then in the body
+_WEIGHTS = (10.0, 1.0, 4.0)
+
+# Documents indexed per transaction; bodies are read one batch at a time
+_BATCH = 500
+
+
+def build_match_query(query: str) -> str:
+    """FTS5 query matching every word of ``query``; a trailing ``*`` makes the last word a prefix.
+
+    Words are quoted so punctuation and FTS5 operators in user input are
+    never interpreted as query syntax. Returns "" when there is no word.
+    """
+    terms = [f'"{term}"' for term in _TERM.findall(query)]
+    if terms and query.rstrip().endswith("*"):
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """An SQLite FTS5 index of every document, ranked with BM25.
+
+    Each document has one row holding its title, its body (read from the
+    body store for large uploads, up to ``max_body_chars``) and the rules
+    of its stored analysis. Once :meth:`start` is called, documents added
+    to the store are indexed by a background thread, so writers never wait
+    for bodies to be read; their rules are refreshed after each analysis,
+    so the index never has to be rebuilt to answer queries.
+    ``search_documents`` maps FTS rowids to document ids and holds the
+    columns results are filtered and shown by.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        body_store: BodyStore,
+        analysis_store: Optional[AnalysisStore] = None,
+        max_body_chars: int = 1_000_000
+    ):
+        """Open (or create) the search tables in the database at ``path``."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.body_store = body_store
+        self.analysis_store = analysis_store
+        self.max_body_chars = max_body_chars
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS search_documents (
+                rowid INTEGER PRIMARY KEY,
+                document_id TEXT NOT NULL UNIQUE,
+                category TEXT NOT NULL,
+                published_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_search_documents_category ON search_documents(category);
+            CREATE VIRTUAL TABLE IF NOT EXISTS document_search USING fts5(
+                title, body, rules,
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            );
+            """
+        )
+        self._conn.commit()
+        self._queue: "queue.Queue[Optional[Tuple[List[Dict[str, Any]], bool]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def _body(self, document: Dict[str, Any]) -> str:
+        """Text to index for a document's body."""
+        if not document.get("body_ref"):
+            return document["body"][:self.max_body_chars]
+        parts = []
+        remaining = self.max_body_chars
+        for block in self.body_store.iter_text(document["body_ref"]):
+            parts.append(block[:remaining])
+            remaining -= len(parts[-1])
+            if remaining <= 0:
+                break
+        return "".join(parts)
+
+    def _rules(self, document_id: str) -> List[str]:
+        """Rules of the stored analysis of a document, if any."""
+        if self.analysis_store is None:
+            return []
+        record = self.analysis_store.get(document_id)
+        return record["analysis"].extracted_rules if record else []
+
+    def _upsert_locked(self, document: Dict[str, Any], body: str, rules: List[str]):
+        row = self._conn.execute(
+            "SELECT rowid FROM search_documents WHERE document_id = ?", (document["id"],)
+        ).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM document_search WHERE rowid = ?", (row[0],))
+            self._conn.execute(
+                "UPDATE search_documents SET category = ?, published_at = ? WHERE rowid = ?",
+                (document.get("category") or "", document.get("published_at"), row[0])
+            )
+            rowid = row[0]
+        else:
+            rowid = self._conn.execute(
+                "INSERT INTO search_documents (document_id, category, published_at) VALUES (?, ?, ?)",
+                (document["id"], document.get("category") or "", document.get("published_at"))
+            ).lastrowid
+        self._conn.execute(
+            "INSERT INTO document_search (rowid, title, body, rules) VALUES (?, ?, ?, ?)",
+            (rowid, document.get("title") or "", body, "\n".join(rules))
+        )
+
+    def _index_batch(self, documents: List[Dict[str, Any]]):
+        """Add or replace one batch of documents in a transaction."""
+        prepared = [(document, self._body(document), self._rules(document["id"])) for document in documents]
+        with self._lock, self._conn:
+            for document, body, rules in prepared:
+                self._upsert_locked(document, body, rules)
+
+    def index(self, documents: Iterable[Dict[str, Any]], replace_all: bool = False):
+        """Add or replace documents, ``_BATCH`` per transaction; ``replace_all`` first drops every document.
+
+        Memory use is bounded by the batch size however many documents
+        there are.
+        """
+        if replace_all:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM document_search")
+                self._conn.execute("DELETE FROM search_documents")
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= _BATCH:
+                self._index_batch(batch)
+                batch = []
+        if batch:
+            self._index_batch(batch)
+
+    def on_documents(self, event: str, documents: List[Dict[str, Any]]):
+        """Document store listener: index added documents and rebuild on replacement.
+
+        With the background indexer running this only queues the documents.
+        """
+        replace_all = event == "documents.replaced"
+        if self._worker is None:
+            self.index(documents, replace_all=replace_all)
+        else:
+            self._queue.put((documents, replace_all))
+
+    def start(self):
+        """Index documents passed to :meth:`on_documents` in a background thread."""
+        if self._worker is not None:
+            return
+
+        def _run():
+            while True:
+                item = self._queue.get()
+                try:
+                    if item is None:
+                        return
+                    documents, replace_all = item
+                    self.index(documents, replace_all=replace_all)
+                except Exception as e:
+                    print(f"Warning: Search indexing failed: {e}")
+                finally:
+                    self._queue.task_done()
+
+        self._worker = threading.Thread(target=_run, name="search-indexer", daemon=True)
+        self._worker.start()
+
+    def flush(self):
+        """Wait until every queued document has been indexed."""
+        if self._worker is not None:
+            self._queue.join()
+
+    def record_analysis(self, document: Dict[str, Any], analysis: DocumentAnalysis):
+        """Analysis engine listener: index the document's freshly extracted rules."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT rowid FROM search_documents WHERE document_id = ?", (document["id"],)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE document_search SET rules = ? WHERE rowid = ?",
+                    ("\n".join(analysis.extracted_rules), row[0])
+                )
+        if row is None:
+            self.on_documents("documents.added", [document])
+
+    def sync(self, document_store: DocumentStore, stop: Optional[threading.Event] = None) -> int:
+        """Drop documents that no longer exist and index stored documents missing from the index.
+
+        Meant for a background backfill: it stops early once ``stop`` is
+        set. Returns how many documents were missing.
+        """
+        document_store.compact()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """DELETE FROM document_search WHERE rowid IN (
+                       SELECT rowid FROM search_documents
+                       WHERE document_id NOT IN (SELECT id FROM documents)
+                   )"""
+            )
+            self._conn.execute(
+                "DELETE FROM search_documents WHERE document_id NOT IN (SELECT id FROM documents)"
+            )
+            missing = [row[0] for row in self._conn.execute(
+                "SELECT id FROM documents WHERE id NOT IN (SELECT document_id FROM search_documents)"
+            )]
+
+        def _documents():
+            for document_id in missing:
+                if stop is not None and stop.is_set():
+                    return
+                document = document_store.get(document_id)
+                if document is not None:
+                    yield document
+
+        self.index(_documents())
+        return len(missing)
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Documents matching every word of ``query``, best BM25 score first.
+
+        Returns the total number of matches and one page of hits, each with
+        a snippet of the best-matching column where matches are wrapped in
+        ``<mark>`` tags.
+        """
+        match = build_match_query(query)
+        if not match:
+            return 0, []
+        where = "document_search MATCH ?"
+        params: List[Any] = [match]
+        if category:
+            # Unary + keeps SQLite from driving the join from the category
+            # index, which would run the full-text match once per document
+            where += " AND +m.category = ?"
+            params.append(category)
+        with self._lock:
+            total = self._conn.execute(
+                f"""SELECT COUNT(*) FROM document_search
+                    JOIN search_documents m ON m.rowid = document_search.rowid
+                    WHERE {where}""",
+                params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"""SELECT m.document_id, m.category, m.published_at, document_search.title AS title,
+                           snippet(document_search, -1, '<mark>', '</mark>', '…', 16) AS snippet,
+                           bm25(document_search, ?, ?, ?) AS score
+                    FROM document_search
+                    JOIN search_documents m ON m.rowid = document_search.rowid
+                    WHERE {where}
+                    ORDER BY score
+                    LIMIT ? OFFSET ?""",
+                [*_WEIGHTS, *params, limit, offset]
+            ).fetchall()
+        return total, [
+            {
+                "id": row["document_id"],
+                "title": row["title"],
+                "category": row["category"],
+                "published_at": row["published_at"],
+                "snippet": row["snippet"],
+                # bm25() is lower for better matches; report higher-is-better
+                "score": round(-row["score"], 4)
+            }
+            for row in rows
+        ]
+
+    def count(self) -> int:
+        """Number of indexed documents."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM search_documents").fetchone()[0]
+
+    def close(self):
+        """Index what is still queued, stop the background indexer and close the database connection."""
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        with self._lock:
+            self._conn.close()
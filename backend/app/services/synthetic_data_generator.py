@@ -180,8 +180,9 @@ class SyntheticDataGenerator:
         base_id = random.randint(1000, 5000)
         for i in range(count):
             category = random.choice(categories)
-            # Add randomness to IDs to avoid perfect sequences
-            doc_id = f"DOC-{base_id + i + random.randint(0, 10)}"
+            # Add randomness to IDs to avoid perfect sequences (kept unique,
+            # since ids are the document store's primary key)
+            doc_id = f"DOC-{base_id + i * 11 + random.randint(0, 10)}"
             documents.append(SyntheticDataGenerator.generate_document(category, doc_id))
         
         return documents
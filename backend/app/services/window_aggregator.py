@@ -0,0 +1,208 @@
+"""Sliding-window aggregates of operational readings per facility and metric."""
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.log_store import ColumnarLogStore
+
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86_400}
+
+
+def parse_window(spec: str) -> float:
+    """Parse a window such as ``"15m"``, ``"24h"`` or ``"30d"`` into seconds."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd])\s*", spec)
+    if not match:
+        raise ValueError(f"Invalid window: {spec!r}")
+    return float(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+
+
+class _Window:
+    """Ring of time buckets for one window length, shared by every key.
+
+    Slot ``b % buckets`` holds absolute bucket ``b``. Each key keeps running
+    counts and sums, updated when readings arrive and when buckets expire.
+    """
+
+    def __init__(self, label: str, seconds: float, buckets: int, keys: int):
+        self.label = label
+        self.seconds = seconds
+        self.buckets = buckets
+        self.width_us = max(1, int(np.ceil(seconds * 1_000_000 / buckets)))
+        self.head: Optional[int] = None
+        self.count = np.zeros((keys, buckets), dtype=np.int64)
+        self.total = np.zeros((keys, buckets), dtype=np.float64)
+        self.low = np.full((keys, buckets), np.inf)
+        self.high = np.full((keys, buckets), -np.inf)
+        self.running_count = np.zeros(keys, dtype=np.int64)
+        self.running_sum = np.zeros(keys, dtype=np.float64)
+
+    def grow(self, keys: int):
+        """Make room for ``keys`` keys."""
+        extra = keys - len(self.running_count)
+        if extra <= 0:
+            return
+        self.count = np.vstack([self.count, np.zeros((extra, self.buckets), dtype=np.int64)])
+        self.total = np.vstack([self.total, np.zeros((extra, self.buckets))])
+        self.low = np.vstack([self.low, np.full((extra, self.buckets), np.inf)])
+        self.high = np.vstack([self.high, np.full((extra, self.buckets), -np.inf)])
+        self.running_count = np.concatenate([self.running_count, np.zeros(extra, dtype=np.int64)])
+        self.running_sum = np.concatenate([self.running_sum, np.zeros(extra)])
+
+    def _clear_slot(self, slot: int):
+        self.running_count -= self.count[:, slot]
+        self.running_sum -= self.total[:, slot]
+        self.count[:, slot] = 0
+        self.total[:, slot] = 0.0
+        self.low[:, slot] = np.inf
+        self.high[:, slot] = -np.inf
+
+    def advance(self, now_us: int):
+        """Expire buckets that have slid out of the window."""
+        bucket = now_us // self.width_us
+        if self.head is not None and bucket <= self.head:
+            return
+        if self.head is None or bucket - self.head >= self.buckets:
+            for slot in range(self.buckets):
+                self._clear_slot(slot)
+            self.running_count[:] = 0
+            self.running_sum[:] = 0.0
+        else:
+            for expired in range(self.head + 1, bucket + 1):
+                self._clear_slot(expired % self.buckets)
+        self.head = bucket
+
+    def add(self, keys: np.ndarray, timestamps: np.ndarray, values: np.ndarray):
+        """Fold readings into their buckets; readings from the future count as current."""
+        bucket = np.minimum(timestamps // self.width_us, self.head)
+        live = bucket > self.head - self.buckets
+        if not live.all():
+            keys, bucket, values = keys[live], bucket[live], values[live]
+        if len(keys) == 0:
+            return
+        slot = bucket % self.buckets
+        np.add.at(self.count, (keys, slot), 1)
+        np.add.at(self.total, (keys, slot), values)
+        np.minimum.at(self.low, (keys, slot), values)
+        np.maximum.at(self.high, (keys, slot), values)
+        size = len(self.running_count)
+        self.running_count += np.bincount(keys, minlength=size)
+        self.running_sum += np.bincount(keys, weights=values, minlength=size)
+
+    def stats(self, keys: List[int]) -> Dict[str, Any]:
+        """Count, mean, min and max over the given keys combined."""
+        count = int(self.running_count[keys].sum())
+        if count == 0:
+            return {"count": 0, "mean": None, "min": None, "max": None}
+        return {
+            "count": count,
+            "mean": float(self.running_sum[keys].sum()) / count,
+            "min": float(self.low[keys].min()),
+            "max": float(self.high[keys].max())
+        }
+
+
+class WindowAggregator:
+    """Rolling count, mean, min and max per (facility, metric).
+
+    Every window is split into a fixed number of time buckets, so windows
+    advance in bucket-sized steps (a 24h window with 60 buckets moves every
+    24 minutes). Updates cost O(1) amortized per reading. Count and mean are
+    read from running totals; min and max scan the window's buckets, which
+    is a constant bounded by the bucket count.
+    """
+
+    def __init__(
+        self,
+        windows: Dict[str, float],
+        buckets: int = 60,
+        clock: Callable[[], float] = time.time
+    ):
+        """Create an aggregator for ``windows`` (label -> length in seconds)."""
+        self.windows = dict(windows)
+        self.bucket_count = buckets
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget every reading."""
+        with self._lock:
+            self._keys: Dict[Tuple[str, str], int] = {}
+            self._labels: List[Tuple[str, str]] = []
+            self._windows = {
+                label: _Window(label, seconds, self.bucket_count, 0)
+                for label, seconds in self.windows.items()
+            }
+
+    def _now_us(self) -> int:
+        return int(self._clock() * 1_000_000)
+
+    def _key_locked(self, facility: str, metric: str) -> int:
+        key = self._keys.get((facility, metric))
+        if key is None:
+            key = len(self._labels)
+            self._keys[(facility, metric)] = key
+            self._labels.append((facility, metric))
+        return key
+
+    def add_rows(self, store: ColumnarLogStore, start: int, end: int):
+        """Fold rows ``start:end`` of a log store into every window."""
+        if end <= start:
+            return
+        columns = store.columns()
+        facility = columns["facility"][start:end].astype(np.int64)
+        metric = columns["metric"][start:end].astype(np.int64)
+        pairs, inverse = np.unique((facility << 32) | metric, return_inverse=True)
+        now_us = self._now_us()
+        with self._lock:
+            lookup = np.array([
+                self._key_locked(
+                    store.facilities.values[int(pair) >> 32],
+                    store.metrics.values[int(pair) & 0xFFFFFFFF]
+                )
+                for pair in pairs
+            ], dtype=np.int64)
+            keys = lookup[inverse]
+            for window in self._windows.values():
+                window.grow(len(self._labels))
+                window.advance(now_us)
+                window.add(keys, columns["timestamp"][start:end], columns["value"][start:end])
+
+    def _matching_keys(self, facility: Optional[str], metric: Optional[str]) -> List[int]:
+        return [
+            key for key, (key_facility, key_metric) in enumerate(self._labels)
+            if (facility is None or key_facility == facility) and (metric is None or key_metric == metric)
+        ]
+
+    def window_label(self, seconds: float) -> Optional[str]:
+        """Label of the configured window of exactly ``seconds``, if any."""
+        for label, length in self.windows.items():
+            if length == seconds:
+                return label
+        return None
+
+    def combined(self, window: str, facility: Optional[str] = None, metric: Optional[str] = None) -> Dict[str, Any]:
+        """Aggregate one window over every key matching ``facility`` and ``metric``."""
+        now_us = self._now_us()
+        with self._lock:
+            state = self._windows[window]
+            state.advance(now_us)
+            return state.stats(self._matching_keys(facility, metric))
+
+    def rolling(self, facility: Optional[str] = None, metric: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-(facility, metric) aggregates for every window."""
+        now_us = self._now_us()
+        with self._lock:
+            for state in self._windows.values():
+                state.advance(now_us)
+            return [
+                {
+                    "facility": self._labels[key][0],
+                    "metric": self._labels[key][1],
+                    "windows": {label: state.stats([key]) for label, state in self._windows.items()}
+                }
+                for key in self._matching_keys(facility, metric)
+            ]
@@ -0,0 +1,122 @@
+"""Benchmark columnar log analytics against the previous per-dict loops."""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.analytics_service import AnalyticsService
+from app.services.log_store import ColumnarLogStore
+
+FACILITIES = ["Plant A", "Plant B", "Plant C", "Warehouse 1", "Office Complex"]
+METRICS = {"Air Emissions": 20, "Water Quality": 75, "Temperature": 25, "Pressure": 65, "Noise Level": 85}
+UNITS = ["ppm", "mg/L", "°C", "psi", "dB"]
+
+
+def build_store(rows: int, seed: int = 42) -> ColumnarLogStore:
+    """Generate ``rows`` synthetic readings directly as columns."""
+    rng = np.random.default_rng(seed)
+    store = ColumnarLogStore(capacity=rows)
+    for name in FACILITIES:
+        store.facilities.encode(name)
+    for name in METRICS:
+        store.metrics.encode(name)
+    for name in UNITS:
+        store.units.encode(name)
+
+    metric = rng.integers(0, len(METRICS), rows, dtype=np.int32)
+    thresholds = np.array(list(METRICS.values()), dtype=np.float64)[metric]
+    values = np.round(thresholds * rng.uniform(0.5, 1.4, rows), 2)
+    now_us = int(time.time() * 1_000_000)
+    timestamps = now_us - rng.integers(0, 30 * 86_400 * 1_000_000, rows, dtype=np.int64)
+    store.append_columns(
+        values=values,
+        thresholds=thresholds,
+        timestamps=timestamps,
+        facilities=rng.integers(0, len(FACILITIES), rows, dtype=np.int32),
+        metrics=metric,
+        units=metric.copy()
+    )
+    return store
+
+
+def dict_loop_analytics(logs, metric: str):
+    """The previous implementation: Python loops over a list of dicts."""
+    deviations = []
+    for log in logs:
+        value = log.get("value", 0)
+        threshold = log.get("threshold", 0)
+        if value > threshold:
+            deviations.append({
+                "metric": log.get("metric"),
+                "value": value,
+                "threshold": threshold,
+                "deviation": value - threshold,
+                "percentage": ((value - threshold) / threshold) * 100,
+                "timestamp": log.get("timestamp"),
+                "facility": log.get("facility")
+            })
+
+    total = len(logs)
+    exceeded = sum(1 for log in logs if log.get("value", 0) > log.get("threshold", 0))
+    average_deviation = sum(max(0, log.get("value", 0) - log.get("threshold", 0)) for log in logs) / total
+
+    values = [log["value"] for log in logs if log.get("metric") == metric]
+    average = sum(values) / len(values)
+    return len(deviations), exceeded, average_deviation, average
+
+
+def columnar_analytics(service: AnalyticsService, metric: str):
+    """The vectorized implementation (deviation count, safety metrics, average)."""
+    store = service._load_log_store()
+    columns = store.columns()
+    deviation_count = int(np.count_nonzero(columns["excess"]))
+    safety = service.calculate_safety_metrics()
+    average = float(columns["value"].compress(columns["metric"] == store.metrics.lookup(metric)).mean())
+    return deviation_count, safety["threshold_exceeded_count"], safety["average_deviation"], average
+
+
+def timed(fn, repeat: int) -> float:
+    """Best wall-clock time of ``repeat`` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000, help="readings in the columnar store")
+    parser.add_argument("--baseline-rows", type=int, default=1_000_000, help="readings for the dict-loop baseline")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    metric = "Air Emissions"
+
+    store = build_store(args.rows)
+    service = AnalyticsService.__new__(AnalyticsService)
+    service._load_log_store = lambda: store
+    columnar_ms = timed(lambda: columnar_analytics(service, metric), args.repeat)
+    print(f"columnar   {args.rows:>12,} readings: {columnar_ms:9.1f} ms")
+
+    baseline_store = build_store(args.baseline_rows)
+    baseline_logs = [baseline_store.record(row) for row in range(args.baseline_rows)]
+    service._load_log_store = lambda: baseline_store
+    loop_ms = timed(lambda: dict_loop_analytics(baseline_logs, metric), args.repeat)
+    small_ms = timed(lambda: columnar_analytics(service, metric), args.repeat)
+    print(f"dict loop  {args.baseline_rows:>12,} readings: {loop_ms:9.1f} ms")
+    print(f"columnar   {args.baseline_rows:>12,} readings: {small_ms:9.1f} ms  ({loop_ms / small_ms:.0f}x faster)")
+
+    expected = dict_loop_analytics(baseline_logs, metric)
+    actual = columnar_analytics(service, metric)
+    assert expected[:2] == actual[:2], (expected, actual)
+    assert np.allclose(expected[2:], actual[2:]), (expected, actual)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Count model calls for a synthetic corpus with and without near-duplicate reuse."""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.analysis_cache import AnalysisCache
+from app.services.analysis_engine import AnalysisEngine
+from app.services.analysis_store import AnalysisStore
+from app.services.document_store import DocumentStore
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.nlp_service import NLPService
+from app.services.rate_limiter import RateLimiter
+from app.services.synthetic_data_generator import SyntheticDataGenerator
+
+
+def run(documents, directory: Path, reuse: bool):
+    """Analyze ``documents`` against a stub model; returns (model calls, seconds, engine stats)."""
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        content = json.dumps({"rules": ["Stub rule"], "inconsistencies": []})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    database = directory / "compliance.sqlite3"
+    document_store = DocumentStore(database)
+    document_store.add_many(documents)
+    nlp = NLPService(
+        cache=AnalysisCache(directory / "cache.sqlite3"),
+        rate_limiter=RateLimiter(1_000_000, 1_000_000_000)
+    )
+    nlp.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    analysis_store = AnalysisStore(database)
+    index = NearDuplicateIndex(database, nlp.rule_extractors) if reuse else None
+    engine = AnalysisEngine(nlp, analysis_store=analysis_store, near_duplicates=index)
+
+    started = time.perf_counter()
+    asyncio.run(engine.analyze_many(documents))
+    elapsed = time.perf_counter() - started
+    stats = engine.stats()
+
+    engine.shutdown()
+    nlp.close()
+    if index is not None:
+        index.close()
+    analysis_store.close()
+    document_store.close()
+    return len(calls), elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    documents = SyntheticDataGenerator.generate_documents(args.documents)
+    unique_bodies = len({document["body"] for document in documents})
+    print(f"documents      {len(documents):6}  ({unique_bodies} distinct bodies)")
+    print(f"reuse threshold {settings.near_duplicate_reuse_threshold:5.2f}")
+
+    with tempfile.TemporaryDirectory() as baseline_dir, tempfile.TemporaryDirectory() as reuse_dir:
+        baseline_calls, baseline_s, _ = run(documents, Path(baseline_dir), reuse=False)
+        reuse_calls, reuse_s, stats = run(documents, Path(reuse_dir), reuse=True)
+
+    print(f"cache only     {baseline_calls:6} model calls  ({baseline_s * 1000:.0f} ms)")
+    print(
+        f"near-dup reuse {reuse_calls:6} model calls  ({reuse_s * 1000:.0f} ms, "
+        f"{stats['reused_analyses']} analyses reused, "
+        f"{1 - reuse_calls / max(1, baseline_calls):.0%} fewer calls)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark the compiled rule extractor against the previous per-pattern passes."""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.rule_extractor import DEFAULT_RULE_TRIGGERS, RuleExtractor
+
+LEGACY_PATTERNS = [
+    r"must (?:maintain|keep|ensure|comply with|not exceed) ([^\.]+)",
+    r"required to ([^\.]+)",
+    r"must be ([^\.]+)",
+    r"shall ([^\.]+)",
+    r"mandatory ([^\.]+)",
+]
+
+RULE_SENTENCES = [
+    "All facilities must maintain emission levels below {n} ppm.",
+    "Operators are required to submit inspection reports every {n} days.",
+    "Safety equipment must be inspected at least {n} times per year.",
+    "The site manager shall keep a record of all {n} discharge events.",
+    "Wearing protective equipment is mandatory in zone {n}.",
+    "Contractors must not exceed a noise level of {n} dB near residential areas.",
+]
+FILLER_SENTENCES = [
+    "The facility operates three shifts and employs {n} staff.",
+    "Readings are collected by automated sensors every {n} minutes.",
+    "Historical data indicates a seasonal pattern in water usage.",
+    "Plant {n} was commissioned after the regional expansion program.",
+    "Quarterly reviews summarize operational performance for management.",
+]
+
+
+def build_corpus(megabytes: float, seed: int = 7) -> str:
+    """Synthetic regulatory prose with roughly one rule per four sentences."""
+    rng = random.Random(seed)
+    target = int(megabytes * 1024 * 1024)
+    parts = []
+    size = 0
+    while size < target:
+        template = rng.choice(RULE_SENTENCES) if rng.random() < 0.25 else rng.choice(FILLER_SENTENCES)
+        sentence = template.format(n=rng.randint(1, 500))
+        parts.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(parts)
+
+
+def legacy_extract(text: str):
+    """The previous implementation: one findall pass per pattern."""
+    rules = []
+    for pattern in LEGACY_PATTERNS:
+        rules.extend(re.findall(pattern, text, re.IGNORECASE))
+    return list(set(rules))
+
+
+def timed(fn, repeat: int) -> float:
+    """Best wall-clock time of ``repeat`` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=float, default=50, help="size of the synthetic corpus")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.megabytes)
+    size_mb = len(corpus.encode("utf-8")) / (1024 * 1024)
+    extractor = RuleExtractor(DEFAULT_RULE_TRIGGERS)
+
+    legacy_s = timed(lambda: legacy_extract(corpus), args.repeat)
+    compiled_s = timed(lambda: extractor.extract(corpus), args.repeat)
+    print(f"corpus      {size_mb:9.1f} MB")
+    print(f"per-pattern {size_mb / legacy_s:9.1f} MB/s  ({legacy_s * 1000:.0f} ms)")
+    print(f"compiled    {size_mb / compiled_s:9.1f} MB/s  ({compiled_s * 1000:.0f} ms, {legacy_s / compiled_s:.1f}x faster)")
+
+    expected = {" ".join(rule.split()).casefold() for rule in legacy_extract(corpus)}
+    actual = {rule.casefold() for rule in extractor.extract(corpus)}
+    assert actual == expected, (len(actual), len(expected))
+    print(f"unique rules {len(actual):8,}")
+
+
+if __name__ == "__main__":
+    main()
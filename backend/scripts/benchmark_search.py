@@ -0,0 +1,71 @@
+"""Measure full-text search latency over a large synthetic corpus."""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.body_store import BodyStore
+from app.services.search_index import SearchIndex
+from app.services.synthetic_data_generator import SyntheticDataGenerator
+
+CATEGORIES = ["Environmental", "Safety", "Data Privacy", "Financial"]
+QUERIES = [
+    ("emissions", "Environmental"),
+    ("encrypted data", None),
+    ("audit*", "Safety"),
+    ("inspection records", None),
+    ("must", None),
+]
+
+
+def build_corpus(count: int, filler_words: int, seed: int):
+    """Synthetic documents padded with random vocabulary so bodies resemble real lengths."""
+    random.seed(seed)
+    vocabulary = [f"term{i}" for i in range(50_000)]
+    documents = []
+    for i in range(count):
+        document = SyntheticDataGenerator.generate_document(random.choice(CATEGORIES), f"DOC-{i}")
+        document["body"] += " " + " ".join(random.choices(vocabulary, k=filler_words))
+        documents.append(document)
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--filler-words", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    documents = build_corpus(args.documents, args.filler_words, args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        index = SearchIndex(Path(directory) / "search.sqlite3", BodyStore(Path(directory) / "bodies"))
+        started = time.perf_counter()
+        for start in range(0, len(documents), 1000):
+            index.index(documents[start:start + 1000])
+        print(f"indexed {len(documents):,} documents in {time.perf_counter() - started:.1f} s")
+
+        started = time.perf_counter()
+        index.index([dict(documents[0], title="Updated title")])
+        print(f"single upsert        {(time.perf_counter() - started) * 1000:8.2f} ms")
+
+        for query, category in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                total, _ = index.search(query, category=category)
+                timings.append((time.perf_counter() - started) * 1000)
+            label = f"{query!r}" + (f" in {category}" if category else "")
+            print(f"{label:32} {statistics.median(timings):8.2f} ms  ({total:,} hits)")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""One-shot import of legacy JSON document files into the SQLite document store."""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.document_store import DocumentStore
+
+def import_documents(paths):
+    """Import each JSON array file into the document store, skipping known ids."""
+    store = DocumentStore(settings.database_path)
+    
+    total = 0
+    for path in paths:
+        imported = store.import_json(Path(path))
+        total += imported
+        print(f"✅ Imported {imported} documents from {path}")
+    
+    print(f"📁 Document store: {settings.database_path} ({store.count()} documents)")
+    store.close()
+    return total
+
+if __name__ == "__main__":
+    import_documents(sys.argv[1:] or [settings.data_dir / "sample_documents.json"])
@@ -0,0 +1,26 @@
+"""Shared test fixtures."""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Run the application against a scratch copy of the sample data so tests
+# never write to the repository's data directory.
+_SOURCE_DATA_DIR = Path(__file__).parent.parent / "app" / "data"
+_TEST_DATA_DIR = Path(tempfile.mkdtemp(prefix="compliance-tests-"))
+for _name in ("sample_documents.json", "operational_logs.json"):
+    shutil.copy(_SOURCE_DATA_DIR / _name, _TEST_DATA_DIR / _name)
+os.environ["DATA_DIR"] = str(_TEST_DATA_DIR)
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    """Test client with the application lifespan (and its services) running."""
+    with TestClient(app) as test_client:
+        yield test_client
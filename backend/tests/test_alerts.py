@@ -1,12 +1,8 @@
 """Tests for alerts API."""
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 
-client = TestClient(app)
 
-
-def test_get_alerts():
+def test_get_alerts(client):
     """Test getting all alerts."""
     response = client.get("/api/v1/alerts/")
     assert response.status_code == 200
@@ -14,9 +10,131 @@ def test_get_alerts():
     assert len(response.json()) > 0
 
 
-def test_generate_alerts():
+def test_generate_alerts(client):
     """Test generating alerts."""
     response = client.post("/api/v1/alerts/generate")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
 
+
+def test_generate_alerts_is_idempotent_per_window(client):
+    """Re-running generation over the same readings raises no duplicates."""
+    client.post("/api/v1/alerts/generate")
+    
+    response = client.post("/api/v1/alerts/generate")
+    
+    assert response.json() == []
+
+
+def test_threshold_alerts_are_kept_per_facility():
+    """Same metric at two facilities is two alerts; repeats within a window are one."""
+    from app.services.alert_dedup import AlertDeduplicator
+    
+    index = AlertDeduplicator(window_seconds=3600)
+    
+    assert index.claim("ThresholdExceeded", "Plant A", "Pressure", "2024-05-01T10:05:00Z")
+    assert index.claim("ThresholdExceeded", "Plant B", "Pressure", "2024-05-01T10:05:00Z")
+    assert not index.claim("ThresholdExceeded", "Plant A", "Pressure", "2024-05-01T10:55:00Z")
+    assert index.claim("ThresholdExceeded", "Plant A", "Pressure", "2024-05-01T11:05:00Z")
+
+
+def test_suppression_window_slides_from_the_last_alert():
+    """The window starts at the last alert rather than at a clock boundary."""
+    from app.services.alert_dedup import AlertDeduplicator
+    
+    index = AlertDeduplicator(window_seconds=3600)
+    
+    assert index.claim("ThresholdExceeded", "Plant A", "Pressure", "2024-05-01T10:59:59Z")
+    assert not index.claim("ThresholdExceeded", "Plant A", "Pressure", "2024-05-01T11:00:01Z")
+    assert not index.claim("ThresholdExceeded", "Plant A", "Pressure", "2024-05-01T11:59:58Z")
+    assert index.claim("ThresholdExceeded", "Plant A", "Pressure", "2024-05-01T11:59:59Z")
+
+
+def test_expired_entries_are_evicted():
+    """Keys whose window closed before the newest alert leave the in-memory index."""
+    from app.services.alert_dedup import AlertDeduplicator
+    
+    index = AlertDeduplicator(window_seconds=60)
+    for minute in range(10):
+        index.claim("ThresholdExceeded", f"Plant {minute}", "Pressure", f"2024-05-01T10:{minute:02d}:00Z")
+    
+    assert index.evict_expired() == 9
+    assert len(index) == 1
+
+
+def test_alerts_are_paginated_with_a_cursor(client):
+    """Pages follow X-Next-Cursor until it is absent."""
+    first = client.get("/api/v1/alerts/?limit=2")
+    assert len(first.json()) == 2
+    cursor = first.headers["X-Next-Cursor"]
+    
+    second = client.get(f"/api/v1/alerts/?limit=2&cursor={cursor}")
+    
+    ids = [a["alert_id"] for a in first.json() + second.json()]
+    assert len(ids) == len(set(ids))
+    assert client.get("/api/v1/alerts/?cursor=abc").status_code == 400
+
+
+def test_alerts_are_unbounded_without_limit_or_cursor(client):
+    """Clients that do not paginate still receive every alert."""
+    store = client.app.state.services.alert_store
+    store.add_many([
+        {"type": "Bulk", "message": f"Reading {i}", "severity": "LOW", "timestamp": "2024-05-01T10:00:00Z"}
+        for i in range(150)
+    ])
+    
+    response = client.get("/api/v1/alerts/?type=Bulk")
+    assert len(response.json()) == 150
+    assert "X-Next-Cursor" not in response.headers
+    
+    paged = client.get("/api/v1/alerts/?type=Bulk&cursor=0")
+    assert len(paged.json()) == 100
+    assert "X-Next-Cursor" in paged.headers
+
+
+def test_alert_filters_and_resolve(client):
+    """Severity and resolved filters use stored columns; resolving updates both."""
+    high = client.get("/api/v1/alerts/?severity=HIGH&resolved=false&limit=1000").json()
+    assert high and all(a["severity"] == "HIGH" and not a["resolved"] for a in high)
+    
+    response = client.post(f"/api/v1/alerts/{high[0]['alert_id']}/resolve")
+    assert response.status_code == 200
+    assert response.json()["resolved"] is True
+    
+    resolved = client.get("/api/v1/alerts/?resolved=true&limit=1000").json()
+    assert high[0]["alert_id"] in {a["alert_id"] for a in resolved}
+    assert client.post("/api/v1/alerts/ALERT-0/resolve").status_code == 404
+
+
+def test_alert_store_persists_dedup_windows(tmp_path):
+    """A reopened store still suppresses alerts raised before the restart."""
+    from app.services.alert_store import AlertStore
+    
+    alert = {"type": "ThresholdExceeded", "message": "Pressure high", "severity": "HIGH",
+             "timestamp": "2024-05-01T10:05:00Z", "facility": "Plant A", "metric": "Pressure"}
+    store = AlertStore(tmp_path / "alerts.sqlite3")
+    assert store.add_many([alert], deduplicate=True)[0]["alert_id"] == "ALERT-1"
+    store.close()
+    
+    reopened = AlertStore(tmp_path / "alerts.sqlite3")
+    
+    assert reopened.add_many([alert], deduplicate=True) == []
+    assert reopened.count() == 1
+
+
+def test_failed_insert_does_not_claim_the_window(tmp_path):
+    """An alert whose insert fails is not suppressed when it is raised again."""
+    import sqlite3
+    
+    from app.services.alert_store import AlertStore
+    
+    alert = {"type": "ThresholdExceeded", "message": "Pressure high", "severity": "HIGH",
+             "timestamp": "2024-05-01T10:05:00Z", "facility": "Plant A", "metric": "Pressure"}
+    store = AlertStore(tmp_path / "alerts.sqlite3")
+    store.add_many([dict(alert, facility="Plant B")])
+    
+    with pytest.raises(sqlite3.IntegrityError):
+        store.add_many([dict(alert, alert_id="ALERT-1")], deduplicate=True)
+    
+    assert len(store.add_many([alert], deduplicate=True)) == 1
+    assert store.count() == 2
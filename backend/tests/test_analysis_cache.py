@@ -0,0 +1,44 @@
+"""Tests for the persistent analysis cache."""
+from app.services.analysis_cache import AnalysisCache
+from app.services.nlp_service import NLPService
+
+
+def test_key_depends_on_model_and_prompt_version():
+    """Changing the model or prompt version changes the cache key."""
+    base = AnalysisCache.make_key("body", "Safety", "model-a", "1")
+    assert base == AnalysisCache.make_key("body", "Safety", "model-a", "1")
+    assert base != AnalysisCache.make_key("body", "Safety", "model-b", "1")
+    assert base != AnalysisCache.make_key("body", "Safety", "model-a", "2")
+    assert base != AnalysisCache.make_key("body", "Health", "model-a", "1")
+
+
+def test_lru_eviction_and_counters(tmp_path):
+    """Least recently used entries are evicted once the cache is full."""
+    cache = AnalysisCache(tmp_path / "cache.sqlite3", max_entries=2)
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+    cache.set("c", {"value": 3})
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_analyze_document_served_from_cache(tmp_path):
+    """A second analysis of the same body is a cache hit."""
+    cache = AnalysisCache(tmp_path / "cache.sqlite3")
+    service = NLPService(cache=cache)
+    text = "All facilities must maintain emissions below 20 ppm. Reports are required to be filed weekly."
+    
+    first = service.analyze_document("DOC-1", text, "Environmental")
+    second = service.analyze_document("DOC-2", text, "Environmental")
+    
+    assert second.document_id == "DOC-2"
+    assert second.extracted_rules == first.extracted_rules
+    assert second.compliance_score == first.compliance_score
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,32 @@
+"""Tests for the concurrent analysis engine."""
+import asyncio
+import time
+
+from app.models.document import DocumentAnalysis
+from app.services.analysis_engine import AnalysisEngine
+
+
+class SlowNLPService:
+    """Stand-in for NLPService that simulates a slow LLM round-trip."""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+    
+    def analyze_record(self, document: dict, refresh: bool = False) -> DocumentAnalysis:
+        time.sleep(self.delay)
+        return DocumentAnalysis(document_id=document["id"])
+
+
+def test_analyze_many_runs_in_parallel_and_keeps_order():
+    """Documents are analyzed concurrently and returned in input order."""
+    engine = AnalysisEngine(SlowNLPService(delay=0.05), concurrency=10)
+    documents = [{"id": f"DOC-{i}", "body": "text", "category": "Safety"} for i in range(20)]
+    
+    started = time.perf_counter()
+    analyses = asyncio.run(engine.analyze_many(documents))
+    elapsed = time.perf_counter() - started
+    engine.shutdown()
+    
+    assert [a.document_id for a in analyses] == [d["id"] for d in documents]
+    # 20 documents at 50ms each take ~1s serially; two waves of 10 take ~0.1s.
+    assert elapsed < 0.5
@@ -0,0 +1,42 @@
+"""Tests for analytics API."""
+import time
+
+import pytest
+
+
+def _analyze_all(client):
+    """Run the analyze-documents job to completion (analytics only reads stored analyses)."""
+    job_id = client.post("/api/v1/processing/analyze-documents").json()["job_id"]
+    for _ in range(200):
+        job = client.get(f"/api/v1/processing/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.05)
+    assert job["status"] == "done"
+
+
+def test_get_compliance_trends(client):
+    """Test compliance trends."""
+    _analyze_all(client)
+    response = client.get("/api/v1/analytics/trends?days=3650")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["trends"]) > 0
+    assert "safety_metrics" in data
+
+
+def test_dashboard_matches_individual_endpoints(client):
+    """The dashboard snapshot returns the same data as the separate endpoints."""
+    _analyze_all(client)
+    response = client.get("/api/v1/analytics/dashboard?days=3650")
+    assert response.status_code == 200
+    data = response.json()
+    
+    trends = client.get("/api/v1/analytics/trends?days=3650").json()
+    facilities = client.get("/api/v1/analytics/facility-risks").json()
+    activity = client.get("/api/v1/analytics/recent-activity").json()
+    
+    assert data["trends"] == trends["trends"]
+    assert data["safety_metrics"] == trends["safety_metrics"]
+    assert data["facilities"] == facilities["facilities"]
+    assert data["activities"] == activity["activities"]
@@ -0,0 +1,54 @@
+"""Tests for the out-of-line body store."""
+import asyncio
+
+import pytest
+
+from app.services.body_store import BodyStore, BodyTooLargeError
+
+
+def _reader(data: bytes):
+    """Async ``read(n)`` over ``data``, like UploadFile.read."""
+    offset = 0
+    
+    async def read(size: int) -> bytes:
+        nonlocal offset
+        block = data[offset:offset + size]
+        offset += len(block)
+        return block
+    
+    return read
+
+
+def test_spool_decodes_characters_split_across_blocks(tmp_path):
+    """Multi-byte characters cut by block boundaries are decoded correctly."""
+    store = BodyStore(tmp_path)
+    text = "Température ≤ 25 °C. " * 100
+    
+    stored = asyncio.run(store.spool(_reader(text.encode("utf-8")), max_bytes=10_000, block_size=7, preview_chars=30))
+    
+    assert stored.length == len(text)
+    assert stored.size == len(text.encode("utf-8"))
+    assert stored.preview == text[:30]
+    assert "".join(store.iter_text(stored.ref, block_chars=100)) == text
+
+
+def test_identical_bodies_share_a_file(tmp_path):
+    store = BodyStore(tmp_path)
+    first = asyncio.run(store.spool(_reader(b"same body"), max_bytes=100))
+    second = asyncio.run(store.spool(_reader(b"same body"), max_bytes=100))
+    
+    assert first.ref == second.ref
+    assert len(list(tmp_path.rglob("*.txt"))) == 1
+
+
+@pytest.mark.parametrize("data,error", [
+    (b"x" * 101, BodyTooLargeError),
+    (b"valid then \xff invalid", ValueError),
+    (b"truncated \xc3", ValueError),
+])
+def test_rejected_uploads_leave_nothing_behind(tmp_path, data, error):
+    """Oversized or non-UTF-8 uploads raise and their spool file is removed."""
+    store = BodyStore(tmp_path)
+    with pytest.raises(error):
+        asyncio.run(store.spool(_reader(data), max_bytes=100, block_size=8))
+    assert not any(path.is_file() for path in tmp_path.rglob("*"))
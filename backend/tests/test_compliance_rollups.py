@@ -0,0 +1,110 @@
+"""Tests for materialized compliance rollups."""
+from datetime import datetime, timedelta
+
+from app.models.document import DocumentAnalysis
+from app.services.analysis_store import AnalysisStore
+from app.services.compliance_rollups import ComplianceRollups
+from app.services.document_store import DocumentStore
+
+
+def _doc(doc_id: str, days_ago: int, category: str = "Safety") -> dict:
+    published_at = (datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+    return {"id": doc_id, "title": doc_id, "body": "text", "category": category, "published_at": published_at}
+
+
+def _analysis(doc_id: str, score: float, issues: int) -> DocumentAnalysis:
+    return DocumentAnalysis(
+        document_id=doc_id,
+        compliance_score=score,
+        inconsistencies=[f"issue {i}" for i in range(issues)]
+    )
+
+
+def _setup(tmp_path):
+    path = tmp_path / "db.sqlite3"
+    return DocumentStore(path), ComplianceRollups(path)
+
+
+def test_trends_range_read(tmp_path):
+    """Trends aggregate per day and only include the requested window."""
+    store, rollups = _setup(tmp_path)
+    docs = [_doc("A", 2), _doc("B", 2, "Health"), _doc("C", 60)]
+    store.add_many(docs)
+    rollups.record(docs[0], _analysis("A", 80, 1))
+    rollups.record(docs[1], _analysis("B", 60, 2))
+    rollups.record(docs[2], _analysis("C", 90, 0))
+    
+    result = rollups.trends(30)
+    
+    assert result["trends"] == [{
+        "date": docs[0]["published_at"],
+        "compliance_percentage": 70.0,
+        "violations": 3,
+        "inspections": 2
+    }]
+    assert result["violations_by_category"] == {"Safety": 1, "Health": 2}
+    assert len(rollups.trends(90)["trends"]) == 2
+
+
+def test_reanalysis_replaces_previous_contribution(tmp_path):
+    """Re-analyzing a document does not double count it."""
+    store, rollups = _setup(tmp_path)
+    doc = _doc("A", 1)
+    store.add(doc)
+    rollups.record(doc, _analysis("A", 50, 3))
+    rollups.record(doc, _analysis("A", 90, 0))
+    
+    (day,) = rollups.trends(7)["trends"]
+    assert day["compliance_percentage"] == 90.0
+    assert day["inspections"] == 1
+    assert day["violations"] == 0
+
+
+def test_unrecorded_and_orphaned_documents(tmp_path):
+    """New documents are reported as unrecorded; deleted ones are retracted."""
+    store, rollups = _setup(tmp_path)
+    old = _doc("OLD", 1)
+    store.add(old)
+    rollups.record(old, _analysis("OLD", 70, 1))
+    store.replace_all([_doc("NEW", 1)])
+    
+    assert rollups.unrecorded_document_ids() == ["NEW"]
+    assert rollups.prune_orphans() == 1
+    assert rollups.trends(7)["trends"] == []
+
+
+def test_new_body_under_same_id_retracts_contribution(tmp_path):
+    """A document replaced with a new body drops out of the trends until re-analyzed."""
+    store, rollups = _setup(tmp_path)
+    store.add_listener(rollups.on_documents)
+    doc = _doc("A", 1)
+    store.add(doc)
+    rollups.record(doc, _analysis("A", 40, 2))
+    
+    store.add(dict(doc, title="A (renamed)"))
+    assert len(rollups.trends(7)["trends"]) == 1
+    
+    revised = dict(doc, body="revised text")
+    store.replace_all([revised])
+    assert rollups.trends(7)["trends"] == []
+    assert rollups.category_totals() == {}
+    assert rollups.unrecorded_document_ids() == ["A"]
+    
+    rollups.record(revised, _analysis("A", 90, 0))
+    (day,) = rollups.trends(7)["trends"]
+    assert day["compliance_percentage"] == 90.0 and day["inspections"] == 1
+    assert rollups.unrecorded_document_ids() == []
+
+
+def test_stored_analyses_of_unseen_documents_are_recorded(tmp_path):
+    """Analyses stored for documents the rollups never saw are folded in once."""
+    store, rollups = _setup(tmp_path)
+    analyses = AnalysisStore(tmp_path / "db.sqlite3")
+    docs = [_doc("A", 1), _doc("B", 1)]
+    store.add_many(docs)
+    analyses.save(docs[0], _analysis("A", 60, 1), "model", "v1")
+    
+    assert rollups.record_stored_analyses() == 1
+    assert rollups.record_stored_analyses() == 0
+    (day,) = rollups.trends(7)["trends"]
+    assert (day["compliance_percentage"], day["violations"], day["inspections"]) == (60.0, 1, 1)
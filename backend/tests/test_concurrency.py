@@ -0,0 +1,60 @@
+"""Tests for off-loop execution and event-loop lag monitoring."""
+import asyncio
+import threading
+import time
+
+from app.core.concurrency import LoopLagMonitor, run_blocking
+
+
+def test_run_blocking_keeps_the_loop_responsive():
+    """Blocking calls run on the pool while the loop keeps ticking."""
+    async def scenario():
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        task = asyncio.create_task(ticker())
+        thread = await run_blocking(lambda: (time.sleep(0.2), threading.current_thread().name)[1])
+        task.cancel()
+        return ticks, thread
+    
+    ticks, thread = asyncio.run(scenario())
+    assert thread.startswith("blocking")
+    assert ticks >= 5
+
+
+def test_loop_lag_monitor_detects_stalls():
+    """A synchronous sleep on the loop shows up as lag."""
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.01, warn_threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.15)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.stats()
+    
+    stats = asyncio.run(scenario())
+    assert stats["max_ms"] >= 100
+    assert stats["stalls"] == 1
+
+
+def test_health_stays_fast_while_analytics_block(client, monkeypatch):
+    """A slow analytics call does not delay /health."""
+    analytics = client.app.state.services.analytics_service
+    monkeypatch.setattr(analytics, "get_rolling_metrics", lambda **kwargs: time.sleep(0.5) or [])
+    
+    slow = threading.Thread(target=client.get, args=("/api/v1/analytics/metrics/rolling",))
+    slow.start()
+    time.sleep(0.1)
+    started = time.perf_counter()
+    response = client.get("/health")
+    elapsed = time.perf_counter() - started
+    slow.join()
+    
+    assert response.status_code == 200
+    assert elapsed < 0.25
@@ -0,0 +1,30 @@
+"""Tests for section-aligned document chunking."""
+from app.services.document_chunker import chunk_document
+
+
+def test_short_text_is_a_single_chunk():
+    assert chunk_document("Operators must keep records.", 1000) == ["Operators must keep records."]
+
+
+def test_chunks_start_at_section_headings():
+    """Short sections are packed together and never split mid-section."""
+    sections = [f"Section {n}\n" + f"Clause {n} applies. " * 10 for n in range(1, 7)]
+    text = "\n".join(sections)
+    
+    chunks = chunk_document(text, 450)
+    
+    assert len(chunks) == 3
+    assert all(len(chunk) <= 450 for chunk in chunks)
+    assert [chunk.split("\n")[0] for chunk in chunks] == ["Section 1", "Section 3", "Section 5"]
+
+
+def test_oversized_section_splits_at_paragraphs_then_sentences():
+    """A section longer than the limit breaks at paragraph and sentence ends."""
+    paragraph = "Tanks must be sealed. " * 20
+    text = "1. STORAGE\n" + paragraph + "\n\n" + paragraph
+    
+    chunks = chunk_document(text, 200)
+    
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert all(chunk.endswith("sealed.") for chunk in chunks)
+    assert "".join(chunks).replace(" ", "").replace("\n", "") == text.replace(" ", "").replace("\n", "")
@@ -0,0 +1,86 @@
+"""Tests for the SQLite document store."""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.document_store import DocumentStore
+from app.services.ingestion_log import IngestionLog
+
+
+def _doc(doc_id: str, category: str = "Safety") -> dict:
+    return {
+        "id": doc_id,
+        "title": f"Title {doc_id}",
+        "body": "Operators must wear PPE.",
+        "category": category,
+        "published_at": "2025-01-01"
+    }
+
+
+def test_add_get_and_filtered_list(tmp_path):
+    """Documents are retrievable by id and listable by category in insertion order."""
+    store = DocumentStore(tmp_path / "docs.sqlite3")
+    store.add_many([_doc("DOC-1"), _doc("DOC-2", "Health"), _doc("DOC-3")])
+    
+    assert store.get("DOC-2")["category"] == "Health"
+    assert store.get("DOC-404") is None
+    assert [d["id"] for d in store.list(category="Safety")] == ["DOC-1", "DOC-3"]
+    assert [d["id"] for d in store.list(limit=1, offset=1)] == ["DOC-2"]
+    assert [d["id"] for d in store.recent(2)] == ["DOC-2", "DOC-3"]
+
+
+def test_import_json_skips_existing(tmp_path):
+    """Importing the same JSON file twice does not duplicate documents."""
+    path = tmp_path / "documents.json"
+    path.write_text(json.dumps([_doc("DOC-1"), _doc("DOC-2")]))
+    store = DocumentStore(tmp_path / "docs.sqlite3")
+    
+    assert store.import_json(path) == 2
+    assert store.import_json(path) == 0
+    assert store.count() == 2
+
+
+def test_ingestion_log_defers_writes_until_compaction(tmp_path):
+    """Uploads are appended to the log, visible by id, and compacted into SQLite."""
+    log = IngestionLog(tmp_path / "ingest")
+    store = DocumentStore(tmp_path / "docs.sqlite3", ingestion_log=log)
+    store.add(_doc("DOC-1"))
+    
+    assert store.get("DOC-1")["id"] == "DOC-1"
+    assert list((tmp_path / "ingest").glob("*.ndjson"))
+    
+    assert store.compact() == 1
+    assert store.compact() == 0
+    assert [d["id"] for d in store.list()] == ["DOC-1"]
+    assert not list((tmp_path / "ingest").glob("segment-*.ndjson"))
+
+
+def test_ingestion_log_is_replayed_after_restart(tmp_path):
+    """Documents still in the log when the process dies are recovered on open."""
+    log = IngestionLog(tmp_path / "ingest")
+    store = DocumentStore(tmp_path / "docs.sqlite3", ingestion_log=log)
+    store.add_many([_doc("DOC-1"), _doc("DOC-2")])
+    log.close()  # simulate a crash: no compaction, no clean close
+    
+    reopened = DocumentStore(tmp_path / "docs.sqlite3", ingestion_log=IngestionLog(tmp_path / "ingest"))
+    assert reopened.count() == 2
+
+
+def test_ingestion_log_keeps_only_the_newest_segments(tmp_path):
+    """With max_segments set, sealing drops the oldest sealed segments."""
+    log = IngestionLog(tmp_path / "stream", max_segment_bytes=1, fsync=False, max_segments=2)
+    for i in range(5):
+        log.append([{"id": i}])
+    
+    segments = log.segments()
+    assert len(segments) == 3
+    assert [r["id"] for segment in segments for r in IngestionLog.read_segment(segment)] == [3, 4]
+
+
+def test_concurrent_uploads_are_not_lost(tmp_path):
+    """Concurrent appends never overwrite each other."""
+    store = DocumentStore(tmp_path / "docs.sqlite3", ingestion_log=IngestionLog(tmp_path / "ingest", fsync=False))
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: store.add(_doc(f"DOC-{i}")), range(200)))
+    
+    assert store.count() == 200
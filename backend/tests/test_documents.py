@@ -1,12 +1,14 @@
 """Tests for documents API."""
+import io
+import json
+import zipfile
+
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 
-client = TestClient(app)
+from app.core.config import settings
 
 
-def test_get_documents():
+def test_get_documents(client):
     """Test getting all documents."""
     response = client.get("/api/v1/documents/")
     assert response.status_code == 200
@@ -14,7 +16,7 @@ def test_get_documents():
     assert len(response.json()) > 0
 
 
-def test_get_document_by_id():
+def test_get_document_by_id(client):
     """Test getting a specific document."""
     response = client.get("/api/v1/documents/DOC-1001")
     assert response.status_code == 200
@@ -24,13 +26,13 @@ def test_get_document_by_id():
     assert "body" in data
 
 
-def test_get_nonexistent_document():
+def test_get_nonexistent_document(client):
     """Test getting a non-existent document."""
     response = client.get("/api/v1/documents/DOC-9999")
     assert response.status_code == 404
 
 
-def test_analyze_document():
+def test_analyze_document(client):
     """Test document analysis."""
     response = client.post("/api/v1/documents/analyze?document_id=DOC-1001")
     assert response.status_code == 200
@@ -41,3 +43,246 @@ def test_analyze_document():
     assert "risk_level" in data
     assert 0 <= data["compliance_score"] <= 100
 
+
+def test_stored_analysis_is_served_and_reused(client):
+    """Analyses are persisted; reads and repeat requests reuse them until forced."""
+    store = client.app.state.services.document_store
+    store.add({
+        "id": "DOC-STORED",
+        "title": "Stored analysis",
+        "body": "Operators must keep inspection records for five years.",
+        "category": "Environmental",
+        "published_at": "2024-01-01",
+        "created_at": "2024-01-01T00:00:00"
+    })
+    assert client.get("/api/v1/documents/DOC-STORED/analysis").status_code == 404
+    assert client.get("/api/v1/documents/DOC-MISSING/analysis").status_code == 404
+
+    first = client.post("/api/v1/documents/analyze?document_id=DOC-STORED").json()
+    stored = client.get("/api/v1/documents/DOC-STORED/analysis").json()
+    assert stored["analyzed_at"] == first["analyzed_at"]
+    assert stored["extracted_rules"] == first["extracted_rules"]
+    assert stored["prompt_version"] and stored["model"]
+    assert stored["stale"] is False
+
+    again = client.post("/api/v1/documents/analyze?document_id=DOC-STORED").json()
+    assert again["analyzed_at"] == first["analyzed_at"]
+    forced = client.post("/api/v1/documents/analyze?document_id=DOC-STORED&force=true").json()
+    assert forced["analyzed_at"] != first["analyzed_at"]
+    assert client.get("/api/v1/documents/DOC-STORED/analysis").json()["analyzed_at"] == forced["analyzed_at"]
+
+
+def test_near_duplicate_upload_reuses_analysis_and_is_clustered(client):
+    """An amended re-issue reuses the original's analysis and the two form a cluster."""
+    body = (
+        "Dock crews must keep mooring logs for three years. "
+        "The harbor office schedules pilots for the outer berths. "
+        "Tide tables are posted beside the north gantry every morning. "
+        "Cargo tallies are reconciled with the port ledger each evening. "
+        "Tug captains brief the night shift before departures. "
+    )
+    uploaded = []
+    for name, text in (("harbor.txt", body), ("harbor-amended.txt", body + "Gate passes are renewed in spring.")):
+        response = client.post(
+            "/api/v1/documents/upload?category=Maritime",
+            files={"file": (name, text.encode("utf-8"))}
+        )
+        assert response.status_code == 200
+        uploaded.append(response.json())
+
+    original_id = uploaded[0]["document"]["id"]
+    amended_id = uploaded[1]["document"]["id"]
+    assert uploaded[1]["analysis"]["reused_from"] == original_id
+
+    data = client.get("/api/v1/documents/clusters?threshold=0.7").json()
+    cluster = next(c for c in data["clusters"] if c["representative"] == original_id)
+    assert cluster["category"] == "Maritime"
+    assert [d["id"] for d in cluster["documents"]] == [original_id, amended_id]
+    assert cluster["documents"][1]["similarity"] >= 0.7
+    assert client.get("/api/v1/documents/clusters?threshold=2").status_code == 400
+
+    stats = client.get("/api/v1/processing/stats").json()["near_duplicates"]
+    assert stats["reused_analyses"] >= 1 and stats["indexed"] >= 2
+
+
+def test_search_finds_uploads(client):
+    """Uploaded documents are searchable once indexed, with ranked, paginated, highlighted hits."""
+    for name, text in (
+        ("quarry-blasting.txt", "Quarry blasting must stop when wind exceeds 40 km/h."),
+        ("quarry-dust.txt", "Dust from quarry haul roads must be suppressed with water."),
+    ):
+        response = client.post(
+            "/api/v1/documents/upload?category=Mining",
+            files={"file": (name, text.encode("utf-8"))}
+        )
+        assert response.status_code == 200
+    client.app.state.services.search_index.flush()
+
+    data = client.get("/api/v1/documents/search?q=quarry&category=Mining&limit=1").json()
+    assert data["total"] == 2
+    assert len(data["results"]) == 1
+    assert "<mark>" in data["results"][0]["snippet"]
+
+    page = client.get("/api/v1/documents/search?q=quarry&category=Mining&limit=1&offset=1").json()
+    assert page["results"][0]["id"] != data["results"][0]["id"]
+
+    hits = client.get("/api/v1/documents/search?q=blasting wind").json()["results"]
+    assert [hit["title"] for hit in hits] == ["quarry-blasting.txt"]
+
+    assert client.get("/api/v1/documents/search?q=%2A").status_code == 400
+    assert client.get("/api/v1/documents/search?q=quarry&limit=0").status_code == 400
+
+
+def test_upload_small_document_is_stored_inline(client):
+    """Short uploads keep their full body on the document."""
+    body = "Operators must keep inspection records."
+    response = client.post("/api/v1/documents/upload", files={"file": ("short.txt", body.encode("utf-8"))})
+    assert response.status_code == 200
+    document = response.json()["document"]
+    assert document["body"] == body
+    assert document["body_truncated"] is False
+    
+    assert client.get(f"/api/v1/documents/{document['id']}/body").text == body
+
+
+def test_upload_large_document_is_stored_out_of_line(client, monkeypatch):
+    """Long uploads keep a preview inline and are analyzed from the spooled file."""
+    monkeypatch.setattr(settings, "document_preview_chars", 100)
+    body = "Background information. " * 50 + "Operators must maintain emissions below 20 ppm."
+    response = client.post("/api/v1/documents/upload", files={"file": ("long.txt", body.encode("utf-8"))})
+    assert response.status_code == 200
+    data = response.json()
+    document = data["document"]
+    assert document["body"] == body[:100]
+    assert document["body_length"] == len(body)
+    assert document["body_truncated"] is True
+    assert "emissions below 20 ppm" in data["analysis"]["extracted_rules"]
+    
+    assert client.get(f"/api/v1/documents/{document['id']}").json()["body_truncated"] is True
+    assert client.get(f"/api/v1/documents/{document['id']}/body").text == body
+
+
+def test_upload_rejects_oversized_and_binary_files(client, monkeypatch):
+    monkeypatch.setattr(settings, "max_upload_bytes", 1000)
+    response = client.post("/api/v1/documents/upload", files={"file": ("big.txt", b"a" * 2000)})
+    assert response.status_code == 413
+    
+    response = client.post("/api/v1/documents/upload", files={"file": ("image.png", b"\x89PNG\r\n\x1a\n\xff")})
+    assert response.status_code == 400
+
+
+def _post_chunked(client, path: str, field: str, blocks: int):
+    """Send a multipart upload of ``blocks`` KB chunks without Content-Length.
+    
+    Returns the response status and how many body chunks the app read.
+    """
+    boundary = "limit-test"
+    chunks = [(
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="big.txt"\r\n'
+        "Content-Type: text/plain\r\n\r\n"
+    ).encode()] + [b"a" * 1024] * blocks
+    received = []
+    sent = []
+    
+    async def receive():
+        received.append(1)
+        return {"type": "http.request", "body": chunks[len(received) - 1], "more_body": len(received) < len(chunks)}
+    
+    async def send(message):
+        sent.append(message)
+    
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"transfer-encoding", b"chunked"),
+            (b"content-type", f"multipart/form-data; boundary={boundary}".encode())
+        ],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+        "app": client.app
+    }
+    client.portal.call(client.app, scope, receive, send)
+    return sent[0]["status"], len(received)
+
+
+def test_upload_limit_is_enforced_while_a_chunked_body_arrives(client, monkeypatch):
+    """A body without Content-Length is cut off with 413 once it outgrows the limit."""
+    monkeypatch.setattr(settings, "max_upload_bytes", 1000)
+    status, received = _post_chunked(client, "/api/v1/documents/upload", "file", 1000)
+    assert status == 413
+    assert received < 100
+
+
+def test_upload_batch_streams_results_for_files_and_zip_members(client):
+    """Plain files and zip members are stored and each analysis is streamed as NDJSON."""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("regs/air.txt", "Plants must maintain emissions below 20 ppm.")
+        zf.writestr("regs/water.txt", "Operators shall test discharge daily.")
+        zf.writestr("__MACOSX/regs/._air.txt", "metadata")
+    files = [
+        ("files", ("safety.txt", b"Workers must be trained annually.", "text/plain")),
+        ("files", ("binary.bin", b"\xff\xfe\x00", "application/octet-stream")),
+        ("files", ("archive.zip", archive.getvalue(), "application/zip")),
+    ]
+    
+    response = client.post("/api/v1/documents/upload-batch?category=Environmental", files=files)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    
+    assert events[-1] == {"event": "summary", "stored": 3, "analyzed": 3, "failed": 0, "rejected": 1}
+    assert [e["filename"] for e in events if e["event"] == "rejected"] == ["binary.bin"]
+    analyzed = {e["document"]["title"]: e for e in events if e["event"] == "document"}
+    assert set(analyzed) == {"safety.txt", "air.txt", "water.txt"}
+    assert "emissions below 20 ppm" in analyzed["air.txt"]["analysis"]["extracted_rules"]
+    for event in analyzed.values():
+        document = client.get(f"/api/v1/documents/{event['document']['id']}").json()
+        assert document["category"] == "Environmental"
+
+
+def test_upload_batch_rejects_too_many_documents(client, monkeypatch):
+    monkeypatch.setattr(settings, "upload_batch_max_files", 1)
+    files = [("files", (f"doc{n}.txt", b"Staff shall rest.", "text/plain")) for n in range(2)]
+    response = client.post("/api/v1/documents/upload-batch", files=files)
+    assert response.status_code == 413
+
+
+def test_upload_batch_counts_zip_members_before_storing_bodies(client, monkeypatch):
+    """A batch refused for its zip members leaves nothing in the body store."""
+    monkeypatch.setattr(settings, "upload_batch_max_files", 2)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for n in range(2):
+            zf.writestr(f"doc{n}.txt", "Staff shall rest.")
+    files = [
+        ("files", ("long.txt", b"Operators must log every shift. " * 500, "text/plain")),
+        ("files", ("archive.zip", archive.getvalue(), "application/zip")),
+    ]
+    before = sorted(settings.body_store_dir.rglob("*"))
+    
+    response = client.post("/api/v1/documents/upload-batch", files=files)
+    assert response.status_code == 413
+    assert sorted(settings.body_store_dir.rglob("*")) == before
+
+
+def test_upload_batch_refuses_oversized_bodies(client, monkeypatch):
+    """Batches over UPLOAD_BATCH_MAX_BYTES get 413 by Content-Length and while streamed."""
+    monkeypatch.setattr(settings, "upload_batch_max_bytes", 100_000)
+    files = [("files", (f"doc{n}.txt", b"a" * 100_000, "text/plain")) for n in range(2)]
+    response = client.post("/api/v1/documents/upload-batch", files=files)
+    assert response.status_code == 413
+    
+    status, received = _post_chunked(client, "/api/v1/documents/upload-batch", "files", 1000)
+    assert status == 413
+    assert received < 200
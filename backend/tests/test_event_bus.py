@@ -0,0 +1,88 @@
+"""Tests for the in-process event bus."""
+import asyncio
+import threading
+
+from app.services.event_bus import DROPPED, EventBus
+
+
+def test_events_reach_matching_subscribers():
+    """Subscribers only receive the event types they asked for, in order."""
+    async def scenario():
+        bus = EventBus()
+        alerts = bus.subscribe(types={"alert.created"})
+        everything = bus.subscribe()
+        bus.publish("alert.created", {"alert_id": "ALERT-1"})
+        bus.publish("document.analyzed", {"document_id": "DOC-1"})
+        await asyncio.sleep(0)
+        return [e.type for e in _drain(alerts.queue)], [e.type for e in _drain(everything.queue)]
+    
+    alerts, everything = asyncio.run(scenario())
+    assert alerts == ["alert.created"]
+    assert everything == ["alert.created", "document.analyzed"]
+
+
+def test_publish_from_worker_thread():
+    """Events published off the loop are delivered via the subscriber's loop."""
+    async def scenario():
+        bus = EventBus()
+        subscription = bus.subscribe()
+        worker = threading.Thread(target=bus.publish, args=("document.analyzed", {"document_id": "DOC-1"}))
+        worker.start()
+        worker.join()
+        return await asyncio.wait_for(subscription.queue.get(), 1)
+    
+    assert asyncio.run(scenario()).data == {"document_id": "DOC-1"}
+
+
+def test_slow_consumer_is_dropped():
+    """A full queue drops that subscriber without affecting others."""
+    async def scenario():
+        bus = EventBus(queue_size=2)
+        slow = bus.subscribe()
+        for i in range(3):
+            bus.publish("alert.created", {"n": i})
+        await asyncio.sleep(0)
+        return bus, _drain(slow.queue)
+    
+    bus, queued = asyncio.run(scenario())
+    assert queued == [DROPPED]
+    assert bus.stats() == {"subscribers": 0, "dropped_subscribers": 1}
+
+
+def test_reconnect_replays_missed_events():
+    """Last-Event-ID replays recent events published after it."""
+    async def scenario():
+        bus = EventBus()
+        first = bus.publish("alert.created", {"n": 1})
+        bus.publish("alert.created", {"n": 2})
+        subscription = bus.subscribe(last_event_id=first.id)
+        return [e.data["n"] for e in _drain(subscription.queue)]
+    
+    assert asyncio.run(scenario()) == [2]
+
+
+def test_alert_store_changes_are_published(client):
+    """Resolving an alert publishes an alert.resolved event."""
+    bus = client.app.state.services.event_bus
+    before = len(bus._recent)
+    
+    alert_id = client.get("/api/v1/alerts/?resolved=false&limit=1").json()[0]["alert_id"]
+    client.post(f"/api/v1/alerts/{alert_id}/resolve")
+    
+    event = list(bus._recent)[-1]
+    assert len(bus._recent) == before + 1
+    assert (event.type, event.data["alert_id"]) == ("alert.resolved", alert_id)
+
+
+def test_stream_rejects_unknown_event_types(client):
+    """A misspelled type is a 400 rather than a stream that never delivers."""
+    response = client.get("/api/v1/events/stream?types=alert.resolved,alert.create")
+    assert response.status_code == 400
+    assert "alert.create" in response.json()["detail"]
+
+
+def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
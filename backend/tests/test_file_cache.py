@@ -0,0 +1,52 @@
+"""Tests for the data file cache."""
+import json
+import os
+
+import pytest
+
+from app.services.file_cache import FileCache
+
+
+def test_repeated_loads_are_cache_hits(tmp_path):
+    """Unchanged files are parsed once."""
+    path = tmp_path / "logs.json"
+    path.write_text(json.dumps([{"metric": "Temperature", "value": 20}]))
+    cache = FileCache()
+    
+    first = cache.load_json(path)
+    second = cache.load_json(path)
+    
+    assert first is second
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_changed_file_is_reparsed(tmp_path):
+    """A change in size or mtime invalidates the cached value."""
+    path = tmp_path / "logs.json"
+    path.write_text(json.dumps([1]))
+    cache = FileCache()
+    cache.load_json(path)
+    
+    path.write_text(json.dumps([1, 2, 3]))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    
+    assert cache.load_json(path) == (1, 2, 3)
+
+
+def test_cached_values_are_read_only(tmp_path):
+    """Callers cannot mutate shared cached data."""
+    path = tmp_path / "logs.json"
+    path.write_text(json.dumps([{"value": 1}]))
+    logs = FileCache().load_json(path)
+    
+    with pytest.raises(TypeError):
+        logs[0]["value"] = 2
+    with pytest.raises(AttributeError):
+        logs.append({})
+
+
+def test_missing_file_returns_default(tmp_path):
+    """Missing files return the default value."""
+    assert FileCache().load_json(tmp_path / "missing.json") == ()
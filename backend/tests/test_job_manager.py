@@ -0,0 +1,101 @@
+"""Tests for background jobs."""
+import asyncio
+
+from app.services.job_manager import JobManager
+
+
+def test_job_progress_and_result(tmp_path):
+    """A finished job records its progress counters and result."""
+    async def scenario():
+        manager = JobManager(tmp_path / "jobs.sqlite3")
+        
+        async def work(progress):
+            progress.set_total(3)
+            for _ in range(3):
+                await asyncio.sleep(0)
+                progress.advance()
+            return {"items": 3}
+        
+        job = await manager.submit("count", work, params={"n": 3})
+        assert job["status"] == "queued"
+        await asyncio.gather(*manager._tasks.values())
+        return manager.get(job["job_id"])
+    
+    job = asyncio.run(scenario())
+    assert (job["status"], job["total"], job["completed"]) == ("done", 3, 3)
+    assert job["result"] == {"items": 3}
+    assert job["params"] == {"n": 3}
+
+
+def test_progress_writes_are_throttled(tmp_path):
+    """Rapid progress ticks are coalesced; the final counts are still recorded."""
+    async def scenario():
+        manager = JobManager(tmp_path / "jobs.sqlite3")
+        writes = []
+        write_progress = manager._write_progress
+        manager._write_progress = lambda *args: writes.append(args) or write_progress(*args)
+        
+        async def work(progress):
+            progress.set_total(1000)
+            for _ in range(1000):
+                progress.advance()
+            return {}
+        
+        job = await manager.submit("count", work)
+        await asyncio.gather(*manager._tasks.values())
+        return writes, manager.get(job["job_id"])
+    
+    writes, job = asyncio.run(scenario())
+    assert len(writes) <= 2
+    assert (job["total"], job["completed"]) == (1000, 1000)
+
+
+def test_jobs_queue_behind_workers_and_can_be_cancelled(tmp_path):
+    """Jobs beyond the worker count wait; cancelling marks them cancelled."""
+    async def scenario():
+        manager = JobManager(tmp_path / "jobs.sqlite3", workers=1)
+        
+        async def forever(progress):
+            await asyncio.Event().wait()
+        
+        running = await manager.submit("slow", forever)
+        queued = await manager.submit("slow", forever)
+        await asyncio.sleep(0.05)
+        statuses = (manager.get(running["job_id"])["status"], manager.get(queued["job_id"])["status"])
+        cancelled = await manager.cancel(running["job_id"])
+        await manager.shutdown()
+        return statuses, cancelled, manager.get(queued["job_id"])
+    
+    statuses, cancelled, interrupted = asyncio.run(scenario())
+    assert statuses == ("running", "queued")
+    assert cancelled["status"] == "cancelled"
+    assert interrupted["status"] == "failed"
+
+
+def test_failed_jobs_record_the_error(tmp_path):
+    """Exceptions fail the job with their message."""
+    async def scenario():
+        manager = JobManager(tmp_path / "jobs.sqlite3")
+        
+        async def broken(progress):
+            raise RuntimeError("boom")
+        
+        job = await manager.submit("broken", broken)
+        await asyncio.gather(*manager._tasks.values())
+        return manager.get(job["job_id"])
+    
+    job = asyncio.run(scenario())
+    assert (job["status"], job["error"]) == ("failed", "boom")
+
+
+def test_unfinished_jobs_fail_after_restart(tmp_path):
+    """Jobs left running by a previous process are marked failed."""
+    path = tmp_path / "jobs.sqlite3"
+    manager = JobManager(path)
+    with manager._conn:
+        manager._conn.execute(
+            "INSERT INTO jobs (job_id, kind, status, params, created_at) VALUES ('JOB-1', 'x', 'running', '{}', '')"
+        )
+    manager.close()
+    
+    assert JobManager(path).get("JOB-1")["status"] == "failed"
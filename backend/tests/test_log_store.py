@@ -0,0 +1,46 @@
+"""Tests for the columnar log store."""
+from app.services.log_store import ColumnarLogStore
+
+LOGS = [
+    {"id": "LOG-1", "facility": "Plant A", "metric": "Temperature", "value": 30.5, "unit": "°C", "threshold": 25, "timestamp": "2024-01-01T10:00:00Z"},
+    {"id": "LOG-2", "facility": "Plant B", "metric": "Pressure", "value": 60.0, "unit": "psi", "threshold": 65, "timestamp": "2024-01-01T11:00:00Z"},
+    {"id": "LOG-3", "facility": "Plant A", "metric": "Temperature", "value": 20.0, "unit": "°C", "threshold": 25, "timestamp": "2024-01-01T12:00:00Z"},
+]
+
+
+def test_records_round_trip():
+    """Rows rebuild the original dictionaries plus a status."""
+    store = ColumnarLogStore.from_records(LOGS)
+    
+    record = store.record(0)
+    
+    assert record == {**LOGS[0], "status": "EXCEEDED"}
+    assert store.record(1)["status"] == "NORMAL"
+
+
+def test_strings_are_dictionary_encoded():
+    """Repeated facilities and metrics share one code."""
+    store = ColumnarLogStore.from_records(LOGS)
+    columns = store.columns()
+    
+    assert list(columns["facility"]) == [0, 1, 0]
+    assert store.metrics.lookup("Temperature") == 0
+    assert store.metrics.lookup("Noise Level") == -1
+
+
+def test_excess_column_tracks_threshold_overruns():
+    """Only readings above their threshold have a positive excess."""
+    store = ColumnarLogStore.from_records(LOGS)
+    
+    assert list(store.columns()["excess"]) == [5.5, 0.0, 0.0]
+
+
+def test_appends_grow_capacity():
+    """Appending beyond the initial capacity keeps earlier rows intact."""
+    store = ColumnarLogStore(capacity=1)
+    
+    for log in LOGS:
+        store.append_many([log])
+    
+    assert len(store) == 3
+    assert [log["id"] for log in store.tail(2)] == ["LOG-2", "LOG-3"]
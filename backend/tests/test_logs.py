@@ -0,0 +1,84 @@
+"""Tests for streaming log ingestion."""
+import asyncio
+import json
+
+from starlette.background import BackgroundTask
+
+from app.api.v1.logs import _DuplexStreamingResponse
+from app.services.log_ingestor import LogIngestor
+
+
+def _reading(value, threshold=20, **extra):
+    return {"facility": "Plant A", "metric": "Air Emissions", "value": value, "unit": "ppm",
+            "threshold": threshold, "timestamp": "2024-05-01T10:00:00Z", **extra}
+
+
+def test_stream_emits_alerts_and_summary(client):
+    """Readings above threshold produce alerts; bad lines are counted."""
+    def body():
+        yield (json.dumps(_reading(30)) + "\n" + json.dumps(_reading(10))).encode()
+        yield ("\n" + json.dumps(_reading(21, timestamp="2024-05-01T12:00:00Z")) + "\nnot json\n").encode()
+    
+    response = client.post("/api/v1/logs/stream", content=body())
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    
+    alerts = [e["alert"] for e in events if e["event"] == "alert"]
+    assert [a["severity"] for a in alerts] == ["HIGH", "LOW"]
+    assert all(a["facility"] == "Plant A" for a in alerts)
+    assert events[-1] == {"event": "summary", "accepted": 3, "rejected": 1, "alerts": 2}
+    
+    stored = {a["alert_id"] for a in client.get("/api/v1/alerts/?facility=Plant A&limit=1000").json()}
+    assert {a["alert_id"] for a in alerts} <= stored
+
+
+def test_repeated_exceedances_raise_one_alert_per_window(client):
+    """Exceedances for one facility and metric within the suppression window are stored once."""
+    lines = "".join(
+        json.dumps(_reading(30 + minute, facility="Plant Repeat", timestamp=f"2024-05-01T10:{minute:02d}:00Z")) + "\n"
+        for minute in range(20)
+    )
+    
+    response = client.post("/api/v1/logs/stream", content=lines.encode())
+    events = [json.loads(line) for line in response.text.splitlines()]
+    
+    alerts = [e["alert"] for e in events if e["event"] == "alert"]
+    assert [a["timestamp"] for a in alerts] == ["2024-05-01T10:00:00+00:00"]
+    assert events[-1]["alerts"] == 1
+    stored = client.get("/api/v1/alerts/?facility=Plant Repeat&limit=1000").json()
+    assert [a["alert_id"] for a in stored] == [alerts[0]["alert_id"]]
+
+
+def test_streamed_readings_reach_analytics(client):
+    """Streamed readings are included in safety metrics."""
+    before = client.get("/api/v1/analytics/trends").json()["safety_metrics"]
+    
+    lines = "".join(json.dumps(_reading(v)) + "\n" for v in (5, 50))
+    client.post("/api/v1/logs/stream", content=lines.encode())
+    
+    after = client.get("/api/v1/analytics/trends").json()["safety_metrics"]
+    assert after["total_metrics_tracked"] == before["total_metrics_tracked"] + 2
+    assert after["threshold_exceeded_count"] == before["threshold_exceeded_count"] + 1
+
+
+def test_parse_reading_rejects_invalid_records():
+    """Missing metrics, non-numeric values and bad timestamps are rejected."""
+    assert LogIngestor.parse_reading(json.dumps(_reading(1)).encode())["status"] == "NORMAL"
+    assert LogIngestor.parse_reading(json.dumps({"value": 1, "threshold": 2}).encode()) is None
+    assert LogIngestor.parse_reading(json.dumps(_reading("high")).encode()) is None
+    assert LogIngestor.parse_reading(json.dumps(_reading(1, timestamp="yesterday")).encode()) is None
+
+
+def test_duplex_response_runs_background_task():
+    """Background tasks attached to the streaming response run after the body is sent."""
+    ran = []
+    
+    async def body():
+        yield "done\n"
+    
+    async def send(message):
+        pass
+    
+    response = _DuplexStreamingResponse(body(), background=BackgroundTask(ran.append, "cleanup"))
+    asyncio.run(response({"type": "http"}, None, send))
+    assert ran == ["cleanup"]
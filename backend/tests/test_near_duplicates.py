@@ -0,0 +1,168 @@
+"""Tests for the MinHash/LSH near-duplicate index and analysis reuse."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.analysis_cache import AnalysisCache
+from app.services.analysis_engine import AnalysisEngine
+from app.services.analysis_store import AnalysisStore
+from app.services.document_store import DocumentStore
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.nlp_service import NLPService
+from app.services.rate_limiter import RateLimiter
+from app.services.rule_extractor import RuleExtractorRegistry, load_rule_triggers
+
+RULES = "All facilities must keep inspection records for five years. "
+FILLER = (
+    "The plant operates three shifts across the northern site. "
+    "Readings are collected by automated sensors in each building. "
+    "Historical data shows a seasonal pattern in water usage. "
+    "Quarterly reviews summarize operational performance for management. "
+    "The regional office coordinates contractor schedules and training. "
+    "Maintenance crews rotate between the eastern and western halls. "
+)
+
+
+def _document(document_id: str, body: str, category: str = "Safety") -> dict:
+    return {
+        "id": document_id,
+        "title": document_id,
+        "body": body,
+        "category": category,
+        "published_at": "2024-01-01",
+        "created_at": "2024-01-01T00:00:00"
+    }
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "compliance.sqlite3"
+    store = DocumentStore(path)
+    yield path, store
+    store.close()
+
+
+def _index(path) -> NearDuplicateIndex:
+    return NearDuplicateIndex(path, RuleExtractorRegistry(load_rule_triggers(None)))
+
+
+def test_index_finds_near_duplicates_and_clusters(database):
+    """Bodies sharing most shingles are neighbors and cluster; unrelated ones do not."""
+    path, _ = database
+    index = _index(path)
+    original = _document("DOC-A", RULES + FILLER)
+    amended = _document("DOC-B", RULES + FILLER + "Visitors sign in at the front desk.")
+    unrelated = _document("DOC-C", "Emission reports are filed with the agency every quarter by the site lead.")
+    for document in (original, amended, unrelated):
+        index.add(document, [document["body"]])
+
+    neighbors = index.nearest("DOC-B", 0.7)
+    assert [entry.document_id for entry, _ in neighbors] == ["DOC-A"]
+    assert index.nearest("DOC-C", 0.5) == []
+
+    clusters = index.clusters(0.5)
+    assert len(clusters) == 1
+    assert clusters[0]["representative"] == "DOC-A"
+    assert [document_id for document_id, _ in clusters[0]["documents"]] == ["DOC-A", "DOC-B"]
+    index.close()
+
+
+def test_bodies_without_words_are_not_near_duplicates(database):
+    """Empty or punctuation-only bodies share an empty signature but never match."""
+    path, _ = database
+    index = _index(path)
+    for document in (_document("DOC-A", ""), _document("DOC-B", "... !!!")):
+        index.add(document, [document["body"]])
+    
+    assert index.count() == 2
+    assert index.nearest("DOC-A", 0.5) == []
+    assert index.clusters(0.5) == []
+    index.close()
+
+
+def test_cluster_representative_survives_a_restart(database):
+    """The representative is the first indexed member, also after reopening the index."""
+    path, _ = database
+    index = _index(path)
+    for document in (_document("DOC-Z", RULES + FILLER), _document("DOC-A", RULES + FILLER + "Visitors sign in.")):
+        index.add(document, [document["body"]])
+    index.close()
+    
+    index = _index(path)
+    assert index.clusters(0.5)[0]["representative"] == "DOC-Z"
+    index.close()
+
+
+def test_same_rules_excludes_neighbors_with_changed_rules(database):
+    """A near-duplicate whose rule clauses differ (e.g. a new limit) is not a reuse candidate."""
+    path, _ = database
+    index = _index(path)
+    original = _document("DOC-A", RULES + FILLER)
+    changed = _document("DOC-B", RULES.replace("five", "seven") + FILLER)
+    for document in (original, changed):
+        index.add(document, [document["body"]])
+
+    assert index.nearest("DOC-B", 0.7)
+    assert index.nearest("DOC-B", 0.7, same_rules=True) == []
+    index.close()
+
+
+def test_signatures_persist_and_orphans_are_pruned(database):
+    """Signatures survive a reopen; those of deleted documents are dropped."""
+    path, store = database
+    kept = _document("DOC-A", RULES + FILLER)
+    store.add(kept)
+    store.compact()
+    index = _index(path)
+    index.add(kept, [kept["body"]])
+    index.add(_document("DOC-GONE", RULES + FILLER), [RULES + FILLER])
+    index.close()
+
+    reopened = _index(path)
+    assert reopened.count() == 2
+    assert reopened.prune_orphans() == 1
+    assert reopened.get("DOC-A") is not None and reopened.get("DOC-GONE") is None
+    reopened.close()
+
+
+def test_engine_reuses_analysis_of_near_duplicate(database, tmp_path):
+    """A near-duplicate with the same rules copies its neighbor's analysis instead of calling the model."""
+    path, _ = database
+    completions = SimpleNamespace(calls=[])
+
+    def create(**kwargs):
+        completions.calls.append(kwargs)
+        content = json.dumps({"rules": ["Keep inspection records for five years"], "inconsistencies": []})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    nlp = NLPService(
+        cache=AnalysisCache(tmp_path / "cache.sqlite3"),
+        rate_limiter=RateLimiter(60_000, 100_000_000)
+    )
+    nlp.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    analysis_store = AnalysisStore(path)
+    index = NearDuplicateIndex(path, nlp.rule_extractors)
+    engine = AnalysisEngine(nlp, concurrency=1, analysis_store=analysis_store, near_duplicates=index)
+
+    original = _document("DOC-A", RULES + FILLER)
+    amended = _document("DOC-B", RULES + FILLER + "Visitors sign in at the front desk.")
+    changed = _document("DOC-C", RULES.replace("five", "seven") + FILLER)
+    first, second, third = asyncio.run(engine.analyze_many([original, amended, changed]))
+
+    assert len(completions.calls) == 2
+    assert second.reused_from == "DOC-A"
+    assert second.extracted_rules == first.extracted_rules
+    assert third.reused_from is None
+    assert engine.stats() == {"reused_analyses": 1, "llm_calls_saved": 1}
+    assert analysis_store.get("DOC-B")["analysis"].reused_from == "DOC-A"
+
+    forced = asyncio.run(engine.analyze(amended, force=True))
+    assert forced.reused_from is None
+    assert len(completions.calls) == 3
+
+    engine.shutdown()
+    nlp.close()
+    index.close()
+    analysis_store.close()
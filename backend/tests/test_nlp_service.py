@@ -0,0 +1,145 @@
+"""Tests for the NLP service."""
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+
+from app.core.config import settings
+from app.services.analysis_cache import AnalysisCache
+from app.services.nlp_service import NLPService
+from app.services.rate_limiter import RateLimiter
+
+
+class FakeCompletions:
+    """Records chat completion calls and returns a canned response."""
+    
+    def __init__(self, content: str):
+        self.content = content
+        self.calls = []
+    
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _service_with_fake_client(tmp_path, content: str):
+    service = NLPService(cache=AnalysisCache(tmp_path / "cache.sqlite3"))
+    completions = FakeCompletions(content)
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return service, completions
+
+
+def test_parse_analysis_response_valid():
+    """A well-formed response yields rules and inconsistencies."""
+    rules, issues = NLPService._parse_analysis_response(
+        json.dumps({"rules": ["Keep logs", " "], "inconsistencies": []})
+    )
+    assert rules == ["Keep logs"]
+    assert issues == []
+
+
+@pytest.mark.parametrize("content", [
+    "not json",
+    json.dumps(["a list"]),
+    json.dumps({"rules": ["ok"]}),
+    json.dumps({"rules": [1, 2], "inconsistencies": []}),
+])
+def test_parse_analysis_response_rejects_invalid(content):
+    """Responses that do not match the schema are rejected."""
+    with pytest.raises(ValueError):
+        NLPService._parse_analysis_response(content)
+
+
+def test_analyze_document_uses_single_call(tmp_path):
+    """Rules and inconsistencies come from one JSON-object completion."""
+    content = json.dumps({"rules": ["Rule A", "Rule B"], "inconsistencies": ["Issue A"]})
+    service, completions = _service_with_fake_client(tmp_path, content)
+    
+    analysis = service.analyze_document("DOC-1", "Facilities must keep records.", "Safety")
+    
+    assert len(completions.calls) == 1
+    assert completions.calls[0]["response_format"] == {"type": "json_object"}
+    assert analysis.extracted_rules == ["Rule A", "Rule B"]
+    assert analysis.inconsistencies == ["Issue A"]
+
+
+def test_invalid_ai_response_falls_back_without_caching(tmp_path):
+    """A malformed AI response falls back to patterns and is not cached."""
+    service, completions = _service_with_fake_client(tmp_path, "garbage")
+    
+    analysis = service.analyze_document("DOC-1", "Operators must keep records.", "Safety")
+    
+    assert analysis.extracted_rules
+    assert service.cache.stats()["entries"] == 0
+
+
+class PartCompletions:
+    """Answers each chunk prompt with a rule naming its section, after a delay."""
+    
+    def __init__(self, delay: float, fail_section: Optional[int] = None):
+        self.delay = delay
+        self.fail_section = fail_section
+        self.calls = 0
+        self._lock = threading.Lock()
+    
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        prompt = kwargs["messages"][-1]["content"]
+        sections = [int(n) for n in re.findall(r"Section (\d+)", prompt)]
+        if self.fail_section in sections:
+            raise RuntimeError("upstream error")
+        content = json.dumps({
+            "rules": [f"Rule from section {n}" for n in sections] + ["Keep records"],
+            "inconsistencies": []
+        })
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _chunking_service(tmp_path, completions) -> NLPService:
+    service = NLPService(
+        cache=AnalysisCache(tmp_path / "cache.sqlite3"),
+        rate_limiter=RateLimiter(requests_per_minute=60_000, tokens_per_minute=100_000_000)
+    )
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return service
+
+
+def _long_document(sections: int) -> str:
+    return "\n".join(f"Section {n}\nOperators must keep record {n}. " + "Details follow. " * 40 for n in range(1, sections + 1))
+
+
+def test_long_document_is_analyzed_in_parallel_chunks(tmp_path, monkeypatch):
+    """Chunks run concurrently and their results are merged without duplicates."""
+    monkeypatch.setattr(settings, "analysis_chunk_chars", 1000)
+    monkeypatch.setattr(settings, "analysis_chunk_concurrency", 3)
+    completions = PartCompletions(delay=0.2)
+    service = _chunking_service(tmp_path, completions)
+    
+    started = time.perf_counter()
+    analysis = service.analyze_document("DOC-1", _long_document(6), "Safety")
+    elapsed = time.perf_counter() - started
+    service.close()
+    
+    # Six chunks on three workers take two waves, not six sequential calls
+    assert completions.calls == 6
+    assert elapsed < 0.2 * 4
+    assert analysis.extracted_rules == [f"Rule from section {n}" for n in range(1, 7)] + ["Keep records"]
+
+
+def test_failed_chunk_falls_back_to_patterns(tmp_path, monkeypatch):
+    """One failed chunk discards the partial AI result."""
+    monkeypatch.setattr(settings, "analysis_chunk_chars", 1000)
+    service = _chunking_service(tmp_path, PartCompletions(delay=0, fail_section=3))
+    
+    analysis = service.analyze_document("DOC-1", _long_document(4), "Safety")
+    service.close()
+    
+    assert analysis.extracted_rules[0] == "record 1"
+    assert service.cache.stats()["entries"] == 0
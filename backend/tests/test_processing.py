@@ -0,0 +1,39 @@
+"""Tests for processing API."""
+import time
+
+import pytest
+
+
+def test_services_share_one_nlp_service(client):
+    """All routers use the single application-scoped NLP service and HTTP pool."""
+    services = client.app.state.services
+    assert services.analytics_service.nlp_service is services.nlp_service
+    assert services.pipeline.nlp_service is services.nlp_service
+    assert services.pipeline.analysis_engine is services.analysis_engine
+
+
+def test_processing_stats(client):
+    """Test runtime statistics endpoint."""
+    response = client.get("/api/v1/processing/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert "analysis_cache" in data
+    assert "queued" in data["rate_limiter"]
+
+
+def test_analyze_documents_runs_as_a_job(client):
+    """The endpoint returns a job at once; polling reports progress and the result."""
+    response = client.post("/api/v1/processing/analyze-documents")
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    
+    for _ in range(100):
+        job = client.get(f"/api/v1/processing/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.05)
+    
+    assert job["status"] == "done"
+    assert job["completed"] == job["total"] == job["result"]["count"]
+    assert job_id in {j["job_id"] for j in client.get("/api/v1/processing/jobs").json()["jobs"]}
+    assert client.get("/api/v1/processing/jobs/JOB-MISSING").status_code == 404
@@ -0,0 +1,108 @@
+"""Tests for the Groq rate limiter."""
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep just moves time forward."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def time(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimitError(Exception):
+    """Minimal stand-in for groq.RateLimitError."""
+    
+    status_code = 429
+    
+    def __init__(self, retry_after: str = None):
+        super().__init__("rate limited")
+        headers = {"retry-after": retry_after} if retry_after else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+def _limiter(clock: FakeClock, **kwargs) -> RateLimiter:
+    params = {"requests_per_minute": 60, "tokens_per_minute": 6000, "base_delay": 0.5}
+    params.update(kwargs)
+    return RateLimiter(clock=clock.time, sleep=clock.sleep, **params)
+
+
+def test_requests_per_minute_budget_queues_callers():
+    """Calls beyond the request budget wait for the bucket to refill."""
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_minute=2)
+    
+    limiter.acquire()
+    limiter.acquire()
+    waited = limiter.acquire()
+    
+    assert waited == pytest.approx(30.0)
+    assert limiter.stats()["queued"] == 1
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_tokens_per_minute_budget():
+    """Large prompts consume the token budget."""
+    clock = FakeClock()
+    limiter = _limiter(clock, tokens_per_minute=1000)
+    
+    limiter.acquire(tokens=1000)
+    waited = limiter.acquire(tokens=500)
+    
+    assert waited == pytest.approx(30.0)
+
+
+def test_rate_limit_errors_are_retried_honoring_retry_after():
+    """429 responses are retried after at least the Retry-After delay."""
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    outcomes = [RateLimitError(retry_after="7"), "ok"]
+    
+    def fn():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    
+    assert limiter.call(fn) == "ok"
+    assert clock.now >= 7.0
+    stats = limiter.stats()
+    assert stats["throttled"] == 1
+    assert stats["retries"] == 1
+
+
+def test_rate_limit_retries_are_bounded():
+    """Persistent rate limiting eventually raises."""
+    clock = FakeClock()
+    limiter = _limiter(clock, max_retries=2)
+    
+    def fn():
+        raise RateLimitError()
+    
+    with pytest.raises(RateLimitError):
+        limiter.call(fn)
+    assert limiter.stats()["failures"] == 1
+    assert limiter.stats()["retries"] == 2
+
+
+def test_other_errors_are_not_retried():
+    """Non rate limit errors propagate immediately."""
+    limiter = _limiter(FakeClock())
+    
+    def fn():
+        raise ValueError("boom")
+    
+    with pytest.raises(ValueError):
+        limiter.call(fn)
+    assert limiter.stats()["retries"] == 0
@@ -0,0 +1,66 @@
+"""Tests for the compiled rule extractor."""
+import json
+
+import pytest
+
+from app.services.rule_extractor import (
+    DEFAULT_RULE_TRIGGERS,
+    RuleExtractor,
+    RuleExtractorRegistry,
+    load_rule_triggers,
+)
+
+
+def test_rules_come_back_in_document_order():
+    """Every trigger is matched in one pass and order follows the text."""
+    text = (
+        "Wearing helmets is mandatory on site. Operators shall log every shift. "
+        "All plants must maintain emissions below 20 ppm. Staff are required to attend training."
+    )
+    rules = RuleExtractor(DEFAULT_RULE_TRIGGERS).extract(text)
+    assert rules == [
+        "on site",
+        "log every shift",
+        "emissions below 20 ppm",
+        "attend training",
+    ]
+
+
+def test_clauses_stop_at_sentence_boundaries():
+    """Decimals and abbreviations do not end a clause; sentence ends and line breaks do."""
+    text = "The pH must be kept between 6.5 and 8.5, e.g. by dosing. Next sentence\nOperators shall report\nleaks"
+    extractor = RuleExtractor(DEFAULT_RULE_TRIGGERS)
+    assert extractor.extract(text) == ["kept between 6.5 and 8.5, e.g. by dosing", "report"]
+    assert extractor.extract("Operators shall wear gloves, e.g. nitrile ones, at all times.") == [
+        "wear gloves, e.g. nitrile ones, at all times"
+    ]
+    assert extractor.extract("Staff must be trained per Sec. 4, i.e. yearly. Drums must be sealed.Must be labeled.") == [
+        "trained per Sec. 4, i.e. yearly",
+        "sealed",
+        "labeled",
+    ]
+
+
+def test_duplicates_and_partial_words_are_ignored():
+    """Repeated rules are kept once and triggers inside words do not match."""
+    text = "Tanks MUST BE  sealed. Tanks must be sealed. The marshall will attend. Crews shall rest."
+    extractor = RuleExtractor(DEFAULT_RULE_TRIGGERS)
+    assert extractor.extract(text) == ["sealed", "rest"]
+    assert extractor.extract(text, limit=1) == ["sealed"]
+
+
+def test_invalid_trigger_is_rejected():
+    with pytest.raises(ValueError):
+        RuleExtractor(["must ("])
+
+
+def test_category_triggers_extend_the_defaults(tmp_path):
+    """Category patterns from the config file are added to the default ones."""
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"Safety": [r"is prohibited to", r"never"]}))
+    registry = RuleExtractorRegistry(load_rule_triggers(str(path)))
+    text = "Workers shall wear gloves. Staff never enter the furnace room."
+    
+    assert registry.get("Safety").extract(text) == ["wear gloves", "enter the furnace room"]
+    assert registry.get("Environmental").extract(text) == ["wear gloves"]
+    assert registry.version != RuleExtractorRegistry(load_rule_triggers(None)).version
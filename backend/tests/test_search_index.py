@@ -0,0 +1,125 @@
+"""Tests for the full-text search index."""
+import pytest
+
+from app.models.document import DocumentAnalysis
+from app.services.analysis_store import AnalysisStore
+from app.services.body_store import BodyStore
+from app.services.document_store import DocumentStore
+from app.services.search_index import SearchIndex, build_match_query
+
+
+def _document(document_id: str, title: str, body: str, category: str = "Safety") -> dict:
+    return {
+        "id": document_id,
+        "title": title,
+        "body": body,
+        "category": category,
+        "published_at": "2024-01-01",
+        "created_at": "2024-01-01T00:00:00"
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "compliance.sqlite3"
+    store = DocumentStore(path)
+    analysis_store = AnalysisStore(path)
+    search_index = SearchIndex(path, BodyStore(tmp_path / "bodies"), analysis_store=analysis_store)
+    store.add_listener(search_index.on_documents)
+    search_index.start()
+    yield store, analysis_store, search_index
+    search_index.close()
+    analysis_store.close()
+    store.close()
+
+
+def test_build_match_query_quotes_user_input():
+    """FTS5 syntax in user input is treated as plain words."""
+    assert build_match_query('AES-256 OR "keys"') == '"AES" "256" "OR" "keys"'
+    assert build_match_query("audit*") == '"audit"*'
+    assert build_match_query(" -*- ") == ""
+
+
+def test_search_ranks_title_hits_first_and_filters_by_category(index):
+    """Title matches outrank body matches; the category filter narrows hits."""
+    store, _, search_index = index
+    store.add_many([
+        _document("DOC-1", "Wastewater discharge limits", "Plants report monthly.", "Environmental"),
+        _document("DOC-2", "Site safety", "Wastewater tanks must be inspected weekly.", "Safety"),
+        _document("DOC-3", "Payroll controls", "Invoices are approved twice.", "Financial"),
+        *(_document(f"DOC-X{i}", f"Handbook {i}", "Staff read the handbook.") for i in range(5))
+    ])
+    search_index.flush()
+
+    total, hits = search_index.search("wastewater")
+    assert total == 2
+    assert [hit["id"] for hit in hits] == ["DOC-1", "DOC-2"]
+    assert hits[0]["score"] > hits[1]["score"]
+    assert "<mark>Wastewater</mark>" in hits[0]["snippet"]
+
+    total, hits = search_index.search("wastewater", category="Safety")
+    assert total == 1 and hits[0]["id"] == "DOC-2"
+    assert search_index.search("wastewater invoices") == (0, [])
+
+
+def test_search_paginates(index):
+    """limit and offset page through hits while total counts them all."""
+    store, _, search_index = index
+    store.add_many([_document(f"DOC-{i}", f"Audit {i}", "Quarterly audit findings.") for i in range(5)])
+    search_index.flush()
+
+    total, first = search_index.search("audit", limit=2)
+    _, second = search_index.search("audit", limit=2, offset=2)
+    assert total == 5
+    assert len(first) == len(second) == 2
+    assert not {hit["id"] for hit in first} & {hit["id"] for hit in second}
+
+
+def test_analysis_rules_are_searchable(index):
+    """Rules recorded after an analysis are matched, and re-indexing keeps them."""
+    store, analysis_store, search_index = index
+    document = _document("DOC-1", "Plant manual", "General operating notes.")
+    store.add(document)
+    search_index.flush()
+    analysis = DocumentAnalysis(document_id="DOC-1", extracted_rules=["Respirators are required in zone B"])
+    analysis_store.save(document, analysis, "model", "1")
+    search_index.record_analysis(document, analysis)
+
+    assert search_index.search("respirators")[0] == 1
+    store.add(dict(document, title="Plant manual v2"))
+    search_index.flush()
+    assert search_index.search("respirators")[0] == 1
+    assert search_index.count() == 1
+
+
+def test_replace_and_sync_keep_index_in_step_with_store(index):
+    """Replacing the corpus re-indexes it; sync drops stale and adds missing documents."""
+    store, _, search_index = index
+    store.add(_document("DOC-OLD", "Legacy boiler rules", "Boilers are serviced yearly."))
+    store.replace_all([_document("DOC-NEW", "Forklift rules", "Forklifts are inspected daily.")])
+    search_index.flush()
+    assert search_index.search("boiler")[0] == 0
+    assert search_index.search("forklift")[0] == 1
+
+    search_index.index([_document("DOC-GONE", "Crane rules", "Cranes are certified.")])
+    # A writer without the listener, e.g. another process
+    other_store = DocumentStore(store.path)
+    other_store.add(_document("DOC-QUIET", "Ladder rules", "Ladders are tagged."))
+    other_store.close()
+    assert search_index.sync(store) == 1
+    assert search_index.search("crane")[0] == 0
+    assert search_index.search("ladder")[0] == 1
+
+
+def test_replacement_is_indexed_in_bounded_batches(index, monkeypatch):
+    """A large replacement is indexed one batch per transaction."""
+    store, _, search_index = index
+    monkeypatch.setattr("app.services.search_index._BATCH", 10)
+    batches = []
+    index_batch = search_index._index_batch
+    monkeypatch.setattr(search_index, "_index_batch", lambda batch: batches.append(len(batch)) or index_batch(batch))
+    store.replace_all([_document(f"DOC-{i}", f"Permit {i}", "Permits are renewed yearly.") for i in range(25)])
+    search_index.flush()
+    
+    assert batches == [10, 10, 5]
+    assert search_index.search("permit")[0] == 25
@@ -0,0 +1,66 @@
+"""Tests for rolling window aggregates."""
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.log_store import ColumnarLogStore, format_timestamp_us
+from app.services.window_aggregator import WindowAggregator, parse_window
+
+NOW = 1_700_000_000.0
+
+
+def _log(value, seconds_ago, facility="Plant A", metric="Temperature"):
+    return {"facility": facility, "metric": metric, "value": value, "threshold": 25,
+            "timestamp": format_timestamp_us(int((NOW - seconds_ago) * 1_000_000))}
+
+
+def _aggregator(clock):
+    return WindowAggregator({"1h": 3600, "24h": 86_400}, buckets=60, clock=lambda: clock[0])
+
+
+def test_parse_window():
+    assert parse_window("15m") == 900
+    assert parse_window("30d") == 30 * 86_400
+    with pytest.raises(ValueError):
+        parse_window("soon")
+
+
+def test_rolling_stats_per_window():
+    """Each window only sees readings within its span."""
+    clock = [NOW]
+    aggregator = _aggregator(clock)
+    store = ColumnarLogStore.from_records([_log(10, 60), _log(20, 120), _log(40, 7200), _log(5, 60, facility="Plant B")])
+    aggregator.add_rows(store, 0, len(store))
+    
+    plant_a = aggregator.rolling(facility="Plant A")[0]["windows"]
+    assert plant_a["1h"] == {"count": 2, "mean": 15.0, "min": 10.0, "max": 20.0}
+    assert plant_a["24h"]["count"] == 3
+    assert aggregator.combined("1h", metric="Temperature")["count"] == 3
+
+
+def test_buckets_expire_as_time_moves():
+    """Readings drop out once their bucket slides past the window."""
+    clock = [NOW]
+    aggregator = _aggregator(clock)
+    store = ColumnarLogStore.from_records([_log(10, 0)])
+    aggregator.add_rows(store, 0, 1)
+    
+    clock[0] += 2 * 3600
+    
+    assert aggregator.combined("1h")["count"] == 0
+    assert aggregator.combined("24h")["mean"] == 10.0
+
+
+def test_rolling_endpoint_includes_streamed_readings(client):
+    """Freshly streamed readings show up in the rolling aggregates."""
+    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    reading = {"facility": "Rolling Plant", "metric": "Noise Level", "value": 70, "unit": "dB",
+               "threshold": 85, "timestamp": now}
+    client.post("/api/v1/logs/stream", content=(json.dumps(reading) + "\n").encode())
+    
+    response = client.get("/api/v1/analytics/metrics/rolling?facility=Rolling Plant")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["windows"] == ["1h", "24h", "30d"]
+    assert data["metrics"][0]["windows"]["1h"]["mean"] == 70.0